@@ -0,0 +1,301 @@
+# Batch_Render.py
+# Generacion de graficas por lotes, sin interfaz grafica (backend Agg).
+
+# Toma un archivo de especificacion JSON con una lista de figuras y una lista (o patron glob) de
+# archivos .out, y genera cada figura para cada archivo con la misma logica que "Generate Plot"
+# de Dynamic_Graphs.py (Plot_Render). Los archivos se reparten entre procesos de trabajo.
+#
+# Uso:
+#   python Batch_Render.py spec.json "estudio/*.out" [mas archivos] [-o carpeta] [-j procesos] [--float32]
+#                          [--no-render-cache] [--render-cache-dir carpeta] [--render-cache-mb 256]
+#
+# Ejemplo de especificacion:
+#   {
+#     "defaults": {"fig_width": 10, "fig_height": 5, "dpi": 300, "font_family": "Arial",
+#                  "font_size": 10, "grid": true, "legend": {"loc": "best", "frameon": true}},
+#     "figures": [
+#       {"filename": "{stem}_voltajes", "title": "Voltajes", "ylabel": "V (pu)",
+#        "xlim": [0, 10], "y": [{"match": "^VOLT 10\\d\\d", "max": 6}]},
+#       {"filename": "{stem}_angulos", "dual_y": true, "format": "svg",
+#        "y": [{"channel": 3, "color": "r", "style": "-", "label": "Gen 1"},
+#              {"channel": 4, "color": "k", "style": "--"}]}
+#     ]
+#   }
+# Cada entrada de "y" selecciona un canal por numero ("channel") o todos los que cumplen una
+# expresion regular sobre la descripcion ("match", con "max" opcional). "x" puede ser "time"
+# (por defecto), un numero de canal o {"match": ...}. Las figuras heredan los valores de "defaults".
+# Una figura ya generada con la misma especificacion y el mismo archivo de origen (ruta, tamano y
+# fecha) se copia del cache de imagenes (Render_Cache) en lugar de volver a dibujarse.
+
+import argparse
+import glob
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from Channel_Cache import open_cached_channel_file, source_key
+from Channel_Reader import open_channel_file
+from Channel_Store import ChannelMatrix, LazyChannelData
+from Plot_Render import (DEFAULT_SETTINGS, LINE_COLORS, apply_plot_settings, assign_axes, draw_legends,
+                         padded_limits, safe_filename, save_figure, series_range)
+from Render_Cache import DEFAULT_MAX_BYTES, RenderCache, spec_key
+
+FIGURE_DEFAULTS = {
+    'fig_width': 10,
+    'fig_height': 5,
+    'dpi': 300,
+    'format': 'png',
+    'dual_y': False,
+    'legend': {'loc': 'best', 'frameon': True, 'bbox': None},
+}
+
+
+class SpecError(ValueError):
+    """Raised when the plot spec is invalid or selects no channels."""
+
+
+def load_spec(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        spec = json.load(f)
+    if isinstance(spec, list):
+        spec = {'figures': spec}
+    if not spec.get('figures'):
+        raise SpecError("The spec has no figures")
+    return spec
+
+
+def expand_files(patterns):
+    files = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern)) if glob.has_magic(pattern) else [pattern]
+        files.extend(m for m in matches if m not in files)
+    return files
+
+
+def figure_spec(spec, fig):
+    merged = dict(FIGURE_DEFAULTS)
+    merged.update(spec.get('defaults', {}))
+    merged.update(fig)
+    merged['legend'] = dict(FIGURE_DEFAULTS['legend'], **merged.get('legend') or {})
+    return merged
+
+
+def resolve_channels(chanid, entry):
+    """Channel numbers selected by a spec entry: {"channel": n} or {"match": regex, "max": n}."""
+    if isinstance(entry, (int, str)):
+        entry = {'channel': entry}
+    if 'channel' in entry:
+        chan = entry['channel']
+        if chan != 'time':
+            chan = int(chan)
+        if chan not in chanid:
+            raise SpecError(f"Channel {chan} doesn't exist")
+        return [chan]
+    pattern = re.compile(entry['match'])
+    chans = [c for c, desc in chanid.items() if c != 'time' and pattern.search(desc)]
+    if entry.get('max'):
+        chans = chans[:int(entry['max'])]
+    if not chans:
+        raise SpecError(f"No channel matches '{entry['match']}'")
+    return chans
+
+
+def limit_strings(limits):
+    if not limits:
+        return "", ""
+    return str(limits[0]), str(limits[1])
+
+
+def render_figure(chandata, chanid, fig, save_path):
+    """Render one figure spec to save_path, following generate_plot/apply_plot_settings."""
+    figure = Figure(figsize=(float(fig['fig_width']), float(fig['fig_height'])))
+    FigureCanvasAgg(figure)
+    ax = figure.add_subplot()
+
+    # Obtener datos de X
+    x_entry = fig.get('x', 'time')
+    x_chan = 'time' if x_entry == 'time' else resolve_channels(chanid, x_entry)[0]
+    x_data = np.asarray(chandata[x_chan])
+    x_label = "Tiempo (s)" if x_chan == 'time' else chanid[x_chan]
+    x_window = tuple(sorted(fig['xlim'])) if fig.get('xlim') and x_chan == 'time' else None
+
+    # Rangos de las variables Y (dentro de la ventana X si se dio)
+    items = []
+    for entry in fig.get('y', []):
+        style = entry if isinstance(entry, dict) else {}
+        for chan in resolve_channels(chanid, entry):
+            slot = len(items)
+            y_data = np.asarray(chandata[chan])
+            y_min, y_max = series_range(x_data, y_data, x_window)
+            items.append((slot, chan, y_data, style, y_max - y_min, y_min, y_max))
+    if not items:
+        raise SpecError("The figure has no Y channels")
+
+    y1_items, y2_items = assign_axes(items, fig['dual_y'], lambda v: v[4])
+    ax2 = ax.twinx() if y2_items else None
+
+    y_bounds = {}
+    for axis, target, group in ((1, ax, y1_items), (2, ax2, y2_items)):
+        for slot, chan, y_data, style, _, y_min, y_max in group:
+            color = style.get('color') or LINE_COLORS[slot % len(LINE_COLORS)]
+            linestyle = style.get('style') or ('--' if axis == 2 else '-')
+            label = style.get('label') or chanid[chan]
+            target.plot(x_data, y_data, linestyle=linestyle, color=color, label=label, linewidth=1.8)
+            lo, hi = y_bounds.get(axis, (float('inf'), float('-inf')))
+            y_bounds[axis] = (min(lo, y_min), max(hi, y_max))
+
+    # Límites: los de la especificación o automáticos con 5 % de margen
+    xlim = limit_strings(fig.get('xlim'))
+    if not all(xlim):
+        x_min, x_max = series_range(x_data, x_data)
+        xlim = tuple(f"{v:.2f}" for v in padded_limits(x_min, x_max))
+    ylim = limit_strings(fig.get('ylim'))
+    if not all(ylim):
+        ylim = tuple(f"{v:.2f}" for v in padded_limits(*y_bounds[1], flat_padding=1))
+    y2lim = limit_strings(fig.get('y2lim'))
+    if ax2 is not None and not all(y2lim):
+        y2lim = tuple(f"{v:.2f}" for v in padded_limits(*y_bounds[2], flat_padding=1))
+
+    legend = fig['legend']
+    bbox = tuple(legend['bbox']) if legend.get('bbox') else None
+    draw_legends((ax, ax2), legend['loc'], legend['frameon'], bbox)
+
+    settings = dict(DEFAULT_SETTINGS)
+    settings.update({k: fig[k] for k in ('title', 'xlabel', 'ylabel', 'font_family', 'grid') if k in fig})
+    settings['font_size'] = int(fig.get('font_size', settings['font_size']))
+    settings['xlim_min'], settings['xlim_max'] = xlim
+    settings['ylim_min'], settings['ylim_max'] = ylim
+    apply_plot_settings(ax, settings, x_label, ax2, y2lim)
+
+    save_figure(figure, save_path, int(fig['dpi']))
+
+
+def output_path(outfile, fig, index, out_dir=None):
+    stem = os.path.splitext(os.path.basename(outfile))[0]
+    template = fig.get('filename') or f"{{stem}}_{fig.get('title', '').strip() or 'dynamic_simulation'}"
+    try:
+        name = template.format(stem=stem, index=index, title=fig.get('title', '').strip())
+    except (KeyError, IndexError):
+        name = template
+    folder = out_dir or os.path.dirname(os.path.abspath(outfile))
+    return os.path.join(folder, f"{safe_filename(name)}.{fig['format'].lower()}")
+
+
+def figure_key(source, fig):
+    """Render cache key of a merged figure spec (the output file name doesn't change the image)."""
+    return spec_key(source, {k: v for k, v in fig.items() if k != 'filename'})
+
+
+def render_file(outfile, spec, out_dir=None, use_cache=True, dtype=np.float64, render_cache=None):
+    """Render every figure of the spec for one .out file; returns [(outfile, path, seconds, error, cached)]."""
+    results = []
+    chandata = chanid = None
+    try:
+        source = source_key(outfile) if render_cache is not None else None
+    except OSError as e:
+        return [(outfile, None, 0.0, f"Failed to load file: {e}", False)]
+
+    for index, fig in enumerate(spec['figures']):
+        fig = figure_spec(spec, fig)
+        save_path = output_path(outfile, fig, index, out_dir)
+        t0 = time.perf_counter()
+        key = figure_key(source, fig) if render_cache is not None else None
+        try:
+            if key is not None and render_cache.fetch(key, save_path):
+                results.append((outfile, save_path, time.perf_counter() - t0, None, True))
+                continue
+        except OSError as e:
+            results.append((outfile, save_path, time.perf_counter() - t0, str(e), False))
+            continue
+        # El archivo solo se abre si alguna figura no esta en el cache
+        if chandata is None:
+            try:
+                if use_cache:
+                    reader = open_cached_channel_file(outfile)
+                else:
+                    reader = open_channel_file(outfile)
+                if not hasattr(reader, 'read_channel'):
+                    reader = ChannelMatrix.from_reader(reader, dtype)
+                _, chanid = reader.get_index()
+                chandata = LazyChannelData(reader, chanid)
+            except Exception as e:
+                return results + [(outfile, None, 0.0, f"Failed to load file: {e}", False)]
+            t0 = time.perf_counter()
+        try:
+            render_figure(chandata, chanid, fig, save_path)
+            if key is not None:
+                render_cache.store(key, save_path)
+            results.append((outfile, save_path, time.perf_counter() - t0, None, False))
+        except Exception as e:
+            results.append((outfile, save_path, time.perf_counter() - t0, str(e), False))
+    return results
+
+
+def print_summary(results, wall_time):
+    ok = [r for r in results if r[3] is None]
+    for outfile, path, seconds, error, cached in results:
+        status = "ERROR: " + error if error else "(cache)" if cached else ""
+        print(f"{seconds * 1000:9.1f} ms  {os.path.basename(outfile)} -> {path or '-'}  {status}")
+    print("-" * 60)
+    if ok:
+        times = np.array([r[2] for r in ok])
+        print(f"Figuras: {len(ok)}  errores: {len(results) - len(ok)}  tiempo total: {wall_time:.2f} s")
+        print(f"Por figura: media {times.mean() * 1000:.1f} ms, mediana {np.median(times) * 1000:.1f} ms, "
+              f"max {times.max() * 1000:.1f} ms  ({len(ok) / wall_time:.1f} figuras/s)")
+        hits = sum(1 for r in ok if r[4])
+        print(f"Cache de imagenes: {hits} de {len(ok)} figuras sin redibujar ({hits / len(ok):.0%})")
+    else:
+        print(f"Sin figuras generadas ({len(results)} errores)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render PSSE dynamic simulation plots without a GUI.")
+    parser.add_argument('spec', help="JSON plot spec")
+    parser.add_argument('files', nargs='+', help=".out files or glob patterns")
+    parser.add_argument('-o', '--output-dir', default=None, help="output folder (default: next to each .out)")
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1, help="worker processes")
+    parser.add_argument('--no-cache', action='store_true', help="don't use the sidecar channel cache")
+    parser.add_argument('--float32', action='store_true',
+                        help="keep dyntools channel data as float32 (half the memory)")
+    parser.add_argument('--no-render-cache', action='store_true', help="always re-render, don't reuse images")
+    parser.add_argument('--render-cache-dir', default=None, help="rendered image cache folder")
+    parser.add_argument('--render-cache-mb', type=float, default=DEFAULT_MAX_BYTES / 1e6,
+                        help="rendered image cache size limit (MB)")
+    args = parser.parse_args(argv)
+
+    spec = load_spec(args.spec)
+    files = expand_files(args.files)
+    if not files:
+        print("No hay archivos .out que procesar")
+        return 1
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+
+    dtype = np.float32 if args.float32 else np.float64
+    render_cache = None
+    if not args.no_render_cache:
+        render_cache = RenderCache(args.render_cache_dir, int(args.render_cache_mb * 1e6))
+    t0 = time.perf_counter()
+    results = []
+    if args.jobs <= 1 or len(files) == 1:
+        for outfile in files:
+            results.extend(render_file(outfile, spec, args.output_dir, not args.no_cache, dtype, render_cache))
+    else:
+        with ProcessPoolExecutor(max_workers=min(args.jobs, len(files))) as pool:
+            futures = [pool.submit(render_file, outfile, spec, args.output_dir, not args.no_cache, dtype,
+                                   render_cache) for outfile in files]
+            for future in as_completed(futures):
+                results.extend(future.result())
+    print_summary(results, time.perf_counter() - t0)
+    return 0 if all(r[3] is None for r in results) else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
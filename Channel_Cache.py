@@ -0,0 +1,227 @@
+# Channel_Cache.py
+# Cache columnar en disco ("sidecar") para abrir de nuevo el mismo archivo .out casi al instante.
+
+# La primera vez que se abre un archivo se escribe un .chcache con un pequeno encabezado JSON
+# seguido de una matriz (n + 1) x pasos: fila 0 = tiempo, fila i = canal i, cada una contigua.
+# Las aperturas siguientes mapean esa matriz en memoria (np.memmap) y cada canal es una vista
+# sin copia. La cache se identifica por ruta, tamano y fecha de modificacion del archivo original;
+# si no coincide o esta danada se reconstruye automaticamente.
+
+import hashlib
+import json
+import os
+import struct
+import tempfile
+from collections import OrderedDict
+
+import numpy as np
+
+from Channel_Reader import ChannelFileError, OutFileReader, check_cancel, open_channel_file
+
+CACHE_MAGIC = b'PSSECHC1'
+CACHE_EXT = '.chcache'
+CACHE_VERSION = 1
+_HEADER_LEN = struct.Struct('<Q')
+_ALIGN = 64
+# Pasos de tiempo por bloque al transponer desde el lector nativo (limita la memoria usada)
+_BUILD_CHUNK_BYTES = 16 * 1024 * 1024
+# mkstemp crea el temporal con permisos 0600; la cache final lleva los permisos normales (umask)
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+class StaleCacheError(ChannelFileError):
+    """Raised when a sidecar cache is missing, outdated or corrupt."""
+
+
+def source_key(path):
+    """Identity of the source file: absolute path, size and modification time."""
+    st = os.stat(path)
+    return {'path': os.path.abspath(path), 'size': st.st_size, 'mtime_ns': st.st_mtime_ns}
+
+
+def cache_path_for(path, cache_dir=None):
+    """Location of the sidecar cache: next to the file, or hashed inside cache_dir."""
+    if cache_dir is None:
+        return path + CACHE_EXT
+    digest = hashlib.sha1(os.path.abspath(path).encode('utf-8')).hexdigest()[:16]
+    return os.path.join(cache_dir, f"{os.path.basename(path)}.{digest}{CACHE_EXT}")
+
+
+def _chan_key(key):
+    return 'time' if key == 'time' else int(key)
+
+
+class ChannelCache:
+    """Reader over a memory-mapped sidecar cache; channels are zero-copy row views."""
+
+    backend = 'cache'
+    zero_copy = True
+
+    def __init__(self, cache_path, expected_key=None):
+        self.cache_path = cache_path
+        try:
+            with open(cache_path, 'rb') as f:
+                if f.read(len(CACHE_MAGIC)) != CACHE_MAGIC:
+                    raise StaleCacheError("Not a channel cache file")
+                (header_len,) = _HEADER_LEN.unpack(f.read(_HEADER_LEN.size))
+                meta = json.loads(f.read(header_len).decode('utf-8'))
+        except (OSError, ValueError, struct.error) as e:
+            raise StaleCacheError(f"Unreadable channel cache: {e}") from e
+
+        # Un encabezado JSON valido pero incompleto o de otra forma tambien es una cache danada
+        try:
+            if meta.get('version') != CACHE_VERSION:
+                raise StaleCacheError("Channel cache version mismatch")
+            if expected_key is not None and meta.get('source') != expected_key:
+                raise StaleCacheError("Channel cache is out of date")
+
+            self.meta = meta
+            self.path = meta['source']['path']
+            self.short_title = meta['short_title']
+            self.chanid = OrderedDict((_chan_key(k), desc) for k, desc in meta['chanid'])
+            self.nchan = int(meta['nchan'])
+            self.nsteps = int(meta['nsteps'])
+            self.data_offset = int(meta['data_offset'])
+            self.dtype = np.dtype(meta['dtype'])
+        except (KeyError, TypeError, AttributeError, ValueError) as e:
+            raise StaleCacheError(f"Corrupt channel cache header: {e!r}") from e
+
+        expected_size = self.data_offset + (self.nchan + 1) * self.nsteps * self.dtype.itemsize
+        if os.path.getsize(cache_path) != expected_size:
+            raise StaleCacheError("Channel cache is truncated")
+
+        if self.nsteps:
+            self.matrix = np.memmap(cache_path, dtype=self.dtype, mode='r',
+                                    offset=self.data_offset, shape=(self.nchan + 1, self.nsteps))
+        else:
+            self.matrix = np.empty((self.nchan + 1, 0), dtype=self.dtype)
+
+    def column_index(self, chan):
+        if chan == 'time':
+            return 0
+        if not 1 <= chan <= self.nchan:
+            raise KeyError(chan)
+        return chan
+
+    def read_channel(self, chan):
+        return self.matrix[self.column_index(chan)]
+
+    def get_index(self):
+        return self.short_title, OrderedDict(self.chanid)
+
+    def get_data(self):
+        chandata = {'time': self.matrix[0]}
+        for i in range(1, self.nchan + 1):
+            chandata[i] = self.matrix[i]
+        return self.short_title, OrderedDict(self.chanid), chandata
+
+
+def build_cache(reader, cache_path, key, progress=None, cancel=None):
+    """Write the sidecar cache for an open reader (atomically, via a temporary file).
+
+    progress(fraction, message) is called as the data is written; setting the
+    threading.Event passed as cancel aborts the build with LoadCancelled.
+    """
+    short_title, chanid = reader.get_index()
+    if isinstance(reader, OutFileReader):
+        nchan, nsteps, dtype = reader.nchan, reader.nsteps, reader.dtype['values'].base
+    else:
+        _, chanid, chandata = reader.get_data()
+        nchan = len(chanid) - 1
+        nsteps = len(chandata['time'])
+        dtype = np.dtype('<f8')
+        if list(chanid) != ['time'] + list(range(1, nchan + 1)):
+            raise ChannelFileError("Channel numbering is not contiguous, can't build a columnar cache")
+
+    meta = {
+        'version': CACHE_VERSION,
+        'source': key,
+        'short_title': short_title,
+        'chanid': [[k, desc] for k, desc in chanid.items()],
+        'nchan': nchan,
+        'nsteps': nsteps,
+        'dtype': dtype.str,
+    }
+    # El desplazamiento de los datos depende del largo del propio encabezado
+    base_len = len(CACHE_MAGIC) + _HEADER_LEN.size
+    header = json.dumps(dict(meta, data_offset=0)).encode('utf-8')
+    data_offset = -(-(base_len + len(header) + 32) // _ALIGN) * _ALIGN
+    header = json.dumps(dict(meta, data_offset=data_offset)).encode('utf-8')
+    header = header.ljust(data_offset - base_len)
+
+    # Nombre unico por llamada: dos hilos del mismo proceso (una carga cancelada y la siguiente, o
+    # los hilos de Study_Server) nunca escriben ni borran el mismo temporal
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(cache_path)),
+                                    prefix=os.path.basename(cache_path) + '.', suffix='.tmp')
+    out = None
+    try:
+        os.chmod(tmp_path, 0o666 & ~_UMASK)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(CACHE_MAGIC)
+            f.write(_HEADER_LEN.pack(len(header)))
+            f.write(header)
+            f.truncate(data_offset + (nchan + 1) * nsteps * dtype.itemsize)
+
+        if nsteps:
+            out = np.memmap(tmp_path, dtype=dtype, mode='r+', offset=data_offset, shape=(nchan + 1, nsteps))
+            if isinstance(reader, OutFileReader):
+                records = reader.records()
+                chunk = max(1, _BUILD_CHUNK_BYTES // reader.dtype.itemsize)
+                for start in range(0, nsteps, chunk):
+                    check_cancel(cancel)
+                    out[:, start:start + chunk] = records['values'][start:start + chunk].T
+                    if progress:
+                        progress(min(1.0, (start + chunk) / nsteps), "Construyendo cache de canales")
+            else:
+                out[0] = chandata['time']
+                for i in range(1, nchan + 1):
+                    if i % 256 == 0:
+                        check_cancel(cancel)
+                        if progress:
+                            progress(i / nchan, "Construyendo cache de canales")
+                    out[i] = chandata[i]
+            out.flush()
+            _close_memmap(out)
+            out = None
+        os.replace(tmp_path, cache_path)
+    except BaseException:
+        # El mapa se cierra antes de borrar: en Windows no se puede borrar un archivo mapeado, y el
+        # error de os.remove no debe reemplazar al original (p. ej. LoadCancelled)
+        if out is not None:
+            _close_memmap(out)
+            out = None
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def _close_memmap(array):
+    mm = getattr(array, '_mmap', None)
+    if mm is not None:
+        mm.close()
+
+
+def open_cached_channel_file(path, backend='auto', cache_dir=None, progress=None, cancel=None):
+    """Open a channel file through its sidecar cache, building or rebuilding it if needed."""
+    key = source_key(path)
+    cache_path = cache_path_for(path, cache_dir)
+    try:
+        return ChannelCache(cache_path, expected_key=key)
+    except StaleCacheError:
+        pass
+
+    if progress:
+        progress(0.0, "Leyendo archivo de canales")
+    reader = open_channel_file(path, backend=backend)
+    check_cancel(cancel)
+    try:
+        if cache_dir is not None:
+            os.makedirs(cache_dir, exist_ok=True)
+        build_cache(reader, cache_path, key, progress=progress, cancel=cancel)
+        return ChannelCache(cache_path, expected_key=key)
+    except (OSError, ChannelFileError):
+        # Sin permisos de escritura o formato no soportado: se usa el lector directamente
+        return reader
@@ -0,0 +1,233 @@
+# Channel_Export.py
+# Exportacion de los datos de canales (no solo la imagen) a CSV, NPZ, Parquet o HDF5.
+
+# Los datos se copian por bloques de pasos de tiempo: cada bloque trae solo las columnas pedidas
+# (tiempo + canales) directamente del cache columnar o de los registros del .out mapeados en
+# memoria, se escribe y se descarta. El uso de memoria depende del tamaño del bloque, no del
+# numero de canales ni de pasos. Se puede limitar a una ventana de tiempo y tomar una de cada N
+# muestras.
+#   - "csv": texto, una columna por canal (siempre disponible)
+#   - "npz": arreglo "data" (pasos x columnas) + "channels" y "descriptions" (siempre disponible)
+#   - "parquet": requiere pyarrow
+#   - "hdf5": requiere h5py
+# Los formatos opcionales solo se ofrecen si su biblioteca esta instalada.
+
+import csv
+import importlib.util
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+import zipfile
+from collections import OrderedDict
+
+import numpy as np
+
+from Channel_Reader import TIME_DESC, ChannelFileError, OutFileReader, check_cancel
+from Range_Index import window_indices
+
+CHUNK_ELEMENTS = 1 << 22  # valores por bloque (~16 MB en float32)
+
+
+class ExportError(ChannelFileError):
+    """Raised when an export format is unknown or its library isn't installed."""
+
+
+def column_names(chanid, chans):
+    return [TIME_DESC] + [f"{chan}: {chanid[chan]}" for chan in chans]
+
+
+class CsvWriter:
+    chunk_elements = 1 << 18  # el texto de un bloque ocupa mucho mas que los valores
+
+    def __init__(self, path, chanid, chans, dtype, nrows):
+        self.f = open(path, 'w', newline='', encoding='utf-8')
+        csv.writer(self.f).writerow(column_names(chanid, chans))
+        fmt = '%.7g' if dtype == np.float32 else '%.12g'
+        self.row_fmt = ','.join([fmt] * (len(chans) + 1)) + '\n'
+
+    def write(self, block):
+        # Un solo formateo por bloque (np.savetxt escribe fila por fila)
+        self.f.write((self.row_fmt * len(block)) % tuple(block.ravel().tolist()))
+
+    def close(self):
+        self.f.close()
+
+
+class NpzWriter:
+    """.npz written as a stream: the shape of "data" is known before the first block."""
+
+    def __init__(self, path, chanid, chans, dtype, nrows):
+        self.zip = zipfile.ZipFile(path, 'w', allowZip64=True)
+        with self.zip.open('channels.npy', 'w') as f:
+            np.lib.format.write_array(f, np.array([0] + list(chans), dtype=np.int64))
+        with self.zip.open('descriptions.npy', 'w') as f:
+            np.lib.format.write_array(f, np.array([chanid['time']] + [chanid[c] for c in chans]))
+        self.dtype = np.dtype(dtype)
+        self.member = self.zip.open('data.npy', 'w', force_zip64=True)
+        np.lib.format.write_array_header_2_0(self.member, {
+            'descr': np.lib.format.dtype_to_descr(self.dtype),
+            'fortran_order': False,
+            'shape': (nrows, len(chans) + 1),
+        })
+
+    def write(self, block):
+        self.member.write(np.ascontiguousarray(block, dtype=self.dtype).tobytes())
+
+    def close(self):
+        self.member.close()
+        self.zip.close()
+
+
+class ParquetWriter:
+    def __init__(self, path, chanid, chans, dtype, nrows):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self.pa = pa
+        value_type = pa.float32() if dtype == np.float32 else pa.float64()
+        meta = {'chanid': json.dumps([['time', chanid['time']]] + [[c, chanid[c]] for c in chans])}
+        self.schema = pa.schema([pa.field(name, value_type) for name in column_names(chanid, chans)],
+                                metadata=meta)
+        self.writer = pq.ParquetWriter(path, self.schema)
+
+    def write(self, block):
+        arrays = [self.pa.array(block[:, i]) for i in range(block.shape[1])]
+        self.writer.write_table(self.pa.Table.from_arrays(arrays, schema=self.schema))
+
+    def close(self):
+        self.writer.close()
+
+
+class Hdf5Writer:
+    def __init__(self, path, chanid, chans, dtype, nrows):
+        import h5py
+
+        self.file = h5py.File(path, 'w')
+        self.data = self.file.create_dataset('data', shape=(nrows, len(chans) + 1), dtype=dtype, chunks=True)
+        self.file.create_dataset('channels', data=np.array([0] + list(chans), dtype=np.int64))
+        self.file.create_dataset('descriptions', data=[chanid['time']] + [chanid[c] for c in chans],
+                                 dtype=h5py.string_dtype())
+        self.row = 0
+
+    def write(self, block):
+        self.data[self.row:self.row + len(block)] = block
+        self.row += len(block)
+
+    def close(self):
+        self.file.close()
+
+
+# nombre -> (extension, clase, modulo requerido o None)
+EXPORTERS = OrderedDict([
+    ('csv', ('.csv', CsvWriter, None)),
+    ('npz', ('.npz', NpzWriter, None)),
+    ('parquet', ('.parquet', ParquetWriter, 'pyarrow')),
+    ('hdf5', ('.h5', Hdf5Writer, 'h5py')),
+])
+
+
+def available_formats():
+    return [name for name, (_, _, module) in EXPORTERS.items()
+            if module is None or importlib.util.find_spec(module) is not None]
+
+
+def _block_reader(reader, chandata, columns):
+    """Function (i0, i1, step) -> (steps, len(columns)) block, and the block dtype."""
+    matrix = getattr(reader, 'matrix', None)
+    if matrix is not None:
+        rows = [reader.column_index(c) for c in columns]
+        return (lambda i0, i1, step: matrix[rows, i0:i1:step].T), matrix.dtype
+
+    if isinstance(reader, OutFileReader):
+        values = reader.records()['values'] if reader.nsteps else np.empty((0, reader.nchan + 1))
+        cols = [reader.column_index(c) for c in columns]
+        return (lambda i0, i1, step: values[i0:i1:step][:, cols]), values.dtype
+
+    def read(i0, i1, step):
+        return np.column_stack([np.asarray(chandata[c], dtype=np.float64)[i0:i1:step] for c in columns])
+    return read, np.dtype(np.float64)
+
+
+def export_channels(path, fmt, chanid, chandata, chans=None, reader=None, window=None, step=1,
+                    progress=None, cancel=None):
+    """Write time + chans (default: all) to path in the given format; returns the rows written.
+
+    reader (the open channel reader, or None) lets the blocks be read straight from the file or
+    cache; window=(t0, t1) limits the time range and step keeps one of every step samples.
+    """
+    if fmt not in EXPORTERS:
+        raise ExportError(f"Unknown export format: {fmt}")
+    if fmt not in available_formats():
+        raise ExportError(f"The {fmt} format requires the '{EXPORTERS[fmt][2]}' package")
+
+    chans = [c for c in (chanid if chans is None else chans) if c != 'time']
+    step = max(1, int(step))
+    t = np.asarray(chandata['time'])
+    i0, i1 = window_indices(t, *window) if window is not None else (0, len(t))
+    nrows = len(range(i0, i1, step))
+
+    read_block, dtype = _block_reader(reader, chandata, ['time'] + chans)
+    writer_cls = EXPORTERS[fmt][1]
+    chunk_elements = getattr(writer_cls, 'chunk_elements', CHUNK_ELEMENTS)
+    chunk = max(step, chunk_elements // (len(chans) + 1) // step * step)
+    writer = writer_cls(path, chanid, chans, dtype, nrows)
+    try:
+        for start in range(i0, i1, chunk):
+            check_cancel(cancel)
+            writer.write(read_block(start, min(start + chunk, i1), step))
+            if progress:
+                progress(min(1.0, (start + chunk - i0) / max(1, i1 - i0)), "Exportando canales")
+    except BaseException:
+        writer.close()
+        os.remove(path)
+        raise
+    writer.close()
+    return nrows
+
+
+def benchmark_export(outfile, formats=None, step=1, trace_memory=False):
+    """Export every channel of outfile with each format; returns {fmt: (seconds, MB/s, peak MB)}.
+
+    The peak Python/NumPy allocation is only measured with trace_memory (tracemalloc slows the
+    CSV writer down a lot); otherwise it is reported as NaN.
+    """
+    from Channel_Cache import open_cached_channel_file
+
+    reader = open_cached_channel_file(outfile)
+    _, chanid = reader.get_index()
+    chandata = {'time': reader.read_channel('time')}
+    size_mb = os.path.getsize(outfile) / 1e6
+    results = OrderedDict()
+    with tempfile.TemporaryDirectory() as tmp:
+        for fmt in formats or available_formats():
+            path = os.path.join(tmp, 'export' + EXPORTERS[fmt][0])
+            if trace_memory:
+                tracemalloc.start()
+            t0 = time.perf_counter()
+            export_channels(path, fmt, chanid, chandata, reader=reader, step=step)
+            seconds = time.perf_counter() - t0
+            peak = float('nan')
+            if trace_memory:
+                peak = tracemalloc.get_traced_memory()[1] / 1e6
+                tracemalloc.stop()
+            results[fmt] = (seconds, size_mb / seconds, peak)
+            os.remove(path)
+    return results
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) < 2:
+        print("Uso: python Channel_Export.py archivo.out [formato ...] [--memoria]")
+        sys.exit(1)
+
+    args = [a for a in sys.argv[2:] if a != '--memoria']
+    timings = benchmark_export(sys.argv[1], args or None, trace_memory='--memoria' in sys.argv)
+    for name, (seconds, mb_s, peak_mb) in timings.items():
+        print(f"{name:>8}: {seconds:8.2f} s  {mb_s:8.1f} MB/s  pico de memoria {peak_mb:7.1f} MB")
+    missing = [name for name in EXPORTERS if name not in available_formats()]
+    if missing:
+        print("No disponibles (falta la biblioteca): " + ", ".join(missing))
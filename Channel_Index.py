@@ -0,0 +1,135 @@
+# Channel_Index.py
+# Indice de busqueda de canales construido al cargar el archivo.
+
+# Cada descripcion de canal de PSSE se separa en campos (tipo de cantidad, bus, id de maquina y
+# area si aparece), por ejemplo:
+#   "VOLT 1001 [BUS1001 230.00]"      -> tipo VOLT, bus 1001
+#   "ANGL 3018 [GEN 13.800]1"         -> tipo ANGL, bus 3018, id 1
+#   "POWR 3018 [GEN 13.800]1 AREA 2"  -> tipo POWR, bus 3018, id 1, area 2
+# Con esos campos se arman un indice de palabras (con busqueda por prefijo) y columnas NumPy para
+# consultas estructuradas como "VOLT bus:1000-1999" o "type:ANGL,POWR id:1 area:2".
+
+import bisect
+import difflib
+import re
+
+import numpy as np
+
+_TOKEN_RE = re.compile(r"[A-Za-z]+|\d+(?:\.\d+)?")
+_DESC_RE = re.compile(r"^\s*([A-Za-z_]+)\s*(\d+)?")
+_MACHINE_RE = re.compile(r"\]\s*([A-Za-z0-9]{1,2})\b")
+_AREA_RE = re.compile(r"\bAREA\s*(\d+)", re.IGNORECASE)
+_FIELD_RE = re.compile(r"^(type|bus|id|area):(.+)$", re.IGNORECASE)
+
+MAX_RESULTS = 50
+
+
+def tokenize(text):
+    return [t.upper() for t in _TOKEN_RE.findall(text)]
+
+
+def parse_description(desc):
+    """Return (quantity, bus, machine_id, area) parsed from a channel description."""
+    m = _DESC_RE.match(desc)
+    quantity = m.group(1).upper() if m else ''
+    bus = int(m.group(2)) if m and m.group(2) else -1
+    machine = _MACHINE_RE.search(desc)
+    area = _AREA_RE.search(desc)
+    return quantity, bus, machine.group(1).upper() if machine else '', int(area.group(1)) if area else -1
+
+
+def _parse_int_set(text):
+    """'1000-1999,2500' -> list of (lo, hi) ranges."""
+    ranges = []
+    for part in text.split(','):
+        lo, _, hi = part.strip().partition('-')
+        ranges.append((int(lo), int(hi or lo)))
+    return ranges
+
+
+class ChannelIndex:
+    """Parsed fields, token/prefix index and fuzzy search over the channel descriptions."""
+
+    def __init__(self, chanid):
+        self.chans = [c for c in chanid if c != 'time']
+        self.descs = [chanid[c] for c in self.chans]
+
+        parsed = [parse_description(d) for d in self.descs]
+        self.quantity = np.array([p[0] for p in parsed], dtype=object)
+        self.bus = np.array([p[1] for p in parsed], dtype=np.int64)
+        self.machine = np.array([p[2] for p in parsed], dtype=object)
+        self.area = np.array([p[3] for p in parsed], dtype=np.int64)
+
+        # Palabra -> posiciones de los canales que la contienen
+        postings = {}
+        for pos, desc in enumerate(self.descs):
+            for token in set(tokenize(desc)):
+                postings.setdefault(token, []).append(pos)
+        self.postings = {token: np.array(p, dtype=np.int64) for token, p in postings.items()}
+        self.tokens = sorted(self.postings)
+        self.words = [t for t in self.tokens if t.isalpha()]  # candidatos para errores de tipeo
+
+    def quantities(self):
+        return sorted(set(self.quantity) - {''})
+
+    def _prefix_positions(self, prefix):
+        i = bisect.bisect_left(self.tokens, prefix)
+        matches = []
+        while i < len(self.tokens) and self.tokens[i].startswith(prefix):
+            matches.append(self.postings[self.tokens[i]])
+            i += 1
+        if not matches:
+            return None
+        return np.unique(np.concatenate(matches))
+
+    def _fuzzy_positions(self, token):
+        if not token.isalpha():
+            return None  # un número mal escrito no se corrige
+        close = difflib.get_close_matches(token, self.words, n=5, cutoff=0.75)
+        if not close:
+            return None
+        return np.unique(np.concatenate([self.postings[t] for t in close]))
+
+    def _field_mask(self, field, value):
+        field = field.lower()
+        if field == 'type':
+            wanted = {v.strip().upper() for v in value.split(',')}
+            return np.isin(self.quantity, list(wanted))
+        if field == 'id':
+            wanted = {v.strip().upper() for v in value.split(',')}
+            return np.isin(self.machine, list(wanted))
+        column = self.bus if field == 'bus' else self.area
+        mask = np.zeros(len(self.chans), dtype=bool)
+        for lo, hi in _parse_int_set(value):
+            mask |= (column >= lo) & (column <= hi)
+        return mask
+
+    def search(self, query, limit=MAX_RESULTS):
+        """Channels matching a free-text / structured query, best matches first."""
+        mask = np.ones(len(self.chans), dtype=bool)
+        score = np.zeros(len(self.chans))
+        for term in query.split():
+            field = _FIELD_RE.match(term)
+            if field:
+                try:
+                    mask &= self._field_mask(field.group(1), field.group(2))
+                except ValueError:
+                    return []
+                continue
+            for token in tokenize(term):
+                exact = self.postings.get(token)
+                positions = self._prefix_positions(token)
+                if positions is None:
+                    positions = self._fuzzy_positions(token)
+                if positions is None:
+                    return []
+                term_mask = np.zeros(len(self.chans), dtype=bool)
+                term_mask[positions] = True
+                mask &= term_mask
+                if exact is not None:
+                    score[exact] += 1.0  # palabra completa pesa mas que un prefijo
+
+        # Mejores coincidencias primero y, a igual puntaje, en orden de canal
+        hits = np.flatnonzero(mask)
+        hits = hits[np.argsort(-score[hits], kind='stable')][:limit]
+        return [self.chans[i] for i in hits]
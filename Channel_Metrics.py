@@ -0,0 +1,197 @@
+# Channel_Metrics.py
+# Indicadores de desempeno post-falla calculados para muchos canales a la vez.
+
+# Para cada canal se obtiene, a partir de los instantes de falla y de despeje:
+#   pre        valor antes de la falla (ultima muestra con t < t_falla)
+#   nadir      minimo despues de la falla, y t_nadir su instante
+#   recovery   segundos desde el despeje hasta que el canal vuelve a quedar por encima del umbral
+#              (solo VOLT; 0 si no baja del umbral despues del despeje, NaN si no se recupera)
+#   overshoot  cuanto pasa el canal del valor final despues del despeje, del lado opuesto al que
+#              venia (por encima si se recupera desde abajo, por debajo si baja hacia el final), en %
+#              de la magnitud de la perturbacion
+#   settling   segundos desde el despeje hasta que el canal queda dentro de la banda alrededor del
+#              valor final: +-settling_band * magnitud de la perturbacion, o +-frequency_band Hz en
+#              FREQ (NaN si no se establece)
+#   final      promedio de la ultima ventana de la simulacion
+#   rocof      maxima pendiente |dy/dt| promediada en una ventana, despues de la falla
+# Los canales FREQ (desviacion en p.u.) se pasan a Hz: pre/nadir/final en Hz y rocof en Hz/s.
+# La magnitud de la perturbacion es la excursion del canal despues de la falla (maximo - minimo); no
+# depende del valor final, que en diferencias angulares, desviaciones de velocidad o flujos pequenos
+# puede ser casi cero o negativo. Si la excursion es practicamente nula (canal plano) overshoot y
+# settling quedan en NaN.
+#
+# Todo se calcula sobre bloques 2-D (canales x tiempo) con operaciones por filas, sin recorrer los
+# canales uno por uno.
+
+import csv
+
+import numpy as np
+
+from Channel_Index import parse_description
+from Channel_Reader import OutFileReader, check_cancel
+
+METRIC_FIELDS = ('pre', 'nadir', 't_nadir', 'recovery', 'overshoot', 'settling', 'final', 'rocof')
+
+DEFAULT_METRIC_SETTINGS = {
+    't_fault': 1.0,  # s
+    't_clear': 1.1,  # s
+    'recovery_threshold': 0.9,  # p.u.
+    'settling_band': 0.02,  # fraccion de la magnitud de la perturbacion
+    'frequency_band': 0.02,  # Hz, banda de establecimiento de los canales FREQ
+    'final_window': 1.0,  # s al final de la simulacion
+    'rocof_window': 0.1,  # s
+    'base_frequency': 60.0,  # Hz
+}
+
+_BLOCK_ELEMENTS = 2 * 1024 * 1024
+# Excursion minima (relativa a max(|final|, 1)) para considerar que el canal se perturbo
+MIN_DISTURBANCE = 1e-6
+
+
+class MetricsTable:
+    """Per-channel metrics, aligned with chans (one ndarray per field)."""
+
+    def __init__(self, chans, descriptions, quantities, columns):
+        self.chans = list(chans)
+        self.descriptions = list(descriptions)
+        self.quantities = list(quantities)
+        self.columns = columns
+
+    def __len__(self):
+        return len(self.chans)
+
+    def order(self, field, descending=False):
+        """Row order sorted by field (NaN always last)."""
+        if field == 'chan':
+            keys = np.arange(len(self.chans), dtype=np.float64)
+        else:
+            keys = self.columns[field]
+        keys = -keys if descending else keys
+        return np.argsort(np.where(np.isnan(keys), np.inf, keys), kind='stable')
+
+    def row(self, i):
+        return [self.chans[i], self.descriptions[i]] + [float(self.columns[f][i]) for f in METRIC_FIELDS]
+
+    def write_csv(self, path):
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(('chan', 'description') + METRIC_FIELDS)
+            for i in range(len(self.chans)):
+                writer.writerow(self.row(i))
+
+
+def _last_true(mask):
+    """Index of the last True of each row (-1 if none)."""
+    n = mask.shape[1]
+    flipped = np.argmax(mask[:, ::-1], axis=1)
+    return np.where(mask.any(axis=1), n - 1 - flipped, -1)
+
+
+def _time_after_last(mask, t, t_ref):
+    """Seconds from t_ref to the sample after the last True of each row (0 if none, NaN if at the end)."""
+    last = _last_true(mask)
+    out = np.zeros(mask.shape[0])
+    inside = (last >= 0) & (last < len(t) - 1)
+    out[inside] = t[last[inside] + 1] - t_ref
+    out[last == len(t) - 1] = np.nan
+    return out
+
+
+def block_metrics(block, t, is_volt, is_freq, settings):
+    """Metrics of a 2-D (channels x time) block; is_volt/is_freq are boolean rows masks."""
+    s = settings
+    y = np.array(block, dtype=np.float64)
+    f_base = s['base_frequency']
+    y[is_freq] = f_base * (1.0 + y[is_freq])  # desviacion en p.u. -> Hz
+    n_rows, n = y.shape
+    nan = np.full(n_rows, np.nan)
+    if n == 0:
+        return {field: nan.copy() for field in METRIC_FIELDS}
+
+    # En la marca de la falla hay dos muestras (antes y despues); pre es la anterior
+    i_fault = max(0, int(np.searchsorted(t, s['t_fault'], side='left')) - 1)
+    i_clear = int(np.searchsorted(t, s['t_clear'], side='left'))
+    i_tail = int(np.searchsorted(t, t[-1] - s['final_window'], side='left'))
+    post_fault = y[:, i_fault + 1:] if i_fault + 1 < n else y[:, -1:]
+    post_clear = y[:, i_clear:]
+    t_clear = t[i_clear:]
+
+    with np.errstate(all='ignore'):
+        pre = y[:, i_fault]
+        final = np.nanmean(y[:, i_tail:], axis=1)
+        nadir_idx = np.argmin(np.where(np.isnan(post_fault), np.inf, post_fault), axis=1)
+        nadir = post_fault[np.arange(n_rows), nadir_idx]
+        t_nadir = t[min(i_fault + 1, n - 1):][nadir_idx]
+
+        recovery = nan.copy()
+        if post_clear.shape[1]:
+            below = post_clear < s['recovery_threshold']
+            recovery[is_volt] = _time_after_last(below[is_volt], t_clear, s['t_clear'])
+
+        overshoot = nan.copy()
+        settling = nan.copy()
+        if post_clear.shape[1]:
+            size = np.nanmax(post_fault, axis=1) - np.nanmin(post_fault, axis=1)
+            disturbed = size > MIN_DISTURBANCE * np.maximum(np.abs(final), 1.0)
+            # Lado hacia el que el canal se acerca al final desde el despeje; el sobrepaso es del otro lado
+            direction = np.sign(final - post_clear[:, 0])
+            deviation = post_clear - final[:, np.newaxis]
+            beyond = np.where(direction[:, np.newaxis] == 0, np.abs(deviation),
+                              direction[:, np.newaxis] * deviation)
+            overshoot = np.maximum(0.0, np.nanmax(beyond, axis=1)) / size * 100.0
+            overshoot[~disturbed] = np.nan
+            band = np.where(is_freq, s['frequency_band'], s['settling_band'] * size)[:, np.newaxis]
+            settling = _time_after_last(np.abs(deviation) > band, t_clear, s['t_clear'])
+            settling[~disturbed & ~is_freq] = np.nan
+
+        # Pendiente promedio en ventanas de rocof_window s a partir de cada muestra posterior a la falla
+        starts = np.arange(i_fault, n)
+        ends = np.searchsorted(t, t[starts] + s['rocof_window'], side='left')
+        valid = ends < n
+        starts, ends = starts[valid], ends[valid]
+        rocof = nan.copy()
+        if len(starts):
+            dt = t[ends] - t[starts]
+            ok = dt > 0
+            slopes = (y[:, ends[ok]] - y[:, starts[ok]]) / dt[ok]
+            if slopes.shape[1]:
+                rocof = np.nanmax(np.abs(slopes), axis=1)
+
+    return {'pre': pre, 'nadir': nadir, 't_nadir': t_nadir, 'recovery': recovery, 'overshoot': overshoot,
+            'settling': settling, 'final': final, 'rocof': rocof}
+
+
+def channel_blocks(reader, chandata, chans, n_steps):
+    """Yield (start, 2-D block) of the channels, a block of rows at a time."""
+    rows = max(1, _BLOCK_ELEMENTS // max(1, n_steps))
+    matrix = getattr(reader, 'matrix', None)
+    values = None
+    if matrix is None and isinstance(reader, OutFileReader) and reader.nsteps:
+        values = reader.records()['values']
+    for r0 in range(0, len(chans), rows):
+        part = chans[r0:r0 + rows]
+        if matrix is not None:
+            yield r0, matrix[[reader.column_index(c) for c in part]]
+        elif values is not None:
+            yield r0, values[:, [reader.column_index(c) for c in part]].T
+        else:
+            yield r0, np.vstack([np.asarray(chandata[c], dtype=np.float64) for c in part])
+
+
+def compute_metrics(chanid, chandata, chans=None, reader=None, settings=None, cancel=None):
+    """MetricsTable of chans (default: every channel) over the loaded data."""
+    s = dict(DEFAULT_METRIC_SETTINGS, **(settings or {}))
+    chans = [c for c in (chanid if chans is None else chans) if c != 'time']
+    t = np.asarray(chandata['time'], dtype=np.float64)
+    quantities = [parse_description(chanid[c])[0] for c in chans]
+    is_volt_all = np.array([q == 'VOLT' for q in quantities], dtype=bool)
+    is_freq_all = np.array([q == 'FREQ' for q in quantities], dtype=bool)
+
+    columns = {field: np.full(len(chans), np.nan) for field in METRIC_FIELDS}
+    for r0, block in channel_blocks(reader, chandata, chans, len(t)):
+        check_cancel(cancel)
+        r1 = r0 + len(block)
+        part = block_metrics(block, t, is_volt_all[r0:r1], is_freq_all[r0:r1], s)
+        for field in METRIC_FIELDS:
+            columns[field][r0:r1] = part[field]
+    return MetricsTable(chans, [chanid[c] for c in chans], quantities, columns)
@@ -0,0 +1,257 @@
+# Channel_Reader.py
+# Lectores de archivos de canales (.out / .outx) de simulaciones dinamicas de PSSE.
+
+# Este modulo define una capa de lectores intercambiables. Todos devuelven la misma
+# tupla (short_title, chanid, chandata) que entrega dyntools.CHNF(...).get_data(), de modo
+# que DynamicGraphApp puede usar cualquiera de ellos sin cambios.
+#   - "numpy": lector binario nativo, no requiere PSSE (funciona en Linux).
+#   - "dyntools": envoltura sobre dyntools.CHNF, requiere una instalacion de PSSE.
+
+import os
+import struct
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+
+# Estructura del archivo .out (registros Fortran "unformatted sequential", little-endian).
+# Cada registro va encerrado entre dos marcadores int32 con la longitud del contenido.
+#   registro 1: int32 x 2          -> numero de canales (n), version del formato
+#   registro 2: 2 x 60 caracteres  -> titulo corto (dos lineas)
+#   registro 3: n x 32 caracteres  -> identificador de cada canal (1..n)
+#   registro k: float32 x (n + 1)  -> tiempo seguido del valor de cada canal
+MARKER = struct.Struct('<i')
+TITLE_LINE_LEN = 60
+CHANNEL_ID_LEN = 32
+SAMPLE_DTYPE = np.dtype('<f4')
+TIME_DESC = 'Time(s)'
+
+
+class ChannelFileError(Exception):
+    """Raised when a channel file can't be decoded."""
+
+
+class LoadCancelled(Exception):
+    """Raised inside a loader when its cancel event is set."""
+
+
+def check_cancel(cancel):
+    if cancel is not None and cancel.is_set():
+        raise LoadCancelled()
+
+
+def _read_record(f):
+    head = f.read(MARKER.size)
+    if len(head) < MARKER.size:
+        raise ChannelFileError("Unexpected end of file while reading header")
+    (length,) = MARKER.unpack(head)
+    payload = f.read(length)
+    tail = f.read(MARKER.size)
+    if len(payload) < length or len(tail) < MARKER.size or MARKER.unpack(tail)[0] != length:
+        raise ChannelFileError("Corrupt record markers in channel file header")
+    return payload
+
+
+def _decode_text(raw):
+    return raw.decode('latin-1').rstrip(' \x00')
+
+
+def record_dtype(nchan):
+    """Structured dtype of one sample record: markers around time + n channel values."""
+    return np.dtype([('head', '<i4'), ('values', SAMPLE_DTYPE, (nchan + 1,)), ('tail', '<i4')])
+
+
+class OutFileReader:
+    """Native NumPy reader for PSSE .out channel files."""
+
+    backend = 'numpy'
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            header = _read_record(f)
+            if len(header) < 8:
+                raise ChannelFileError("Channel file header is too short")
+            self.nchan, self.version = struct.unpack('<2i', header[:8])
+            if self.nchan < 0:
+                raise ChannelFileError(f"Invalid channel count: {self.nchan}")
+
+            title = _read_record(f)
+            self.short_title = "\n".join(
+                _decode_text(title[i:i + TITLE_LINE_LEN]) for i in range(0, len(title), TITLE_LINE_LEN)
+            ).strip()
+
+            ids = _read_record(f) if self.nchan else b''
+            if len(ids) != self.nchan * CHANNEL_ID_LEN:
+                raise ChannelFileError("Channel identifier record doesn't match channel count")
+            self.chanid = OrderedDict([('time', TIME_DESC)])
+            for i in range(self.nchan):
+                self.chanid[i + 1] = _decode_text(ids[i * CHANNEL_ID_LEN:(i + 1) * CHANNEL_ID_LEN])
+
+            self.data_offset = f.tell()
+
+        self.dtype = record_dtype(self.nchan)
+
+    @property
+    def nsteps(self):
+        # Solo registros completos; un registro final a medio escribir se ignora
+        size = os.path.getsize(self.path)
+        return max(0, (size - self.data_offset) // self.dtype.itemsize)
+
+    def read_samples(self):
+        """Return a (steps, n + 1) float32 array; column 0 is time."""
+        records = np.fromfile(self.path, dtype=self.dtype, count=self.nsteps, offset=self.data_offset)
+        marker = self.dtype['values'].itemsize
+        if records.size and not ((records['head'] == marker).all() and (records['tail'] == marker).all()):
+            raise ChannelFileError("Corrupt sample records in channel file")
+        return records['values']
+
+    def records(self):
+        # Mapeo en memoria de los registros completos; no lee nada hasta que se accede
+        return np.memmap(self.path, dtype=self.dtype, mode='r', offset=self.data_offset, shape=(self.nsteps,))
+
+    def column_index(self, chan):
+        if chan == 'time':
+            return 0
+        if not 1 <= chan <= self.nchan:
+            raise KeyError(chan)
+        return chan
+
+    def read_channel(self, chan):
+        """Read a single channel ('time' or 1..n) as a contiguous float32 array."""
+        col = self.column_index(chan)
+        if not self.nsteps:
+            return np.empty(0, dtype=SAMPLE_DTYPE)
+        return np.array(self.records()['values'][:, col])
+
+    def get_index(self):
+        """Return (short_title, chanid) without reading any samples."""
+        return self.short_title, OrderedDict(self.chanid)
+
+    def get_data(self):
+        samples = self.read_samples()
+        chandata = {'time': np.ascontiguousarray(samples[:, 0])}
+        for i in range(1, self.nchan + 1):
+            chandata[i] = np.ascontiguousarray(samples[:, i])
+        return self.short_title, OrderedDict(self.chanid), chandata
+
+
+# PSSE no es seguro entre hilos: las llamadas a dyntools se serializan
+_DYNTOOLS_LOCK = threading.Lock()
+
+# PSSE V_35; para V_36 usar r"C:\Program Files\PTI\PSSE36\36.1\PSSPY311" e "import psse36"
+PSSPY_PATH = r'C:\Program Files\PTI\PSSE35\35.5\PSSPY39'
+_psse_ready = False
+
+
+def init_psse():
+    """Import and initialize PSSE the first time the dyntools backend is used."""
+    global _psse_ready
+    with _DYNTOOLS_LOCK:
+        if _psse_ready:
+            return
+        if PSSPY_PATH not in sys.path:
+            sys.path.append(PSSPY_PATH)
+        try:
+            import psse35  # type: ignore
+            import psspy  # type: ignore
+        except ImportError as e:
+            raise ChannelFileError("dyntools backend is not available (PSSE not installed)") from e
+        psspy.psseinit()
+        _psse_ready = True
+
+
+class DyntoolsReader:
+    """Reader backed by dyntools.CHNF (requires a PSSE installation)."""
+
+    backend = 'dyntools'
+
+    def __init__(self, path):
+        init_psse()
+        try:
+            import dyntools  # type: ignore
+        except ImportError as e:
+            raise ChannelFileError("dyntools backend is not available (PSSE not installed)") from e
+        self.path = path
+        with _DYNTOOLS_LOCK:
+            self.chnfobj = dyntools.CHNF(path)
+        self._data = None
+
+    def get_data(self):
+        if self._data is None:
+            with _DYNTOOLS_LOCK:
+                self._data = self.chnfobj.get_data()
+        return self._data
+
+    def get_index(self):
+        # CHNF ya analiza el archivo completo al abrirlo, no hay lectura parcial posible
+        short_title, chanid, _ = self.get_data()
+        return short_title, chanid
+
+
+# Registro de lectores disponibles, en orden de preferencia para backend='auto'
+READERS = OrderedDict([
+    ('numpy', OutFileReader),
+    ('dyntools', DyntoolsReader),
+])
+
+
+def register_reader(name, reader_cls):
+    """Register a reader class; it must accept a path and provide get_data()."""
+    READERS[name] = reader_cls
+
+
+def open_channel_file(path, backend='auto'):
+    """Open a channel file with the requested backend ('auto' tries each in order)."""
+    if backend != 'auto':
+        if backend not in READERS:
+            raise ValueError(f"Unknown channel reader backend: {backend}")
+        return READERS[backend](path)
+
+    errors = []
+    for name, reader_cls in READERS.items():
+        # El lector nativo solo entiende el formato .out sin comprimir
+        if name == 'numpy' and path.lower().endswith('.outx'):
+            continue
+        try:
+            return reader_cls(path)
+        except ChannelFileError as e:
+            errors.append(f"{name}: {e}")
+    raise ChannelFileError("No reader could open the file:\n" + "\n".join(errors))
+
+
+def benchmark_backends(path, repeat=3):
+    """Time get_data() with every available backend; returns {backend: (best_s, MB/s)}."""
+    size_mb = os.path.getsize(path) / 1e6
+    results = OrderedDict()
+    for name in READERS:
+        best = float('inf')
+        try:
+            for _ in range(repeat):
+                t0 = time.perf_counter()
+                open_channel_file(path, backend=name).get_data()
+                best = min(best, time.perf_counter() - t0)
+        except ChannelFileError as e:
+            print(f"{name:>10}: no disponible ({e})")
+            continue
+        results[name] = (best, size_mb / best if best > 0 else float('inf'))
+    return results
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) < 2:
+        print("Uso: python Channel_Reader.py archivo.out [repeticiones]")
+        sys.exit(1)
+
+    outfile = sys.argv[1]
+    n_repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    timings = benchmark_backends(outfile, n_repeat)
+    for backend_name, (seconds, mb_s) in timings.items():
+        print(f"{backend_name:>10}: {seconds * 1000:9.1f} ms  {mb_s:9.1f} MB/s")
+    if 'numpy' in timings and 'dyntools' in timings:
+        print(f"Aceleracion numpy vs dyntools: {timings['dyntools'][0] / timings['numpy'][0]:.1f}x")
@@ -0,0 +1,142 @@
+# Channel_Stats.py
+# Tabla de estadisticas por canal calculada una sola vez al cargar el archivo.
+
+# Para cada canal (incluido el tiempo) se guardan minimo, maximo, rango, valor inicial, valor final
+# y numero de NaN. generate_plot usa esta tabla para ordenar por rango, repartir las variables entre
+# los dos ejes Y y calcular los limites automaticos sin recorrer los datos en cada grafica.
+# El calculo es vectorizado y por bloques, de modo que la memoria usada no depende del archivo.
+
+import numpy as np
+
+from Channel_Reader import OutFileReader, check_cancel
+
+STAT_FIELDS = ('min', 'max', 'range', 'initial', 'final', 'nan_count')
+# Elementos por bloque al recorrer los datos (limita la memoria usada)
+_BLOCK_ELEMENTS = 4 * 1024 * 1024
+
+# Criterios de orden para la lista de canales: nombre -> (campo, descendente)
+SORT_OPTIONS = {
+    'Número': (None, False),
+    'Rango (mayor a menor)': ('range', True),
+    'Mínimo (menor a mayor)': ('min', False),
+    'Máximo (mayor a menor)': ('max', True),
+    'Valor final (mayor a menor)': ('final', True),
+    'NaN (más primero)': ('nan_count', True),
+}
+
+
+class ChannelStats:
+    """Per-channel min/max/range/initial/final/NaN-count table."""
+
+    def __init__(self, chans, columns):
+        self.chans = list(chans)
+        self.row = {chan: i for i, chan in enumerate(self.chans)}
+        self.columns = columns  # campo -> ndarray alineado con self.chans
+
+    def __contains__(self, chan):
+        return chan in self.row
+
+    def __getitem__(self, field):
+        return self.columns[field]
+
+    def get(self, chan):
+        """Return the stats of one channel as a dict (None if unknown)."""
+        i = self.row.get(chan)
+        if i is None:
+            return None
+        return {field: self.columns[field][i].item() for field in STAT_FIELDS}
+
+    def value_range(self, chan):
+        i = self.row[chan]
+        return float(self.columns['min'][i]), float(self.columns['max'][i])
+
+    def sort_channels(self, chans, field, descending=False):
+        """Sort channel keys by a stats field (NaN last); unknown channels keep their order at the end."""
+        known = [c for c in chans if c in self.row]
+        unknown = [c for c in chans if c not in self.row]
+        values = self.columns[field][[self.row[c] for c in known]].astype(float)
+        keys = -values if descending else values
+        order = np.argsort(np.where(np.isnan(keys), np.inf, keys), kind='stable')
+        return [known[i] for i in order] + unknown
+
+    def filter_channels(self, chans, min_range=None, max_nan=None):
+        out = []
+        for chan in chans:
+            i = self.row.get(chan)
+            if i is None:
+                out.append(chan)
+                continue
+            if min_range is not None and not self.columns['range'][i] > min_range:
+                continue
+            if max_nan is not None and self.columns['nan_count'][i] > max_nan:
+                continue
+            out.append(chan)
+        return out
+
+
+def rows_stats(block):
+    """Vectorized stats of a 2-D (channels x time) block."""
+    block = np.asarray(block, dtype=np.float64)
+    n_rows, n_steps = block.shape
+    if n_steps == 0:
+        nan = np.full(n_rows, np.nan)
+        return {'min': nan, 'max': nan.copy(), 'range': nan.copy(), 'initial': nan.copy(),
+                'final': nan.copy(), 'nan_count': np.zeros(n_rows, dtype=np.int64)}
+    # fmin/fmax ignoran NaN sin emitir advertencias
+    vmin = np.fmin.reduce(block, axis=1)
+    vmax = np.fmax.reduce(block, axis=1)
+    return {
+        'min': vmin,
+        'max': vmax,
+        'range': vmax - vmin,
+        'initial': block[:, 0].copy(),
+        'final': block[:, -1].copy(),
+        'nan_count': np.isnan(block).sum(axis=1),
+    }
+
+
+def _merge_columns(parts):
+    return {field: np.concatenate([p[field] for p in parts]) for field in STAT_FIELDS}
+
+
+def compute_channel_stats(reader, chanid, chandata=None, cancel=None):
+    """Build the stats table for every channel of an open reader."""
+    chans = list(chanid)
+
+    matrix = getattr(reader, 'matrix', None)
+    if matrix is not None:
+        # Cache columnar: cada canal es una fila contigua, se procesan bloques de filas
+        rows = max(1, _BLOCK_ELEMENTS // max(1, matrix.shape[1]))
+        parts = []
+        for r0 in range(0, matrix.shape[0], rows):
+            check_cancel(cancel)
+            parts.append(rows_stats(matrix[r0:r0 + rows]))
+        return ChannelStats(chans, _merge_columns(parts))
+
+    if isinstance(reader, OutFileReader):
+        # Registros por paso de tiempo: se acumula por bloques de tiempo
+        n_cols = reader.nchan + 1
+        values = reader.records()['values'] if reader.nsteps else np.empty((0, n_cols))
+        steps = max(1, _BLOCK_ELEMENTS // n_cols)
+        acc = None
+        for t0 in range(0, len(values), steps):
+            check_cancel(cancel)
+            part = rows_stats(np.asarray(values[t0:t0 + steps]).T)
+            if acc is None:
+                acc = part
+                continue
+            acc['min'] = np.fmin(acc['min'], part['min'])
+            acc['max'] = np.fmax(acc['max'], part['max'])
+            acc['final'] = part['final']
+            acc['nan_count'] += part['nan_count']
+        if acc is None:
+            acc = rows_stats(np.empty((n_cols, 0)))
+        acc['range'] = acc['max'] - acc['min']
+        return ChannelStats(['time'] + list(range(1, reader.nchan + 1)), acc)
+
+    # Datos ya materializados (dyntools): un canal a la vez
+    parts = []
+    for chan in chans:
+        check_cancel(cancel)
+        parts.append(rows_stats(np.asarray(chandata[chan], dtype=np.float64)[np.newaxis, :]))
+    return ChannelStats(chans, _merge_columns(parts))
@@ -0,0 +1,143 @@
+# Channel_Store.py
+# Almacenamiento de los datos de canales cargados por DynamicGraphApp.
+
+# LazyChannelData se comporta como el diccionario chandata de dyntools ({'time': [...], 1: [...], ...})
+# pero solo lee un canal del archivo cuando se pide por primera vez. Los canales leidos se guardan
+# en una cache LRU limitada por un presupuesto de memoria; al excederlo se descartan los menos usados.
+#
+# ChannelMatrix guarda todos los canales de un lector sin lectura por canal (dyntools entrega listas
+# de Python, ~32 bytes por muestra) en una sola matriz (n + 1) x pasos de float64, o float32 para
+# archivos muy anchos (los .out guardan float32, asi que no se pierde precision), con la fila 0 =
+# tiempo y un indice canal -> fila. Cada canal es una vista de su fila, sin copia, y la matriz se
+# expone como la del cache columnar (matrix, column_index) para estadisticas, metricas y exportacion.
+
+from collections import OrderedDict
+
+import numpy as np
+
+from Channel_Reader import check_cancel
+
+# Presupuesto de memoria por defecto para los canales en cache (bytes)
+DEFAULT_MEMORY_BUDGET = 256 * 1024 * 1024
+
+
+class LazyChannelData:
+    """Dict-like channel data that reads channels on demand and keeps them in an LRU cache."""
+
+    def __init__(self, reader, chanid, memory_budget=DEFAULT_MEMORY_BUDGET):
+        self.reader = reader
+        self.chanid = chanid
+        self.memory_budget = memory_budget
+        self._cache = OrderedDict()
+        self._cached_bytes = 0
+        # El canal de tiempo lo usan todas las graficas, se mantiene fuera de la LRU
+        self._time = None
+
+    def __getitem__(self, chan):
+        if chan == 'time':
+            if self._time is None:
+                self._time = self.reader.read_channel('time')
+            return self._time
+        if chan not in self.chanid:
+            raise KeyError(chan)
+        if getattr(self.reader, 'zero_copy', False):
+            # Vistas de un archivo mapeado en memoria: no ocupan memoria propia, no hace falta la LRU
+            return self.reader.read_channel(chan)
+
+        data = self._cache.get(chan)
+        if data is not None:
+            self._cache.move_to_end(chan)
+            return data
+
+        data = self.reader.read_channel(chan)
+        self._cache[chan] = data
+        self._cached_bytes += data.nbytes
+        self._evict(keep=chan)
+        return data
+
+    def _evict(self, keep=None):
+        while self._cached_bytes > self.memory_budget and len(self._cache) > 1:
+            oldest = next(iter(self._cache))
+            if oldest == keep:
+                break
+            self._cached_bytes -= self._cache.pop(oldest).nbytes
+
+    def set_memory_budget(self, memory_budget):
+        self.memory_budget = memory_budget
+        self._evict()
+
+    def get(self, chan, default=None):
+        try:
+            return self[chan]
+        except KeyError:
+            return default
+
+    def __contains__(self, chan):
+        return chan in self.chanid
+
+    def __iter__(self):
+        return iter(self.chanid)
+
+    def __len__(self):
+        return len(self.chanid)
+
+    def keys(self):
+        return self.chanid.keys()
+
+    def cached_channels(self):
+        return list(self._cache)
+
+    @property
+    def cached_bytes(self):
+        return self._cached_bytes + (self._time.nbytes if self._time is not None else 0)
+
+    def clear(self):
+        self._cache.clear()
+        self._cached_bytes = 0
+        self._time = None
+
+
+class ChannelMatrix:
+    """Reader-like store of every channel as a row of one 2-D array; channels are zero-copy row views."""
+
+    backend = 'matrix'
+    zero_copy = True
+
+    def __init__(self, short_title, chanid, matrix):
+        self.short_title = short_title
+        self.chanid = OrderedDict(chanid)
+        self.matrix = matrix
+        self.rows = {chan: row for row, chan in enumerate(self.chanid)}
+        self.nchan = len(self.chanid) - 1
+        self.nsteps = matrix.shape[1]
+
+    @classmethod
+    def from_reader(cls, reader, dtype=np.float64, cancel=None):
+        """Copy the channels of reader.get_data() into one matrix (time first)."""
+        short_title, chanid, chandata = reader.get_data()
+        # El tiempo va primero, como en el cache columnar
+        chanid = OrderedDict([('time', chanid.get('time', 'Time(s)'))] +
+                             [(chan, desc) for chan, desc in chanid.items() if chan != 'time'])
+        matrix = np.empty((len(chanid), len(chandata['time'])), dtype=dtype)
+        for row, chan in enumerate(chanid):
+            if row % 256 == 0:
+                check_cancel(cancel)
+            matrix[row] = chandata[chan]
+        return cls(short_title, chanid, matrix)
+
+    @property
+    def nbytes(self):
+        return self.matrix.nbytes
+
+    def column_index(self, chan):
+        return self.rows[chan]
+
+    def read_channel(self, chan):
+        return self.matrix[self.rows[chan]]
+
+    def get_index(self):
+        return self.short_title, OrderedDict(self.chanid)
+
+    def get_data(self):
+        chandata = {chan: self.matrix[row] for chan, row in self.rows.items()}
+        return self.short_title, OrderedDict(self.chanid), chandata
@@ -0,0 +1,239 @@
+# Dashboard.py
+# Tablero de multiplos pequenos: una cuadricula de subgraficas que comparten el eje de tiempo.
+
+# Los canales de una consulta (la misma sintaxis de Channel_Index, p. ej. "type:VOLT,FREQ bus:1000-1999")
+# se agrupan en paneles: uno por tipo de cantidad, por bus o por canal. Todas las lineas de un panel
+# son una sola LineCollection con los datos reducidos (Plot_Decimation.m4_indices) al ancho en pixeles
+# del panel, asi que 50+ paneles se dibujan en una sola pasada. Al hacer zoom (el eje X de todos los
+# paneles se mantiene igual) se vuelven a reducir todas las series al tramo visible.
+# Con muchos paneles lo caro son las marcas de los ejes, no las lineas: pocas marcas por panel, un
+# formato de etiquetas simple (sin desplazamiento ni notacion matematica), etiquetas de ejes con
+# posicion fija donde se puede, y el eje X enlazado a mano en lugar de sharex (que en cada dibujo
+# recorre todos los ejes hermanos de cada eje).
+# Como Plot_Render, no importa pyplot ni Tk: trabaja sobre una Figure de Matplotlib (que se importa
+# al dibujar, para no retrasar el arranque de la ventana).
+
+from collections import OrderedDict
+
+import numpy as np
+
+from Plot_Decimation import decimate, is_monotonic
+from Plot_Render import LINE_COLORS, padded_limits
+
+GROUPS = ('type', 'bus', 'channel')
+MAX_PANELS = 64
+MAX_LINES_PER_PANEL = 40
+PANEL_LINE_WIDTH = 0.8
+TITLE_CHARS = 160  # caracteres de titulo por fila de paneles
+X_TICKS = 4  # marcas por panel (a lo sumo)
+Y_TICKS = 3
+
+
+def _shorten(text, n):
+    return text if len(text) <= n else text[:n - 1] + '…'
+
+
+def group_channels(index, chans, group='type', max_panels=MAX_PANELS, max_lines=MAX_LINES_PER_PANEL):
+    """[(panel title, [chans])] of chans grouped by quantity type, bus or channel (query order kept)."""
+    if group not in GROUPS:
+        raise ValueError(f"Unknown dashboard grouping: {group}")
+    position = {chan: pos for pos, chan in enumerate(index.chans)}
+    panels = OrderedDict()
+    for chan in chans:
+        pos = position[chan]
+        if group == 'type':
+            key = index.quantity[pos] or '?'
+        elif group == 'bus':
+            key = f"Bus {index.bus[pos]}" if index.bus[pos] >= 0 else '?'
+        else:
+            key = f"{chan}: {index.descs[pos]}"
+        members = panels.get(key)
+        if members is None:
+            if len(panels) >= max_panels:
+                continue
+            members = panels[key] = []
+        if len(members) < max_lines:
+            members.append(chan)
+    return list(panels.items())
+
+
+def grid_shape(n_panels, cols=None):
+    """(rows, cols) of a grid holding n_panels, about twice as wide as tall unless cols is given."""
+    if n_panels <= 0:
+        return 1, 1
+    if not cols:
+        cols = max(1, int(np.ceil(np.sqrt(2 * n_panels))))
+    cols = min(int(cols), n_panels)
+    return -(-n_panels // cols), cols
+
+
+def _tick_formatter():
+    from matplotlib.ticker import Formatter
+
+    class StepFormatter(Formatter):
+        """Plain tick labels with just the decimals the tick step needs."""
+
+        def __init__(self):
+            self.fmt = '{:g}'
+
+        def set_locs(self, locs):
+            super().set_locs(locs)
+            locs = np.asarray(locs, dtype=np.float64)
+            steps = np.abs(np.diff(locs))
+            tolerance = 1e-6 * float(np.min(steps)) if len(steps) and np.min(steps) > 0 else 0.0
+            decimals = 0
+            while decimals < 12 and np.max(np.abs(np.round(locs, decimals) - locs), initial=0.0) > tolerance:
+                decimals += 1
+            self.fmt = f'{{:.{decimals}f}}'
+
+        def __call__(self, x, pos=None):
+            text = self.fmt.format(x)
+            return text[1:] if text.startswith('-') and not text.strip('-0.') else text  # sin "-0"
+
+    return StepFormatter()
+
+
+class Dashboard:
+    """Grid of panels sharing the time axis; each panel draws its channels as one LineCollection."""
+
+    def __init__(self, fig):
+        self.fig = fig
+        self.axes = []
+        self.panels = []  # (LineCollection, [y completo por canal])
+        self.t = None
+        self.grid = None  # matriz de Axes; se reutiliza mientras no cambie la forma de la cuadricula
+        self._cids = []  # (Axes, id del callback xlim_changed)
+        self._syncing = False
+
+    def build(self, t, panels, channel_data, settings, x_label="Tiempo (s)", cols=None, window=None):
+        """Lay out the grid and draw panels [(title, chans)]; channel_data(chan) gives the Y data."""
+        from matplotlib.collections import LineCollection
+        from matplotlib.ticker import NullFormatter
+
+        self.t = np.asarray(t)
+        for ax, cid in self._cids:
+            ax.callbacks.disconnect(cid)
+        self._cids = []
+        for collection, _ in self.panels:
+            collection.remove()
+        self.axes = []
+        self.panels = []
+
+        rows, cols = grid_shape(len(panels), cols)
+        if self.grid is None or self.grid.shape != (rows, cols) or not panels:
+            # Crear y borrar ejes es lo mas caro del tablero: solo se hace si cambia la cuadricula
+            self.fig.clear()
+            self.grid = None
+            if not panels:
+                return
+            self.grid = self.fig.subplots(rows, cols, squeeze=False)
+            self.fig.subplots_adjust(left=0.05, right=0.98, bottom=0.07, top=0.92, wspace=0.3, hspace=0.45)
+        grid = self.grid
+        # Los limites Y escritos son de la grafica principal: cada panel se autoescala
+        font = {'fontfamily': settings['font_family'], 'fontsize': max(6, settings['font_size'] - 2)}
+        n_buckets = self._n_buckets(grid[0][0])
+        x_range = window
+
+        for i, ax in enumerate(grid.flat):
+            ax.set_visible(i < len(panels))
+            if i >= len(panels):
+                continue
+            title, chans = panels[i]
+            ys = [np.asarray(channel_data(chan)) for chan in chans]
+            segments = [self._segment(y, n_buckets, x_range) for y in ys]
+            collection = LineCollection(segments, linewidths=PANEL_LINE_WIDTH,
+                                        colors=[LINE_COLORS[k % len(LINE_COLORS)] for k in range(len(ys))])
+            ax.add_collection(collection, autolim=False)
+
+            # Limites Y desde los datos completos (dentro de la ventana, si la hay)
+            lo, hi = self._y_range(ys, window)
+            if np.isfinite(lo) and np.isfinite(hi):
+                ax.set_ylim(*padded_limits(lo, hi, flat_padding=max(abs(lo) * 0.05, 1e-3)))
+            bottom = i + cols >= len(panels)
+            # Titulo con "y" fijo: Matplotlib no recalcula su posicion en cada dibujo (lento con muchos paneles)
+            ax.set_title(_shorten(title, max(12, TITLE_CHARS // cols)), y=1.0, pad=2, **font)
+            ax.set_xlabel((settings['xlabel'] or x_label) if bottom else '', **font)
+            ax.set_ylabel('')
+            ax.yaxis.set_label_coords(-0.1, 0.5)  # sin etiqueta: posicion fija, no se calcula al dibujar
+            if not bottom:
+                ax.xaxis.set_label_coords(0.5, -0.1)
+            ax.grid(settings['grid'])
+            ax.locator_params(axis='x', nbins=X_TICKS)
+            ax.locator_params(axis='y', nbins=Y_TICKS)
+            # Las etiquetas X ocultas no se formatean; tambien sobre los huecos de la ultima fila
+            ax.xaxis.set_major_formatter(_tick_formatter() if bottom else NullFormatter())
+            ax.yaxis.set_major_formatter(_tick_formatter())
+            ax.tick_params(labelbottom=bottom, labelsize=font['fontsize'], labelfontfamily=font['fontfamily'])
+            self.axes.append(ax)
+            self.panels.append((collection, ys))
+
+        x_limits = self._x_limits(settings, window)
+        if x_limits is not None:
+            for ax in self.axes:
+                ax.set_xlim(*x_limits)
+        self.fig.suptitle(settings['title'].strip(), fontfamily=settings['font_family'],
+                          fontsize=settings['font_size'])
+        self._cids = [(ax, ax.callbacks.connect('xlim_changed', self._on_xlim_changed)) for ax in self.axes]
+
+    def _x_limits(self, settings, window):
+        try:
+            if settings['xlim_min'] and settings['xlim_max']:
+                return float(settings['xlim_min']), float(settings['xlim_max'])
+        except ValueError:
+            pass  # Limites escritos invalidos: se usan los de los datos
+        if len(self.t):
+            return window or (float(self.t[0]), float(self.t[-1]))
+        return None
+
+    def _on_xlim_changed(self, ax):
+        # Zoom o desplazamiento en un panel: los demas siguen su eje X (sin volver a emitir)
+        if self._syncing:
+            return
+        self._syncing = True
+        try:
+            x_limits = ax.get_xlim()
+            for other in self.axes:
+                if other is not ax:
+                    other.set_xlim(x_limits, emit=False)
+        finally:
+            self._syncing = False
+        self.refresh()
+
+    def _n_buckets(self, ax):
+        width = ax.get_window_extent().width
+        return max(50, int(width)) if np.isfinite(width) else 200
+
+    def _segment(self, y, n_buckets, x_range):
+        if len(y) != len(self.t):
+            return np.empty((0, 2))
+        if is_monotonic(self.t):
+            x, y = decimate(self.t, y, n_buckets, x_range)
+        else:
+            x = self.t
+        return np.column_stack((x, y))
+
+    def _y_range(self, ys, window):
+        lo, hi = np.inf, -np.inf
+        for y in ys:
+            if len(y) != len(self.t) or not len(y):
+                continue
+            if window is not None:
+                i0, i1 = np.searchsorted(self.t, window[0]), np.searchsorted(self.t, window[1], side='right')
+                y = y[i0:i1] if i1 > i0 else y
+            with np.errstate(invalid='ignore'):
+                y_lo, y_hi = np.nanmin(y), np.nanmax(y)
+            if np.isfinite(y_lo):
+                lo, hi = min(lo, float(y_lo)), max(hi, float(y_hi))
+        return lo, hi
+
+    def refresh(self):
+        """Re-decimate every panel to the visible time range."""
+        if not self.axes:
+            return
+        n_buckets = self._n_buckets(self.axes[0])
+        x_range = self.axes[0].get_xlim()
+        for collection, ys in self.panels:
+            collection.set_segments([self._segment(y, n_buckets, x_range) for y in ys])
+
+    def point_count(self):
+        return sum(len(segment) for collection, _ in self.panels for segment in collection.get_segments())
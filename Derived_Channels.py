@@ -0,0 +1,260 @@
+# Derived_Channels.py
+# Canales calculados a partir de otros canales con expresiones de NumPy.
+
+# Sintaxis de las expresiones:
+#   c12                 canal numero 12
+#   ch("ANGL 3018")     canal por descripcion (exacta, o un fragmento que identifique un solo canal)
+#   t                   tiempo (s)
+#   + - * / ** %, parentesis y numeros
+#   abs sqrt exp log log10 sin cos tan deg rad fmin fmax
+#   wrap(x)             angulo llevado a [-180, 180)
+#   ddt(x)              derivada respecto al tiempo (NaN en las marcas de tiempo repetidas)
+#   rolling(x, s)       promedio movil de los ultimos s segundos
+#   initial(x), final(x)  primer / ultimo valor (p. ej. x / initial(x) para pasar a p.u.)
+# Ejemplos: "wrap(c3 - c5)", "c7 * 60 * 1000", "c10**2 + c11**2", "ddt(c1)", "rolling(c2, 0.5)"
+#
+# La expresion se valida sobre su arbol (ast) contra una lista blanca de nodos y funciones y se
+# compila una sola vez; al evaluarla solo se leen los canales que usa. Las potencias con exponente
+# constante grande o cuyo valor constante no cabe en un float se rechazan (p. ej. 9**9**9 colgaria
+# la ventana calculando un entero enorme). El resultado queda en cache
+# hasta que cambia alguno de sus canales de entrada (otro archivo, datos en vivo, recarga del LRU).
+
+import ast
+import re
+
+import numpy as np
+
+
+class ExpressionError(ValueError):
+    """Raised when a derived channel expression is invalid."""
+
+
+def _wrap(x):
+    return (x + 180.0) % 360.0 - 180.0
+
+
+def _initial(x):
+    return x[0] if len(x) else np.nan
+
+
+def _final(x):
+    return x[-1] if len(x) else np.nan
+
+
+def _ddt(x, t):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        d = np.gradient(x, t) if len(x) > 1 else np.zeros_like(x)
+    d[~np.isfinite(d)] = np.nan
+    return d
+
+
+def _rolling(x, seconds, t):
+    """Trailing mean over the window (t - seconds, t] (NaN samples are skipped)."""
+    valid = ~np.isnan(x)
+    sums = np.concatenate(([0.0], np.cumsum(np.where(valid, x, 0.0))))
+    counts = np.concatenate(([0], np.cumsum(valid)))
+    end = np.arange(1, len(x) + 1)
+    start = np.searchsorted(t, t - seconds, side='right')
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return (sums[end] - sums[start]) / (counts[end] - counts[start])
+
+
+FUNCTIONS = {
+    'abs': np.abs, 'sqrt': np.sqrt, 'exp': np.exp, 'log': np.log, 'log10': np.log10,
+    'sin': np.sin, 'cos': np.cos, 'tan': np.tan, 'deg': np.degrees, 'rad': np.radians,
+    'fmin': np.fmin, 'fmax': np.fmax, 'wrap': _wrap, 'initial': _initial, 'final': _final,
+}
+TIME_FUNCTIONS = {'ddt': _ddt, 'rolling': _rolling}  # reciben el tiempo como ultimo argumento
+CONSTANTS = {'pi': np.pi}
+ARGUMENTS = {'fmin': 2, 'fmax': 2, 'rolling': 2}  # numero de argumentos (1 si no aparece)
+
+_ALLOWED_NODES = (ast.Expression, ast.BinOp, ast.UnaryOp, ast.Call, ast.Name, ast.Load, ast.Constant,
+                  ast.Add, ast.Sub, ast.Mult, ast.Div, ast.Pow, ast.Mod, ast.USub, ast.UAdd)
+_CHANNEL_RE = re.compile(r"^c(\d+)$")
+MAX_EXPONENT = 1000  # modulo maximo de un exponente constante
+
+_FOLD = {ast.Add: lambda a, b: a + b, ast.Sub: lambda a, b: a - b, ast.Mult: lambda a, b: a * b,
+         ast.Div: lambda a, b: a / b, ast.Mod: lambda a, b: a % b, ast.Pow: lambda a, b: a ** b}
+
+
+def _constant_value(node):
+    """Value (as a float) of a subtree made only of numbers, or None if it uses channels or can't be folded."""
+    if isinstance(node, ast.Constant):
+        try:
+            return float(node.value)
+        except OverflowError:
+            raise ExpressionError("Number too large")
+    if isinstance(node, ast.Name):
+        return CONSTANTS.get(node.id)
+    if isinstance(node, ast.UnaryOp):
+        value = _constant_value(node.operand)
+        if value is None:
+            return None
+        return -value if isinstance(node.op, ast.USub) else value
+    if isinstance(node, ast.BinOp):
+        left, right = _constant_value(node.left), _constant_value(node.right)
+        if left is None or right is None:
+            return None
+        try:
+            value = _FOLD[type(node.op)](left, right)
+        except OverflowError:
+            raise ExpressionError("Number too large")
+        except ZeroDivisionError:
+            return None
+        return value if isinstance(value, float) else None  # base negativa con exponente fraccionario
+    return None
+
+
+def find_channel(chanid, text):
+    """Channel number whose description is text, or the only one that contains it."""
+    exact = [c for c, desc in chanid.items() if c != 'time' and desc.strip() == text.strip()]
+    if len(exact) == 1:
+        return exact[0]
+    needle = text.strip().upper()
+    matches = [c for c, desc in chanid.items() if c != 'time' and needle in desc.upper()]
+    if len(matches) != 1:
+        raise ExpressionError(f'ch("{text}") matches {len(matches)} channels')
+    return matches[0]
+
+
+class _Compiler(ast.NodeTransformer):
+    """Check the tree and replace ch("...") with the channel name; collects the inputs."""
+
+    def __init__(self, chanid):
+        self.chanid = chanid
+        self.inputs = set()
+
+    def generic_visit(self, node):
+        if not isinstance(node, _ALLOWED_NODES):
+            raise ExpressionError(f"Not allowed in an expression: {type(node).__name__}")
+        return super().generic_visit(node)
+
+    def visit_Constant(self, node):
+        if not isinstance(node.value, (int, float)) or isinstance(node.value, bool):
+            raise ExpressionError(f"Not allowed in an expression: {node.value!r}")
+        return node
+
+    def visit_BinOp(self, node):
+        node = self.generic_visit(node)
+        if isinstance(node.op, ast.Pow):
+            # Los enteros de Python no tienen limite: se verifica en float antes de permitir la potencia
+            exponent = _constant_value(node.right)
+            if exponent is not None and abs(exponent) > MAX_EXPONENT:
+                raise ExpressionError(f"Exponent too large (max {MAX_EXPONENT}): {exponent:g}")
+            _constant_value(node)
+        return node
+
+    def visit_Name(self, node):
+        match = _CHANNEL_RE.match(node.id)
+        if match:
+            chan = int(match.group(1))
+            if chan not in self.chanid:
+                raise ExpressionError(f"Channel {chan} doesn't exist")
+            self.inputs.add(chan)
+        elif node.id == 't':
+            self.inputs.add('time')
+        elif node.id not in CONSTANTS:
+            raise ExpressionError(f"Unknown name: {node.id}")
+        return node
+
+    def visit_Call(self, node):
+        if not isinstance(node.func, ast.Name) or node.keywords:
+            raise ExpressionError("Only simple function calls are allowed")
+        name = node.func.id
+        if name == 'ch':
+            if len(node.args) != 1 or not isinstance(node.args[0], ast.Constant) \
+                    or not isinstance(node.args[0].value, str):
+                raise ExpressionError('ch() takes one quoted channel description')
+            chan = find_channel(self.chanid, node.args[0].value)
+            self.inputs.add(chan)
+            return ast.copy_location(ast.Name(id=f"c{chan}", ctx=ast.Load()), node)
+        if name not in FUNCTIONS and name not in TIME_FUNCTIONS:
+            raise ExpressionError(f"Unknown function: {name}")
+        if len(node.args) != ARGUMENTS.get(name, 1):
+            raise ExpressionError(f"{name}() takes {ARGUMENTS.get(name, 1)} argument(s)")
+        node.args = [self.visit(arg) for arg in node.args]
+        if name in TIME_FUNCTIONS:
+            self.inputs.add('time')
+            node.args.append(ast.Name(id='t', ctx=ast.Load()))
+        return node
+
+
+def _array_token(data):
+    # Identifica el contenido de un canal sin copiarlo: mismo buffer y mismo largo
+    if isinstance(data, np.ndarray):
+        return data.__array_interface__['data'][0], data.shape
+    return id(data), len(data)
+
+
+class DerivedChannel:
+    """A named expression compiled against a channel table."""
+
+    def __init__(self, key, name, expression, chanid):
+        self.key = key
+        self.name = name
+        self.expression = expression
+        try:
+            tree = ast.parse(expression.strip(), mode='eval')
+        except SyntaxError as e:
+            raise ExpressionError(f"Invalid expression: {e.msg}")
+        compiler = _Compiler(chanid)
+        tree = ast.fix_missing_locations(compiler.visit(tree))
+        self.inputs = sorted(compiler.inputs, key=str)
+        self.code = compile(tree, f"<{name}>", 'eval')
+
+    @property
+    def label(self):
+        return f"{self.key}: {self.name}"
+
+
+class DerivedChannels:
+    """Derived channels of the loaded file and the cache of their evaluated results."""
+
+    def __init__(self):
+        self.channels = {}  # clave ('d1', 'd2', ...) -> DerivedChannel
+        self._cache = {}  # clave -> (tokens de las entradas, resultado)
+        self._next = 1
+
+    def __contains__(self, key):
+        return key in self.channels
+
+    def __iter__(self):
+        return iter(self.channels.values())
+
+    def define(self, name, expression, chanid):
+        """Add (or redefine, if the name exists) a derived channel; returns it."""
+        name = name.strip() or expression.strip()
+        key = next((d.key for d in self.channels.values() if d.name == name), None)
+        derived = DerivedChannel(key or f"d{self._next}", name, expression, chanid)
+        if key is None:
+            self._next += 1
+        self.channels[derived.key] = derived
+        self._cache.pop(derived.key, None)
+        return derived
+
+    def remove(self, key):
+        self.channels.pop(key, None)
+        self._cache.pop(key, None)
+
+    def clear(self):
+        self.channels = {}
+        self._cache = {}
+
+    def evaluate(self, key, chandata):
+        """Values of a derived channel over chandata (cached until an input changes)."""
+        derived = self.channels[key]
+        arrays = {chan: chandata[chan] for chan in derived.inputs}
+        tokens = tuple(_array_token(arrays[chan]) for chan in derived.inputs)
+        cached = self._cache.get(key)
+        if cached is not None and cached[0] == tokens:
+            return cached[1]
+
+        namespace = dict(FUNCTIONS, **TIME_FUNCTIONS, **CONSTANTS)
+        for chan, data in arrays.items():
+            namespace['t' if chan == 'time' else f"c{chan}"] = np.asarray(data, dtype=np.float64)
+        n = len(chandata['time'])
+        with np.errstate(all='ignore'):
+            result = eval(derived.code, {'__builtins__': {}}, namespace)
+        result = np.broadcast_to(np.asarray(result, dtype=np.float64), (n,)).copy()
+        self._cache[key] = (tokens, result)
+        return result
@@ -5,34 +5,50 @@
 # Se utiliza Tkinter para crear una interfaz gráfica simple que permite al usuario seleccionar un archivo .out.
 # El script muestra los datos de la simulación dinamica en gráficos utilizando Matplotlib.
 # Se desarrolla una ventana para la personalizacion completa de la gráfica, incluyendo la selección de variables y el rango de tiempo.
-# Requiere la instalación de las bibliotecas DyTools y Matplotlib. (Ver archivo requirements.txt)
+# Requiere la instalación de las bibliotecas NumPy y Matplotlib; DyTools es opcional. (Ver archivo requirements.txt)
 
 # Importar las bibliotecas necesarias
+import time
+_STARTUP_T0 = time.perf_counter()  # inicio del arranque (ver startup_report)
+
 import sys
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from collections import OrderedDict
 from tkinter import font as tkFont
 import os
-import re
-
-# Inicializar PSSE V_36
-#pssepy_PATH = r"C:\Program Files\PTI\PSSE36\36.1\PSSPY311"
-#sys.path.append(pssepy_PATH)
-#import psse36  # type: ignore
-#import psspy  # type: ignore
-#psspy.psseinit()
-#import dyntools # type: ignore
-
-# Inicializar PSSE V_35
-pssepy_PATH = r'C:\Program Files\PTI\PSSE35\35.5\PSSPY39'
-sys.path.append(pssepy_PATH)
-import psse35  # type: ignore
-import psspy  # type: ignore
-psspy.psseinit()
-import dyntools # type: ignore
+import queue
+import threading
+import numpy as np
+
+# Arranque rápido: PSSE se inicializa solo si se usa el lector "dyntools" (ver Channel_Reader.init_psse,
+# donde está la ruta de PSSPY) y Matplotlib y la lista de fuentes se cargan después de mostrar la
+# ventana. "python Dynamic_Graphs.py --tiempos" imprime los tiempos de arranque y cierra la ventana;
+# tests/test_startup.py falla si se excede STARTUP_BUDGET o si Matplotlib o PSSE se importan antes.
+STARTUP_BUDGET = 1.0  # s hasta que la ventana se muestra
+FALLBACK_FONTS = ['Arial', 'Times New Roman', 'Courier New', 'Verdana', 'Helvetica']
+
+from Channel_Cache import open_cached_channel_file
+from Channel_Export import EXPORTERS, available_formats, export_channels
+from Channel_Index import MAX_RESULTS, ChannelIndex
+from Channel_Metrics import DEFAULT_METRIC_SETTINGS, METRIC_FIELDS, compute_metrics
+from Channel_Reader import ChannelFileError, LoadCancelled, check_cancel, open_channel_file
+from Channel_Stats import SORT_OPTIONS, compute_channel_stats
+from Dashboard import Dashboard, group_channels
+from Derived_Channels import DerivedChannels, ExpressionError
+from Channel_Store import DEFAULT_MEMORY_BUDGET, ChannelMatrix, LazyChannelData
+from Live_Tail import LiveChannelData, OutFileTail
+from Modal_Analysis import DEFAULT_MODAL_SETTINGS, MODAL_FIELDS, ModalCache, modal_scan
+from Overlay import OverlaySet, align
+from Perf_Trace import TRACER
+from Plot_Decimation import LineDecimator
+from Plot_Export import EXPORT_FORMATS, ExportQueue, snapshot_plot
+from Plot_Model import PlotModel
+from Plot_Render import (DEFAULT_SETTINGS, LINE_COLORS, apply_plot_settings, assign_axes, draw_legends,
+                         padded_limits, safe_filename, selection_channel, selection_label)
+from Range_Index import RangeQueryIndex
+from Render_Cache import RenderCache
+from Screening import REPORT_FIELDS, find_out_files, load_criteria, screen_files
 
 class DynamicGraphApp:
 
@@ -43,35 +59,80 @@ class DynamicGraphApp:
         
         # Data variables
         self.chnfobj = None
+        self.reader_backend = 'auto'  # 'auto', 'numpy' o 'dyntools' (ver Channel_Reader)
+        self.channel_memory_budget = DEFAULT_MEMORY_BUDGET  # bytes de canales en cache (ver Channel_Store)
+        self.use_channel_cache = True  # cache columnar junto al .out (ver Channel_Cache)
+        self.channel_cache_dir = None  # None = misma carpeta que el archivo .out
+        self.channel_dtype = np.float64  # np.float32 usa la mitad de memoria con dyntools (ver ChannelMatrix)
+
+        # Carga en segundo plano (ver start_load)
+        self.load_queue = queue.Queue()
+        self.load_job = 0
+        self.load_cancel = None
+        self.load_polling = False
+        self.load_label = None  # que hace el trabajo en curso ("load file", "compute metrics", ...)
         self.chanid = OrderedDict()
         self.chandata = {}
+        self.channel_stats = None  # ChannelStats del archivo cargado (ver Channel_Stats)
+        self.channel_index = None  # búsqueda de canales del archivo cargado (ver Channel_Index)
+        self.search_results = []  # canales que cumplen la búsqueda actual
+        self.search_after = None
+        self.range_index = RangeQueryIndex()  # min/max por ventana de tiempo (ver Range_Index)
+        self.auto_limits = {}  # entry -> último límite calculado automáticamente
+        self.overlay = OverlaySet(self.channel_memory_budget)  # corridas superpuestas; la primera es el archivo base
+        self.derived = DerivedChannels()  # canales calculados con expresiones (ver Derived_Channels)
+        self.metrics_window = None  # ventana de métricas post-falla (ver Channel_Metrics)
+        self.metrics_table = None
+        self.metrics_sort = ('chan', False)
+        self.modal_window = None  # barrido modal de oscilaciones (ver Modal_Analysis)
+        self.modal_table = None
+        self.modal_sort = ('damping', False)
+        self.modal_cache = ModalCache()
+        self.modal_fits = {}  # clave ('m12') -> (ModalTable, fila, señal ajustada sobre el tiempo)
+        self.dashboard_window = None  # tablero de múltiplos pequeños (ver Dashboard)
+        self.dashboard = None
+        self.screening_window = None  # cribado de una carpeta de contingencias (ver Screening)
+        self.screening_report = None
+        self.screening_rows = []  # violaciones ordenadas, en el orden de la tabla
+        self.screening_target = None  # canal a graficar cuando termine de cargar el archivo elegido
+        self.live_tail = None  # OutFileTail mientras se sigue un archivo en escritura (ver Live_Tail)
+        self.live_after = None
+        self.live_interval = 1000  # ms entre consultas del archivo en modo en vivo
+        # Exportaciones en procesos de trabajo (ver Plot_Export); las repetidas se copian del cache
+        self.export_queue = ExportQueue(cache=RenderCache())
+        self.export_polling = False
+        self.perf_window = None  # panel de tiempos por etapa (ver Perf_Trace)
+        self.perf_panel_var = tk.BooleanVar(value=False)
+        self.perf_after = None
+        self.load_started = None  # perf_counter al pedir la carga en curso
         self.y_vars = []  # Stores multiple Y variables
         self.y_combos = []  # Stores combo boxes for Y variables
         self.y_styles = []  # lista de tuplas (color_entry, style_entry, label_entry)
-        self.line_colors = ['b', 'g', 'r', 'c', 'm', 'y', 'k']  # Colors for multiple lines
-        
-        # Initialize font list
-        try:
-            self.fonts = sorted(list(tkFont.families()))
-        except:
-            # Fallback fonts if system fonts can't be retrieved
-            self.fonts = ['Arial', 'Times New Roman', 'Courier New', 'Verdana', 'Helvetica']
+        self.line_colors = list(LINE_COLORS)  # Colors for multiple lines
+        self.startup_times = OrderedDict([('imports', time.perf_counter() - _STARTUP_T0)])
+        self.plotting_import = None  # hilo que importa Matplotlib después de la primera pintura
+
+        # La lista completa de fuentes se carga después de mostrar la ventana (load_fonts)
+        self.fonts = list(FALLBACK_FONTS)
+
+        # La figura se crea cuando termina de importarse Matplotlib (finish_plot_setup)
+        self.fig = None
+        self.ax = None
+        self.canvas = None
+        self.decimator = None
+        self.plot_model = None
 
-        
         # Default plot settings
-        self.plot_settings = {
-            'title': "  ",
-            'xlabel': "",
-            'ylabel': " ",
-            'xlim_min': "",
-            'xlim_max': "",
-            'ylim_min': "",
-            'ylim_max': "",
-            'font_family': "Arial",
-            'font_size': 10,
-            'grid': False
-            
-        }
+        self.plot_settings = dict(DEFAULT_SETTINGS)
+
+        self.channel_sort_var = tk.StringVar(value='Número')
+        self.hide_constant_var = tk.BooleanVar(value=False)
+        self.follow_var = tk.BooleanVar(value=False)
+        self.export_format = tk.StringVar(value='PNG')
+        self.data_format = tk.StringVar(value='csv')
+        self.data_scope = tk.StringVar(value='Graficados')
+        self.data_window_var = tk.BooleanVar(value=False)
+        self.channel_search_var = tk.StringVar(value='')
 
         self.legend_pos = tk.StringVar(value='best')
         self.legend_frameon = tk.BooleanVar(value=True)
@@ -80,6 +141,8 @@ class DynamicGraphApp:
 
         # Create GUI
         self.create_widgets()
+        self.mark_startup('ventana')
+        self.root.after_idle(self._after_first_paint)
         
     def create_widgets(self):
         # Main container
@@ -94,6 +157,25 @@ class DynamicGraphApp:
         self.file_label.pack(side=tk.LEFT, padx=5)
         
         ttk.Button(file_frame, text="Load .out File", command=self.load_file).pack(side=tk.RIGHT, padx=5)
+        ttk.Button(file_frame, text="Cribado...", command=self.open_screening_window).pack(side=tk.RIGHT, padx=5)
+
+        # Superposición de otras corridas sobre el archivo base
+        ttk.Button(file_frame, text="Quitar superposición", command=self.clear_overlay).pack(side=tk.RIGHT, padx=5)
+        ttk.Button(file_frame, text="Superponer .out...", command=self.load_overlay_files).pack(side=tk.RIGHT, padx=5)
+        self.overlay_label = ttk.Label(file_frame, text="")
+        self.overlay_label.pack(side=tk.RIGHT, padx=5)
+
+        # Modo en vivo: agrega los pasos nuevos mientras la simulación escribe el archivo
+        ttk.Checkbutton(file_frame, text="Seguir archivo (en vivo)", variable=self.follow_var,
+                        command=self.toggle_follow).pack(side=tk.RIGHT, padx=5)
+
+        # Progreso de la carga en segundo plano
+        self.cancel_button = ttk.Button(file_frame, text="Cancelar", command=self.cancel_load, state=tk.DISABLED)
+        self.cancel_button.pack(side=tk.RIGHT, padx=5)
+        self.load_progress = ttk.Progressbar(file_frame, length=150, mode='determinate', maximum=100)
+        self.load_progress.pack(side=tk.RIGHT, padx=5)
+        self.load_status = ttk.Label(file_frame, text="")
+        self.load_status.pack(side=tk.RIGHT, padx=5)
         
         # Split main content area
         content_frame = ttk.Frame(main_frame)
@@ -125,7 +207,64 @@ class DynamicGraphApp:
         
         # Button to add more Y variables
         ttk.Button(var_frame, text="Add Y Variable", command=self.add_y_variable).grid(row=2, column=1, sticky=tk.E, pady=5)
+
+        # Orden y filtro de la lista de canales (usa la tabla de estadísticas)
+        ttk.Label(var_frame, text="Ordenar canales por:").grid(row=3, column=0, padx=5, pady=5, sticky=tk.W)
+        sort_combo = ttk.Combobox(var_frame, textvariable=self.channel_sort_var, state="readonly",
+                                  values=list(SORT_OPTIONS))
+        sort_combo.grid(row=3, column=1, padx=5, pady=5, sticky=tk.EW)
+        sort_combo.bind("<<ComboboxSelected>>", self.refresh_channel_lists)
+        ttk.Checkbutton(var_frame, text="Ocultar canales constantes", variable=self.hide_constant_var,
+                        command=self.refresh_channel_lists).grid(row=4, column=1, sticky=tk.W)
+
+        # Búsqueda de canales: texto libre, prefijos y consultas como "VOLT bus:1000-1999"
+        ttk.Label(var_frame, text="Buscar canal:").grid(row=5, column=0, padx=5, pady=5, sticky=tk.W)
+        search_entry = ttk.Entry(var_frame, textvariable=self.channel_search_var)
+        search_entry.grid(row=5, column=1, padx=5, pady=5, sticky=tk.EW)
+        self.channel_search_var.trace_add('write', self.schedule_channel_search)
+        self.search_listbox = tk.Listbox(var_frame, height=8, selectmode=tk.EXTENDED, exportselection=False)
+        self.search_listbox.grid(row=6, column=0, columnspan=2, padx=5, sticky=tk.NSEW)
+        self.search_listbox.bind("<Double-Button-1>", lambda e: self.add_search_selection())
+        search_buttons = ttk.Frame(var_frame)
+        search_buttons.grid(row=7, column=0, columnspan=2, sticky=tk.EW, pady=5)
+        ttk.Button(search_buttons, text="Usar como X", command=self.use_search_as_x).pack(side=tk.LEFT, padx=5)
+        ttk.Button(search_buttons, text="Agregar como Y", command=self.add_search_selection).pack(side=tk.LEFT, padx=5)
+        ttk.Button(search_buttons, text="Agregar todos", command=self.add_all_search_results).pack(side=tk.LEFT, padx=5)
+        self.search_status = ttk.Label(search_buttons, text="")
+        self.search_status.pack(side=tk.RIGHT, padx=5)
+
+        # Canales derivados, p. ej. "wrap(c3 - c5)", "ddt(c1)", "rolling(ch(\"FREQ 1001\"), 0.5)"
+        ttk.Label(var_frame, text="Canal derivado:").grid(row=8, column=0, padx=5, pady=5, sticky=tk.W)
+        self.derived_expr_entry = ttk.Entry(var_frame)
+        self.derived_expr_entry.grid(row=8, column=1, padx=5, pady=5, sticky=tk.EW)
+        derived_frame = ttk.Frame(var_frame)
+        derived_frame.grid(row=9, column=0, columnspan=2, sticky=tk.EW)
+        ttk.Label(derived_frame, text="Nombre:").pack(side=tk.LEFT, padx=5)
+        self.derived_name_entry = ttk.Entry(derived_frame, width=20)
+        self.derived_name_entry.pack(side=tk.LEFT, padx=5)
+        ttk.Button(derived_frame, text="Definir", command=self.define_derived).pack(side=tk.LEFT, padx=5)
+        ttk.Button(derived_frame, text="Quitar", command=self.remove_derived).pack(side=tk.LEFT, padx=5)
         
+        # Exportación de los datos de canales (ver Channel_Export)
+        data_frame = ttk.LabelFrame(left_frame, text="Exportar datos", padding="10")
+        data_frame.pack(fill=tk.X, pady=5)
+        ttk.Label(data_frame, text="Formato:").grid(row=0, column=0, padx=5, sticky=tk.W)
+        ttk.Combobox(data_frame, textvariable=self.data_format, state="readonly", width=10,
+                     values=available_formats()).grid(row=0, column=1, padx=5, sticky=tk.W)
+        ttk.Label(data_frame, text="Canales:").grid(row=1, column=0, padx=5, sticky=tk.W)
+        ttk.Combobox(data_frame, textvariable=self.data_scope, state="readonly", width=10,
+                     values=['Graficados', 'Búsqueda', 'Todos']).grid(row=1, column=1, padx=5, sticky=tk.W)
+        ttk.Checkbutton(data_frame, text="Solo la ventana de tiempo (límites X)",
+                        variable=self.data_window_var).grid(row=2, column=0, columnspan=2, sticky=tk.W)
+        ttk.Label(data_frame, text="Una de cada N muestras:").grid(row=3, column=0, padx=5, sticky=tk.W)
+        self.data_step_entry = ttk.Entry(data_frame, width=6)
+        self.data_step_entry.insert(0, "1")
+        self.data_step_entry.grid(row=3, column=1, padx=5, sticky=tk.W)
+        ttk.Button(data_frame, text="Métricas post-falla...", command=self.open_metrics_window).grid(row=4, column=0, sticky=tk.W, pady=5)
+        ttk.Button(data_frame, text="Exportar datos...", command=self.export_data).grid(row=4, column=1, sticky=tk.E, pady=5)
+        ttk.Button(data_frame, text="Análisis modal...", command=self.open_modal_window).grid(row=5, column=0, sticky=tk.W, pady=5)
+        ttk.Button(data_frame, text="Tablero...", command=self.open_dashboard_window).grid(row=5, column=1, sticky=tk.E, pady=5)
+
         # Plot customization section
         custom_frame = ttk.LabelFrame(right_frame, text="Plot Customization", padding="10")
         custom_frame.pack(fill=tk.BOTH, pady=5, expand=True)
@@ -236,7 +375,7 @@ class DynamicGraphApp:
 
 
         self.save_var = tk.BooleanVar(value=False)
-        ttk.Checkbutton(options_frame, text="Guardar como imagen PNG", variable=self.save_var).pack(anchor=tk.W)
+        ttk.Checkbutton(options_frame, text="Guardar como imagen", variable=self.save_var).pack(anchor=tk.W)
 
         # Tamaño personalizado de la figura (en pulgadas)
         ttk.Label(options_frame, text="Tamaño de la figura (pulgadas):").pack(anchor=tk.W)
@@ -261,6 +400,17 @@ class DynamicGraphApp:
         self.dpi_entry.insert(0, "300")  # valor por defecto
         self.dpi_entry.pack(anchor=tk.W, pady=(0, 5))
 
+        ttk.Label(options_frame, text="Formato:").pack(anchor=tk.W)
+        ttk.Combobox(options_frame, textvariable=self.export_format, state="readonly", width=8,
+                     values=EXPORT_FORMATS).pack(anchor=tk.W, pady=(0, 5))
+
+        # Cola de exportaciones: se guardan en segundo plano sin bloquear la ventana
+        ttk.Label(options_frame, text="Cola de exportación:").pack(anchor=tk.W)
+        self.export_listbox = tk.Listbox(options_frame, height=4)
+        self.export_listbox.pack(fill=tk.X)
+        self.export_status = ttk.Label(options_frame, text="")
+        self.export_status.pack(anchor=tk.W, pady=(0, 5))
+
 
         self.dual_y_var = tk.BooleanVar(value=False)
         self.dual_y_check = ttk.Checkbutton(options_frame, text="Usar segundo eje Y (derecho)", variable=self.dual_y_var)
@@ -278,41 +428,893 @@ class DynamicGraphApp:
 
         # Reset axes button
         ttk.Button(right_frame, text="Resetear Ejes", command=self.reset_axes).pack(pady=5)
+        ttk.Checkbutton(right_frame, text="Panel de rendimiento", variable=self.perf_panel_var,
+                        command=self.toggle_perf_panel).pack(pady=5)
 
 
-        # Matplotlib figure
-        self.fig, self.ax = plt.subplots(figsize=(10, 5))
-        self.canvas = FigureCanvasTkAgg(self.fig, master=right_frame)
-        self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
-        
+        # Matplotlib figure: se crea en finish_plot_setup, mientras tanto se muestra un aviso
+        self.plot_frame = right_frame
+        self.plot_placeholder = ttk.Label(right_frame, text="Cargando gráficos...")
+        self.plot_placeholder.pack(fill=tk.BOTH, expand=True)
+
         # Configure grid expansion
         var_frame.columnconfigure(1, weight=1)
         custom_frame.columnconfigure(1, weight=1)
 
+    # ----- Arranque -----
+    def mark_startup(self, name):
+        self.startup_times[name] = time.perf_counter() - _STARTUP_T0
+
+    def startup_report(self):
+        lines = [f"{name:>16}: {seconds:6.3f} s" for name, seconds in self.startup_times.items()]
+        shown = self.startup_times.get('primera pintura')
+        if shown is not None:
+            verdict = "OK" if shown <= STARTUP_BUDGET else "EXCEDIDO"
+            lines.append(f"Ventana visible en {shown:.3f} s (presupuesto {STARTUP_BUDGET:.1f} s): {verdict}")
+        return "\n".join(lines)
+
+    def _after_first_paint(self):
+        self.root.update_idletasks()
+        self.mark_startup('primera pintura')
+        # Matplotlib se importa en otro hilo; la figura se crea en el hilo de Tk al terminar
+        self.plotting_import = threading.Thread(target=self._import_plotting, daemon=True)
+        self.plotting_import.start()
+        self.load_fonts()
+        self.root.after(20, self.finish_plot_setup)
+
+    @staticmethod
+    def _import_plotting():
+        import matplotlib.figure  # noqa: F401
+        import matplotlib.backends.backend_tkagg  # noqa: F401
+
+    def load_fonts(self):
+        try:
+            self.fonts = sorted(list(tkFont.families()))
+        except:
+            # Fallback fonts if system fonts can't be retrieved
+            self.fonts = list(FALLBACK_FONTS)
+        self.font_combo['values'] = self.fonts
+        self.mark_startup('fuentes')
+
+    def finish_plot_setup(self):
+        if self.plotting_import.is_alive():
+            self.root.after(20, self.finish_plot_setup)
+            return
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
+
+        self.plot_placeholder.destroy()
+        self.fig = Figure(figsize=(10, 5))
+        self.ax = self.fig.add_subplot()
+        self.canvas = FigureCanvasTkAgg(self.fig, master=self.plot_frame)
+        toolbar = NavigationToolbar2Tk(self.canvas, self.plot_frame, pack_toolbar=False)
+        toolbar.update()
+        toolbar.pack(side=tk.BOTTOM, fill=tk.X)
+        self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        # Las lineas se dibujan reducidas al ancho en pixeles y se recalculan al hacer zoom
+        self.decimator = LineDecimator(self.ax)
+        # Cada variable Y conserva su línea entre una gráfica y la siguiente
+        self.plot_model = PlotModel(self.fig, self.ax, self.canvas, self.decimator)
+        self.canvas.draw_idle()
+        self.mark_startup('matplotlib')
+
     def load_file(self):
-        outfile = filedialog.askopenfilename(filetypes=[("PSSE Output Files", "*.out")])
+        outfile = filedialog.askopenfilename(filetypes=[("PSSE Output Files", "*.out *.outx")])
         if outfile:
+            self.start_load(outfile)
+
+    def start_load(self, outfile):
+        """Load a channel file on a worker thread; a new request cancels the previous one."""
+        self.load_started = time.perf_counter()
+        self._start_worker(self._load_worker, outfile, 'load file')
+
+    def load_overlay_files(self):
+        if self.live_tail is not None:
+            messagebox.showwarning("Warning", "Detenga el modo en vivo antes de superponer corridas")
+            return
+        if not self.overlay.runs:
+            messagebox.showwarning("Warning", "Load a base .out file first")
+            return
+        outfiles = filedialog.askopenfilenames(filetypes=[("PSSE Output Files", "*.out *.outx")])
+        if outfiles:
+            self._start_worker(self._overlay_worker, list(outfiles), 'load overlay runs')
+
+    def clear_overlay(self):
+        # Conserva solo la corrida base (el archivo cargado con "Load .out File")
+        while len(self.overlay) > 1:
+            self.overlay.remove_run(len(self.overlay) - 1)
+        self.overlay_label.config(text="")
+
+    def _start_worker(self, target, arg, label):
+        """Run target on a worker thread; returns False if a file load is still running."""
+        # Un archivo nuevo reemplaza cualquier trabajo en curso; los demas trabajos esperan a la carga
+        if self.load_cancel is not None and self.load_label == 'load file' and label != 'load file':
+            messagebox.showwarning("Warning", "Wait for the file to finish loading (or cancel it)")
+            return False
+        if self.load_cancel is not None:
+            self.load_cancel.set()
+
+        self.load_job += 1
+        self.load_label = label
+        self.load_cancel = threading.Event()
+        worker = threading.Thread(target=target, args=(self.load_job, arg, self.load_cancel), daemon=True)
+
+        self.load_progress['value'] = 0
+        self.load_status.config(text="Cargando...")
+        self.cancel_button.config(state=tk.NORMAL)
+        worker.start()
+        if not self.load_polling:
+            self.load_polling = True
+            self.root.after(50, self._poll_load_queue)
+        return True
+
+    def cancel_load(self):
+        if self.load_cancel is not None:
+            self.load_cancel.set()
+
+    def _open_reader(self, outfile, progress, cancel):
+        # Se ejecuta fuera del hilo de Tk: solo se comunica a traves de self.load_queue
+        with TRACER.span('load_file.open', cache=self.use_channel_cache):
+            if self.use_channel_cache:
+                reader = open_cached_channel_file(outfile, backend=self.reader_backend,
+                                                  cache_dir=self.channel_cache_dir,
+                                                  progress=progress, cancel=cancel)
+            else:
+                reader = open_channel_file(outfile, backend=self.reader_backend)
+        check_cancel(cancel)
+        if not hasattr(reader, 'read_channel'):
+            # dyntools entrega listas de Python: se copian a una matriz compacta y se descartan
+            with TRACER.span('load_file.matrix', dtype=np.dtype(self.channel_dtype).name) as span:
+                reader = ChannelMatrix.from_reader(reader, self.channel_dtype, cancel)
+                span.set(mb=round(reader.nbytes / 1e6, 1))
+
+        # Solo se indexa el encabezado; los canales se leen al graficarlos
+        with TRACER.span('load_file.header') as span:
+            short_title, chanid_dict = reader.get_index()
+            span.set(channels=len(chanid_dict))
+        with TRACER.span('load_file.data') as span:
+            chandata = LazyChannelData(reader, chanid_dict, self.channel_memory_budget)
+            chandata['time']  # todas las graficas usan el tiempo, se lee de una vez
+            span.set(points=len(chandata['time']))
+        return reader, chanid_dict, chandata
+
+    def _load_worker(self, job, outfile, cancel):
+        def progress(fraction, message):
+            self.load_queue.put(('progress', job, fraction, message))
+
+        try:
+            reader, chanid_dict, chandata = self._open_reader(outfile, progress, cancel)
+            progress(1.0, "Calculando estadísticas")
+            with TRACER.span('load_file.stats', channels=len(chanid_dict)):
+                stats = compute_channel_stats(reader, chanid_dict, chandata, cancel)
+            with TRACER.span('load_file.index'):
+                index = ChannelIndex(chanid_dict)
+            check_cancel(cancel)
+            self.load_queue.put(('done', job, outfile, reader, chanid_dict, chandata, stats, index))
+        except LoadCancelled:
+            self.load_queue.put(('cancelled', job))
+        except Exception as e:
+            self.load_queue.put(('error', job, e))
+
+    def _export_worker(self, job, request, cancel):
+        def progress(fraction, message):
+            self.load_queue.put(('progress', job, fraction, message))
+
+        try:
+            rows = export_channels(progress=progress, cancel=cancel, **request)
+            self.load_queue.put(('exported', job, request['path'], rows))
+        except LoadCancelled:
+            self.load_queue.put(('cancelled', job))
+        except Exception as e:
+            self.load_queue.put(('error', job, e))
+
+    def _metrics_worker(self, job, request, cancel):
+        try:
+            table = compute_metrics(cancel=cancel, **request)
+            self.load_queue.put(('metrics', job, table))
+        except LoadCancelled:
+            self.load_queue.put(('cancelled', job))
+        except Exception as e:
+            self.load_queue.put(('error', job, e))
+
+    def _modal_worker(self, job, request, cancel):
+        try:
+            table = modal_scan(cancel=cancel, **request)
+            self.load_queue.put(('modal', job, table))
+        except LoadCancelled:
+            self.load_queue.put(('cancelled', job))
+        except Exception as e:
+            self.load_queue.put(('error', job, e))
+
+    def _screening_worker(self, job, request, cancel):
+        def progress(fraction, message):
+            self.load_queue.put(('progress', job, fraction, message))
+
+        try:
+            report = screen_files(progress=progress, cancel=cancel, **request)
+            self.load_queue.put(('screened', job, report))
+        except LoadCancelled:
+            self.load_queue.put(('cancelled', job))
+        except Exception as e:
+            self.load_queue.put(('error', job, e))
+
+    def _overlay_worker(self, job, outfiles, cancel):
+        runs = []
+        try:
+            for i, outfile in enumerate(outfiles):
+                def progress(fraction, message, i=i):
+                    self.load_queue.put(('progress', job, (i + fraction) / len(outfiles),
+                                         f"{message} ({i + 1}/{len(outfiles)})"))
+                progress(0.0, "Cargando corrida")
+                runs.append((outfile,) + self._open_reader(outfile, progress, cancel))
+            self.load_queue.put(('overlay', job, runs))
+        except LoadCancelled:
+            self.load_queue.put(('cancelled', job))
+        except Exception as e:
+            self.load_queue.put(('error', job, e))
+
+    def _poll_load_queue(self):
+        try:
+            while True:
+                msg = self.load_queue.get_nowait()
+                kind, job = msg[0], msg[1]
+                if job != self.load_job:
+                    continue  # mensaje de una carga anterior ya cancelada
+                try:
+                    self._handle_load_message(kind, msg)
+                except Exception as e:
+                    # Un error al mostrar el resultado termina el trabajo, no la consulta de la cola
+                    self._end_load("Error")
+                    messagebox.showerror("Error", f"Failed to {self.load_label}:\n{e}")
+        except queue.Empty:
+            pass
+        finally:
+            if self.load_cancel is not None:
+                self.root.after(50, self._poll_load_queue)
+            else:
+                self.load_polling = False
+
+    def _handle_load_message(self, kind, msg):
+        if kind == 'progress':
+            self.load_progress['value'] = msg[2] * 100
+            self.load_status.config(text=msg[3])
+        elif kind == 'done':
+            self._finish_load(*msg[2:])
+            # Desde el pedido hasta que la ventana muestra los canales del archivo
+            TRACER.record('load_file', time.perf_counter() - self.load_started,
+                          {'channels': len(self.chanid)}, start=self.load_started)
+        elif kind == 'overlay':
+            self._finish_overlay_load(msg[2])
+        elif kind == 'metrics':
+            self._finish_metrics(msg[2])
+        elif kind == 'modal':
+            self._finish_modal(msg[2])
+        elif kind == 'screened':
+            self._finish_screening(msg[2])
+        elif kind == 'exported':
+            self.load_progress['value'] = 100
+            self._end_load(f"Exportadas {msg[3]} filas a {os.path.basename(msg[2])}")
+        elif kind == 'cancelled':
+            self._end_load("Carga cancelada")
+        elif kind == 'error':
+            label = self.load_label
+            self._end_load("Error al cargar" if label == 'load file' else "Error")
+            messagebox.showerror("Error", f"Failed to {label}:\n{str(msg[2])}")
+
+    def _end_load(self, status):
+        self.load_cancel = None
+        self.load_status.config(text=status)
+        self.cancel_button.config(state=tk.DISABLED)
+
+    @TRACER.traced('load_file.finish')
+    def _finish_load(self, outfile, reader, chanid_dict, chandata, stats, index):
+        self.stop_follow()
+        self.chnfobj = reader
+        self.outfile_path = outfile
+        self.chandata = chandata
+        self.channel_stats = stats
+        self.channel_index = index
+        self.search_results = []
+        self.modal_fits = {}
+        self.range_index.clear()
+
+        # Store channel information (excluding time since we handle it separately)
+        self.chanid = OrderedDict()
+        for chan_num, chan_desc in chanid_dict.items():
+            # Skip if this is the time channel (often has specific numbering)
+            if not chan_desc.lower().startswith('time'):
+                self.chanid[chan_num] = f"{chan_num}: {chan_desc}"
+
+        # Los canales derivados se vuelven a compilar con los canales del archivo nuevo
+        for derived in list(self.derived):
             try:
-                self.chnfobj = dyntools.CHNF(outfile)
-                self.outfile_path = outfile
-                short_title, chanid_dict, self.chandata = self.chnfobj.get_data()
-                
-                # Store channel information (excluding time since we handle it separately)
-                self.chanid = OrderedDict()
-                for chan_num, chan_desc in chanid_dict.items():
-                    # Skip if this is the time channel (often has specific numbering)
-                    if not chan_desc.lower().startswith('time'):
-                        self.chanid[chan_num] = f"{chan_num}: {chan_desc}"
-                    
-                self.file_label.config(text=f"File: {outfile}")
-                self.update_comboboxes()
-                
-            except Exception as e:
-                messagebox.showerror("Error", f"Failed to load file:\n{str(e)}")
-    
+                self.derived.define(derived.name, derived.expression, chanid_dict)
+            except ExpressionError:
+                self.derived.remove(derived.key)
+
+        # El archivo base es la primera corrida de la superposición
+        self.overlay.clear()
+        self.overlay.add_run(outfile, reader, chanid_dict, chandata)
+        self.overlay_label.config(text="")
+
+        self.load_progress['value'] = 100
+        self._end_load("")
+        self.file_label.config(text=f"File: {outfile}")
+        self.update_comboboxes()
+        self.run_channel_search()
+
+        # Archivo abierto desde el reporte de cribado: se grafica el canal de la violación
+        target, self.screening_target = self.screening_target, None
+        if target is not None and target[0] == outfile and target[1] in self.chanid:
+            self.y_combos[0].set(self.chanid[target[1]])
+            self.generate_plot(save_image=False)
+
+    def _finish_overlay_load(self, runs):
+        for outfile, reader, chanid_dict, chandata in runs:
+            self.overlay.add_run(outfile, reader, chanid_dict, chandata)
+        self.load_progress['value'] = 100
+        self._end_load("")
+        self.overlay_label.config(text=f"Superponiendo {len(self.overlay)} corridas")
+
+    def export_data(self):
+        """Export the time + chosen channels of the loaded file (in a background thread)."""
+        if not self.chanid:
+            messagebox.showerror("Error", "Load a .out file first")
+            return
+
+        scope = self.data_scope.get()
+        if scope == 'Todos':
+            chans = list(self.chanid)
+        elif scope == 'Búsqueda':
+            chans = list(self.search_results)
+        else:
+            chans = [selection_channel(combo.get()) for combo in self.y_combos if combo.get()]
+            chans = [chan for chan in chans if isinstance(chan, int)]  # sin tiempo ni derivados
+        if not chans:
+            messagebox.showerror("Error", "No channels to export")
+            return
+
+        try:
+            step = max(1, int(self.data_step_entry.get()))
+        except ValueError:
+            step = 1
+        window = self.user_x_window() if self.data_window_var.get() else None
+        if self.data_window_var.get() and window is None and self.ax is not None:
+            # Límites automáticos: se usa lo que se ve en la gráfica
+            window = tuple(sorted(self.ax.get_xlim()))
+
+        fmt = self.data_format.get()
+        extension = EXPORTERS[fmt][0]
+        path = filedialog.asksaveasfilename(defaultextension=extension,
+                                            filetypes=[(fmt.upper(), "*" + extension)])
+        if not path:
+            return
+
+        # Con datos en vivo el lector del archivo ya no corresponde a lo que está en memoria
+        reader = None if self.live_tail is not None else self.chnfobj
+        self._start_worker(self._export_worker, {
+            'path': path, 'fmt': fmt, 'chanid': self.overlay.runs[0].chanid, 'chandata': self.chandata,
+            'chans': chans, 'reader': reader, 'window': window, 'step': step,
+        }, 'export channels')
+
+    # ----- Métricas post-falla -----
+    METRIC_SETTING_LABELS = {
+        't_fault': "Instante de falla (s):",
+        't_clear': "Instante de despeje (s):",
+        'recovery_threshold': "Umbral de recuperación V (p.u.):",
+        'settling_band': "Banda de establecimiento (fracción de la perturbación):",
+        'frequency_band': "Banda de establecimiento FREQ (Hz):",
+        'final_window': "Ventana del valor final (s):",
+        'rocof_window': "Ventana de ROCOF (s):",
+        'base_frequency': "Frecuencia base (Hz):",
+    }
+    METRICS_ROWS = 1000  # filas mostradas en la tabla (el CSV lleva todas)
+
+    def open_metrics_window(self):
+        if self.metrics_window is not None and self.metrics_window.winfo_exists():
+            self.metrics_window.lift()
+            return
+        win = self.metrics_window = tk.Toplevel(self.root)
+        win.title("Métricas post-falla")
+
+        settings_frame = ttk.Frame(win, padding="10")
+        settings_frame.pack(fill=tk.X)
+        self.metric_entries = {}
+        for row, (key, text) in enumerate(self.METRIC_SETTING_LABELS.items()):
+            ttk.Label(settings_frame, text=text).grid(row=row // 2, column=(row % 2) * 2, padx=5, sticky=tk.W)
+            entry = ttk.Entry(settings_frame, width=8)
+            entry.insert(0, str(DEFAULT_METRIC_SETTINGS[key]))
+            entry.grid(row=row // 2, column=(row % 2) * 2 + 1, padx=5, sticky=tk.W)
+            self.metric_entries[key] = entry
+
+        buttons = ttk.Frame(win, padding="5")
+        buttons.pack(fill=tk.X)
+        ttk.Label(buttons, text="Canales:").pack(side=tk.LEFT, padx=5)
+        self.metrics_scope = ttk.Combobox(buttons, state="readonly", width=12,
+                                          values=['VOLT', 'FREQ', 'Búsqueda', 'Graficados', 'Todos'])
+        self.metrics_scope.set('VOLT')
+        self.metrics_scope.pack(side=tk.LEFT, padx=5)
+        ttk.Button(buttons, text="Calcular", command=self.run_metrics).pack(side=tk.LEFT, padx=5)
+        ttk.Button(buttons, text="Exportar CSV...", command=self.export_metrics).pack(side=tk.LEFT, padx=5)
+        self.metrics_status = ttk.Label(buttons, text="")
+        self.metrics_status.pack(side=tk.LEFT, padx=5)
+
+        columns = ('chan', 'description') + METRIC_FIELDS
+        self.metrics_tree = ttk.Treeview(win, columns=columns, show='headings', height=20)
+        for field in columns:
+            self.metrics_tree.heading(field, text=field, command=lambda f=field: self.sort_metrics(f))
+            self.metrics_tree.column(field, width=260 if field == 'description' else 80, anchor=tk.E)
+        self.metrics_tree.pack(fill=tk.BOTH, expand=True)
+        # Doble clic: el canal pasa a la primera variable Y
+        self.metrics_tree.bind("<Double-1>", lambda e: self.plot_metric_channel())
+
+    def run_metrics(self):
+        if not self.chanid:
+            messagebox.showerror("Error", "Load a .out file first")
+            return
+        try:
+            settings = {key: float(entry.get()) for key, entry in self.metric_entries.items()}
+        except ValueError:
+            messagebox.showerror("Error", "Metric settings must be numbers")
+            return
+
+        scope = self.metrics_scope.get()
+        if scope in ('VOLT', 'FREQ'):
+            chans = self.channel_index.search(f"type:{scope}", limit=None)
+        elif scope == 'Búsqueda':
+            chans = list(self.search_results)
+        elif scope == 'Graficados':
+            chans = [selection_channel(combo.get()) for combo in self.y_combos if combo.get()]
+            chans = [chan for chan in chans if isinstance(chan, int)]
+        else:
+            chans = list(self.chanid)
+        if not chans:
+            messagebox.showerror("Error", "No channels to analyse")
+            return
+
+        reader = None if self.live_tail is not None else self.chnfobj
+        if self._start_worker(self._metrics_worker, {
+            'chanid': self.overlay.runs[0].chanid, 'chandata': self.chandata, 'chans': chans,
+            'reader': reader, 'settings': settings,
+        }, 'compute metrics'):
+            self.metrics_status.config(text=f"Calculando {len(chans)} canales...")
+
+    def _finish_metrics(self, table):
+        self.metrics_table = table
+        self.load_progress['value'] = 100
+        self._end_load("")
+        if self.metrics_window is not None and self.metrics_window.winfo_exists():
+            self.show_metrics()
+
+    def sort_metrics(self, field):
+        current, descending = self.metrics_sort
+        self.metrics_sort = (field, not descending if field == current else False)
+        self.show_metrics()
+
+    def show_metrics(self):
+        table = self.metrics_table
+        if table is None:
+            return
+        field, descending = self.metrics_sort
+        if field == 'description':
+            order = np.argsort(table.descriptions, kind='stable')[::-1 if descending else 1]
+        else:
+            order = table.order(field, descending)
+        self.metrics_tree.delete(*self.metrics_tree.get_children())
+        for i in order[:self.METRICS_ROWS]:
+            values = table.row(i)
+            self.metrics_tree.insert('', tk.END, iid=str(table.chans[i]),
+                                     values=values[:2] + [f"{v:.4g}" for v in values[2:]])
+        self.metrics_status.config(text=f"Mostrando {min(len(table), self.METRICS_ROWS)} de {len(table)} canales")
+
+    def plot_metric_channel(self):
+        selected = self.metrics_tree.selection()
+        if not selected or int(selected[0]) not in self.chanid:
+            return
+        self.y_combos[0].set(self.chanid[int(selected[0])])
+        self.generate_plot(save_image=False)
+
+    def export_metrics(self):
+        if self.metrics_table is None:
+            return
+        path = filedialog.asksaveasfilename(defaultextension=".csv", filetypes=[("CSV", "*.csv")])
+        if path:
+            try:
+                self.metrics_table.write_csv(path)
+                self.metrics_status.config(text=f"Guardado: {os.path.basename(path)}")
+            except OSError as e:
+                messagebox.showwarning("Error al guardar", str(e))
+
+    # ----- Análisis modal -----
+    MODAL_SETTING_LABELS = {
+        't_start': "Inicio de la ventana (s):",
+        't_end': "Fin de la ventana (s):",
+        'f_min': "Frecuencia mínima (Hz):",
+        'f_max': "Frecuencia máxima (Hz):",
+        'sample_rate': "Muestreo (Hz):",
+        'order': "Orden del modelo:",
+        'min_amplitude': "Amplitud mínima (fracción):",
+        'min_rms_amplitude': "Amplitud mínima (fracción del RMS):",
+        'rank_tol': "Tolerancia de rango (SVD):",
+    }
+    MODAL_ROWS = 1000
+
+    def open_modal_window(self):
+        if self.modal_window is not None and self.modal_window.winfo_exists():
+            self.modal_window.lift()
+            return
+        win = self.modal_window = tk.Toplevel(self.root)
+        win.title("Análisis modal")
+
+        settings_frame = ttk.Frame(win, padding="10")
+        settings_frame.pack(fill=tk.X)
+        self.modal_entries = {}
+        for row, (key, text) in enumerate(self.MODAL_SETTING_LABELS.items()):
+            ttk.Label(settings_frame, text=text).grid(row=row // 2, column=(row % 2) * 2, padx=5, sticky=tk.W)
+            entry = ttk.Entry(settings_frame, width=8)
+            entry.insert(0, str(DEFAULT_MODAL_SETTINGS[key]))
+            entry.grid(row=row // 2, column=(row % 2) * 2 + 1, padx=5, sticky=tk.W)
+            self.modal_entries[key] = entry
+
+        buttons = ttk.Frame(win, padding="5")
+        buttons.pack(fill=tk.X)
+        ttk.Label(buttons, text="Canales:").pack(side=tk.LEFT, padx=5)
+        self.modal_scope = ttk.Combobox(buttons, state="readonly", width=12,
+                                        values=['Graficados', 'Búsqueda', 'ANGL', 'SPD', 'POWR', 'Todos'])
+        self.modal_scope.set('Graficados')
+        self.modal_scope.pack(side=tk.LEFT, padx=5)
+        ttk.Button(buttons, text="Calcular", command=self.run_modal_scan).pack(side=tk.LEFT, padx=5)
+        ttk.Button(buttons, text="Superponer ajuste", command=self.overlay_modal_fits).pack(side=tk.LEFT, padx=5)
+        self.modal_status = ttk.Label(buttons, text="")
+        self.modal_status.pack(side=tk.LEFT, padx=5)
+
+        columns = ('chan', 'description') + MODAL_FIELDS
+        self.modal_tree = ttk.Treeview(win, columns=columns, show='headings', height=20)
+        for field in columns:
+            self.modal_tree.heading(field, text=field, command=lambda f=field: self.sort_modal(f))
+            self.modal_tree.column(field, width=260 if field == 'description' else 80, anchor=tk.E)
+        self.modal_tree.pack(fill=tk.BOTH, expand=True)
+        self.modal_tree.bind("<Double-1>", lambda e: self.overlay_modal_fits())
+        self.modal_modes = ttk.Label(win, text="", padding="5")
+        self.modal_modes.pack(fill=tk.X)
+        self.modal_tree.bind("<<TreeviewSelect>>", lambda e: self.show_selected_modes())
+
+    def run_modal_scan(self):
+        if not self.chanid:
+            messagebox.showerror("Error", "Load a .out file first")
+            return
+        try:
+            settings = {key: float(entry.get()) for key, entry in self.modal_entries.items()}
+        except ValueError:
+            messagebox.showerror("Error", "Modal settings must be numbers")
+            return
+
+        scope = self.modal_scope.get()
+        if scope == 'Graficados':
+            chans = [selection_channel(combo.get()) for combo in self.y_combos if combo.get()]
+            chans = [chan for chan in chans if isinstance(chan, int)]
+        elif scope == 'Búsqueda':
+            chans = list(self.search_results)
+        elif scope == 'Todos':
+            chans = list(self.chanid)
+        else:
+            chans = self.channel_index.search(f"type:{scope}", limit=None)
+        if not chans:
+            messagebox.showerror("Error", "No channels to analyse")
+            return
+
+        # Con datos en vivo el archivo sigue cambiando: ni lector ni cache
+        live = self.live_tail is not None
+        if self._start_worker(self._modal_worker, {
+            'chanid': self.overlay.runs[0].chanid, 'chandata': self.chandata, 'chans': chans,
+            'reader': None if live else self.chnfobj, 'settings': settings,
+            'path': None if live else self.outfile_path, 'cache': self.modal_cache,
+        }, 'run modal scan'):
+            self.modal_status.config(text=f"Analizando {len(chans)} canales...")
+
+    def _finish_modal(self, table):
+        self.modal_table = table
+        self.load_progress['value'] = 100
+        self._end_load("")
+        if self.modal_window is not None and self.modal_window.winfo_exists():
+            self.modal_sort = ('damping', False)
+            self.show_modal()
+
+    def sort_modal(self, field):
+        current, descending = self.modal_sort
+        self.modal_sort = (field, not descending if field == current else False)
+        self.show_modal()
+
+    def show_modal(self):
+        table = self.modal_table
+        if table is None:
+            return
+        field, descending = self.modal_sort
+        if field == 'description':
+            order = np.argsort(table.descriptions, kind='stable')[::-1 if descending else 1]
+        else:
+            order = table.order(field, descending)
+        self.modal_tree.delete(*self.modal_tree.get_children())
+        for i in order[:self.MODAL_ROWS]:
+            values = table.row(i)
+            self.modal_tree.insert('', tk.END, iid=str(i), values=values[:2] + [f"{v:.4g}" for v in values[2:]])
+        self.modal_status.config(text=f"Mostrando {min(len(table), self.MODAL_ROWS)} de {len(table)} canales "
+                                      f"(cache: {self.modal_cache.hits} aciertos)")
+
+    def show_selected_modes(self):
+        selected = self.modal_tree.selection()
+        if not selected or self.modal_table is None:
+            return
+        modes = self.modal_table.modes(int(selected[0]))
+        text = ", ".join(f"{f:.3f} Hz / {d * 100:.2f} %" for f, d, _ in modes)
+        self.modal_modes.config(text=f"Modos: {text}" if text else "Sin modos en la banda")
+
+    def modal_fit_label(self, key):
+        table, row, _ = self.modal_fits[key]
+        return f"{key}: ajuste {table.descriptions[row]}"
+
+    def overlay_modal_fits(self):
+        """Plot the selected channels together with their fitted modes."""
+        selected = self.modal_tree.selection()
+        table = self.modal_table
+        if not selected or table is None:
+            return
+        labels = []
+        for iid in selected:
+            row = int(iid)
+            chan = table.chans[row]
+            if chan not in self.chanid:
+                continue
+            key = f"m{chan}"
+            self.modal_fits[key] = (table, row, table.fit(row, self.chandata['time']))
+            labels += [self.chanid[chan], self.modal_fit_label(key)]
+        self.range_index.clear()
+        self.refresh_channel_lists()
+        self.add_y_selections(labels)
+        self.generate_plot(save_image=False)
+
+    # ----- Tablero de múltiplos pequeños -----
+    DASHBOARD_GROUPS = OrderedDict([('Tipo', 'type'), ('Bus', 'bus'), ('Canal', 'channel')])
+
+    def open_dashboard_window(self):
+        if self.dashboard_window is not None and self.dashboard_window.winfo_exists():
+            self.dashboard_window.lift()
+            return
+        if self.plot_model is None:
+            messagebox.showwarning("Warning", "Matplotlib is still loading, try again in a moment")
+            return
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
+
+        win = self.dashboard_window = tk.Toplevel(self.root)
+        win.title("Tablero")
+
+        inputs = ttk.Frame(win, padding="5")
+        inputs.pack(fill=tk.X)
+        ttk.Label(inputs, text="Canales (búsqueda):").pack(side=tk.LEFT, padx=5)
+        self.dashboard_query = ttk.Entry(inputs, width=30)
+        self.dashboard_query.insert(0, self.channel_search_var.get())
+        self.dashboard_query.pack(side=tk.LEFT, padx=5)
+        self.dashboard_query.bind("<Return>", lambda e: self.draw_dashboard())
+        ttk.Label(inputs, text="Un panel por:").pack(side=tk.LEFT, padx=5)
+        self.dashboard_group = ttk.Combobox(inputs, state="readonly", width=8, values=list(self.DASHBOARD_GROUPS))
+        self.dashboard_group.set('Tipo')
+        self.dashboard_group.pack(side=tk.LEFT, padx=5)
+        ttk.Label(inputs, text="Columnas:").pack(side=tk.LEFT, padx=5)
+        self.dashboard_cols = ttk.Entry(inputs, width=4)
+        self.dashboard_cols.pack(side=tk.LEFT, padx=5)
+        ttk.Button(inputs, text="Dibujar", command=self.draw_dashboard).pack(side=tk.LEFT, padx=5)
+        self.dashboard_status = ttk.Label(inputs, text="")
+        self.dashboard_status.pack(side=tk.LEFT, padx=5)
+
+        fig = Figure(figsize=(12, 7))
+        self.dashboard_canvas = FigureCanvasTkAgg(fig, master=win)
+        toolbar = NavigationToolbar2Tk(self.dashboard_canvas, win, pack_toolbar=False)
+        toolbar.update()
+        toolbar.pack(side=tk.BOTTOM, fill=tk.X)
+        self.dashboard_canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        self.dashboard = Dashboard(fig)
+        if self.chanid:
+            self.draw_dashboard()
+
+    def draw_dashboard(self):
+        if not self.chanid:
+            messagebox.showerror("Error", "Load a .out file first")
+            return
+        chans = self.channel_index.search(self.dashboard_query.get(), limit=None)
+        if not chans:
+            messagebox.showerror("Error", "No channels match the search")
+            return
+        try:
+            cols = int(self.dashboard_cols.get()) if self.dashboard_cols.get().strip() else None
+            settings = self.read_plot_settings()
+        except ValueError:
+            messagebox.showerror("Error", "Columns and font size must be integers")
+            return
+
+        t0 = time.perf_counter()
+        panels = group_channels(self.channel_index, chans, self.DASHBOARD_GROUPS[self.dashboard_group.get()])
+        with TRACER.span('dashboard.build', panels=len(panels)):
+            self.dashboard.build(self.chandata['time'], panels, self.channel_data, settings,
+                                 cols=cols, window=self.user_x_window())
+        with TRACER.span('dashboard.draw') as span:
+            self.dashboard_canvas.draw()
+            if TRACER.enabled:
+                span.set(points=self.dashboard.point_count())
+        shown = sum(len(members) for _, members in panels)
+        self.dashboard_status.config(text=f"{len(panels)} paneles, {shown} de {len(chans)} canales "
+                                          f"({time.perf_counter() - t0:.2f} s)")
+
+    # ----- Cribado de contingencias -----
+    SCREENING_ROWS = 1000  # filas mostradas (el CSV lleva todas)
+
+    def open_screening_window(self):
+        if self.screening_window is not None and self.screening_window.winfo_exists():
+            self.screening_window.lift()
+            return
+        win = self.screening_window = tk.Toplevel(self.root)
+        win.title("Cribado de contingencias")
+
+        inputs = ttk.Frame(win, padding="10")
+        inputs.pack(fill=tk.X)
+        ttk.Label(inputs, text="Carpeta:").grid(row=0, column=0, sticky=tk.W, padx=5)
+        self.screening_dir = ttk.Entry(inputs, width=60)
+        self.screening_dir.grid(row=0, column=1, sticky=tk.EW, padx=5)
+        ttk.Button(inputs, text="...", width=3, command=self.browse_screening_dir).grid(row=0, column=2)
+        ttk.Label(inputs, text="Criterios (JSON):").grid(row=1, column=0, sticky=tk.W, padx=5)
+        self.screening_criteria = ttk.Entry(inputs, width=60)
+        self.screening_criteria.grid(row=1, column=1, sticky=tk.EW, padx=5)
+        ttk.Button(inputs, text="...", width=3, command=self.browse_screening_criteria).grid(row=1, column=2)
+        ttk.Label(inputs, text="Procesos:").grid(row=2, column=0, sticky=tk.W, padx=5)
+        self.screening_jobs = ttk.Entry(inputs, width=6)
+        self.screening_jobs.insert(0, str(os.cpu_count() or 1))
+        self.screening_jobs.grid(row=2, column=1, sticky=tk.W, padx=5)
+        inputs.columnconfigure(1, weight=1)
+
+        buttons = ttk.Frame(win, padding="5")
+        buttons.pack(fill=tk.X)
+        ttk.Button(buttons, text="Ejecutar", command=self.run_screening).pack(side=tk.LEFT, padx=5)
+        ttk.Button(buttons, text="Exportar CSV...", command=self.export_screening).pack(side=tk.LEFT, padx=5)
+        self.screening_status = ttk.Label(buttons, text="")
+        self.screening_status.pack(side=tk.LEFT, padx=5)
+
+        self.screening_tree = ttk.Treeview(win, columns=REPORT_FIELDS, show='headings', height=20)
+        for field in REPORT_FIELDS:
+            self.screening_tree.heading(field, text=field)
+            width = 260 if field in ('file', 'description') else 140 if field == 'criterion' else 80
+            self.screening_tree.column(field, width=width, anchor=tk.W if width > 80 else tk.E)
+        self.screening_tree.pack(fill=tk.BOTH, expand=True)
+        # Doble clic: abre el archivo y grafica el canal
+        self.screening_tree.bind("<Double-1>", lambda e: self.open_screening_row())
+
+    def browse_screening_dir(self):
+        directory = filedialog.askdirectory()
+        if directory:
+            self.screening_dir.delete(0, tk.END)
+            self.screening_dir.insert(0, directory)
+
+    def browse_screening_criteria(self):
+        path = filedialog.askopenfilename(filetypes=[("JSON", "*.json")])
+        if path:
+            self.screening_criteria.delete(0, tk.END)
+            self.screening_criteria.insert(0, path)
+
+    def run_screening(self):
+        if self.live_tail is not None:
+            messagebox.showwarning("Warning", "Detenga el modo en vivo antes del cribado")
+            return
+        try:
+            criteria = load_criteria(self.screening_criteria.get())
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Error", f"Invalid criteria file:\n{e}")
+            return
+        files = find_out_files(self.screening_dir.get())
+        if not files:
+            messagebox.showerror("Error", "No .out files in the folder")
+            return
+        try:
+            jobs = max(1, int(self.screening_jobs.get()))
+        except ValueError:
+            jobs = None
+
+        if self._start_worker(self._screening_worker, {'files': files, 'criteria': criteria, 'jobs': jobs},
+                              'screen files'):
+            self.screening_status.config(text=f"Cribando {len(files)} archivos...")
+
+    def _finish_screening(self, report):
+        self.screening_report = report
+        self.screening_rows = report.ranked()
+        self.load_progress['value'] = 100
+        self._end_load("")
+        if self.screening_window is None or not self.screening_window.winfo_exists():
+            return
+
+        ranked = self.screening_rows
+        self.screening_tree.delete(*self.screening_tree.get_children())
+        for i, v in enumerate(ranked[:self.SCREENING_ROWS]):
+            values = [os.path.basename(v.path), v.criterion, v.chan, v.description] + \
+                     [f"{x:.4g}" for x in (v.value, v.limit, v.excess, v.severity, v.time, v.duration)]
+            self.screening_tree.insert('', tk.END, iid=str(i), values=values)
+        status = (f"{report.files} archivos, {len(report.by_file())} con violaciones, "
+                  f"{len(ranked)} violaciones en {report.seconds:.1f} s")
+        if report.errors:
+            status += f" ({len(report.errors)} errores)"
+        self.screening_status.config(text=status)
+
+    def open_screening_row(self):
+        selected = self.screening_tree.selection()
+        if not selected:
+            return
+        violation = self.screening_rows[int(selected[0])]
+        self.screening_target = (violation.path, violation.chan)
+        self.start_load(violation.path)
+
+    def export_screening(self):
+        if self.screening_report is None:
+            return
+        path = filedialog.asksaveasfilename(defaultextension=".csv", filetypes=[("CSV", "*.csv")])
+        if path:
+            try:
+                self.screening_report.write_csv(path)
+                self.screening_status.config(text=f"Guardado: {os.path.basename(path)}")
+            except OSError as e:
+                messagebox.showwarning("Error al guardar", str(e))
+
+    # ----- Modo en vivo -----
+    def toggle_follow(self):
+        if self.follow_var.get():
+            self.start_follow()
+        else:
+            self.stop_follow()
+
+    def start_follow(self):
+        if not self.chanid or self.live_tail is not None:
+            self.follow_var.set(self.live_tail is not None)
+            return
+        try:
+            tail = OutFileTail(self.outfile_path)
+        except (OSError, ChannelFileError) as e:
+            self.follow_var.set(False)
+            messagebox.showerror("Error", f"Can't follow this file:\n{str(e)}")
+            return
+
+        self.clear_overlay()
+        self.live_tail = tail
+        self.chandata = LiveChannelData(tail)
+        self.overlay.runs[0].chandata = self.chandata
+        self._live_tick()
+
+    def stop_follow(self):
+        # Los datos leídos hasta ahora se conservan; solo se detiene la consulta periódica
+        if self.live_after is not None:
+            self.root.after_cancel(self.live_after)
+            self.live_after = None
+        self.live_tail = None
+        self.follow_var.set(False)
+
+    def _live_tick(self):
+        self.live_after = None
+        tail = self.live_tail
+        if tail is None:
+            return
+        try:
+            added = tail.poll()
+        except (OSError, ChannelFileError) as e:
+            self.stop_follow()
+            messagebox.showerror("Error", f"Stopped following the file:\n{str(e)}")
+            return
+
+        if added:
+            self.range_index.clear()  # los índices min/max se construyeron con menos muestras
+            self.load_status.config(text=f"En vivo: t = {self.chandata['time'][-1]:.3f} s")
+            if self.plot_model is not None and self.plot_model.key is not None and not tail.pending:
+                self.generate_plot(save_image=False)
+        # Si quedó más por leer (archivo grande al empezar) se sigue de inmediato
+        self.live_after = self.root.after(1 if tail.pending else self.live_interval, self._live_tick)
+
     def update_comboboxes(self):
         # Crear lista de variables disponibles (incluyendo "time")
-        variables = ["time"] + list(self.chanid.values())
+        variables = ["time"] + self.channel_choices()
         
         # Actualizar combobox del eje X
         self.combo_x['values'] = variables
@@ -336,6 +1338,124 @@ class DynamicGraphApp:
             self.dual_y_check.pack_forget()
 
     
+    def channel_choices(self):
+        """Channel entries for the comboboxes, sorted and filtered with the stats table."""
+        chans = list(self.chanid)
+        if self.channel_search_var.get().strip() and self.channel_index is not None:
+            # Con una búsqueda activa las listas solo muestran los canales que la cumplen
+            matches = set(self.search_results)
+            chans = [chan for chan in chans if chan in matches]
+        if self.channel_stats is not None:
+            if self.hide_constant_var.get():
+                chans = self.channel_stats.filter_channels(chans, min_range=0.0)
+            field, descending = SORT_OPTIONS.get(self.channel_sort_var.get(), (None, False))
+            if field:
+                chans = self.channel_stats.sort_channels(chans, field, descending)
+        return [self.chanid[chan] for chan in chans] + [derived.label for derived in self.derived] + \
+            [self.modal_fit_label(key) for key in self.modal_fits]
+
+    def refresh_channel_lists(self, *_):
+        # Reordenar sin perder la selección actual de cada combobox
+        choices = self.channel_choices()
+        self.combo_x['values'] = ["time"] + choices
+        for combo in self.y_combos:
+            combo['values'] = choices
+
+    # ----- Búsqueda de canales -----
+    def schedule_channel_search(self, *_):
+        # Se busca cuando el usuario deja de escribir, no en cada tecla
+        if self.search_after is not None:
+            self.root.after_cancel(self.search_after)
+        self.search_after = self.root.after(150, self.run_channel_search)
+
+    def run_channel_search(self):
+        self.search_after = None
+        self.search_listbox.delete(0, tk.END)
+        query = self.channel_search_var.get().strip()
+        if self.channel_index is None or not query:
+            self.search_results = []
+            self.search_status.config(text="")
+            self.refresh_channel_lists()
+            return
+
+        self.search_results = self.channel_index.search(query, limit=None)
+        for chan in self.search_results[:MAX_RESULTS]:
+            self.search_listbox.insert(tk.END, self.chanid[chan])
+        shown = min(len(self.search_results), MAX_RESULTS)
+        self.search_status.config(text=f"{shown} de {len(self.search_results)} canales")
+        self.refresh_channel_lists()
+
+    def selected_search_channels(self):
+        picked = self.search_listbox.curselection()
+        return [self.search_results[i] for i in picked]
+
+    def use_search_as_x(self):
+        chans = self.selected_search_channels()
+        if chans:
+            self.combo_x.set(self.chanid[chans[0]])
+
+    def add_search_selection(self, chans=None):
+        """Put the given (or selected) search results in the Y comboboxes."""
+        chans = self.selected_search_channels() if chans is None else chans
+        self.add_y_selections([self.chanid[chan] for chan in chans])
+
+    def add_y_selections(self, labels):
+        # Cada entrada va en la última variable Y si está vacía, o en una nueva
+        for label in labels:
+            combo = self.y_combos[-1]
+            if combo.get() and combo.get() != label:
+                self.add_y_variable()
+                combo = self.y_combos[-1]
+            combo.set(label)
+
+    def add_all_search_results(self):
+        chans = self.search_results[:MAX_RESULTS]
+        if len(self.search_results) > MAX_RESULTS:
+            messagebox.showwarning("Warning", f"Solo se agregan los primeros {MAX_RESULTS} canales "
+                                              f"de {len(self.search_results)}")
+        self.add_search_selection(chans)
+
+    # ----- Canales derivados -----
+    def define_derived(self):
+        if not self.chanid:
+            messagebox.showerror("Error", "Load a .out file first")
+            return
+        try:
+            derived = self.derived.define(self.derived_name_entry.get(), self.derived_expr_entry.get(),
+                                          self.overlay.runs[0].chanid)
+        except ExpressionError as e:
+            messagebox.showerror("Error", f"Invalid derived channel:\n{str(e)}")
+            return
+        try:
+            self.derived.evaluate(derived.key, self.chandata)
+        except Exception as e:
+            self.derived.remove(derived.key)
+            messagebox.showerror("Error", f"Failed to evaluate derived channel:\n{str(e)}")
+            return
+        self.range_index.clear()
+        self.refresh_channel_lists()
+
+    def remove_derived(self):
+        name = self.derived_name_entry.get().strip() or self.derived_expr_entry.get().strip()
+        for derived in list(self.derived):
+            if derived.name == name:
+                self.derived.remove(derived.key)
+        self.refresh_channel_lists()
+
+    def channel_data(self, chan):
+        """Data of a real or derived channel of the loaded file (None if it doesn't exist)."""
+        if chan in self.derived:
+            return self.derived.evaluate(chan, self.chandata)
+        if chan in self.modal_fits:
+            table, row, fitted = self.modal_fits[chan]
+            if len(fitted) != len(self.chandata['time']):
+                fitted = table.fit(row, self.chandata['time'])
+                self.modal_fits[chan] = (table, row, fitted)
+            return fitted
+        if isinstance(chan, str) and chan != 'time':
+            return None  # canal derivado que ya se quitó
+        return self.chandata.get(chan)
+
     def add_y_variable(self):
         # Crear nuevo frame para el conjunto de opciones de una variable Y
         frame = ttk.Frame(self.y_frame)
@@ -365,12 +1485,17 @@ class DynamicGraphApp:
 
         # Inicializar si ya se cargó el archivo
         if self.chanid:
-            combo['values'] = list(self.chanid.values())
-            if len(self.y_combos) + 1 < len(self.chanid):
+            choices = self.channel_choices()
+            combo['values'] = choices
+            if len(self.y_combos) + 1 < len(choices):
                 combo.current(len(self.y_combos) + 1)
-            else:
+            elif choices:
                 combo.current(0)
 
+        # Actualizar la línea en vivo al editar su estilo
+        for entry in (color_entry, style_entry, label_entry):
+            entry.bind("<KeyRelease>", lambda e, c=combo: self.on_style_edit(c))
+
         # Guardar referencias
         self.y_combos.append(combo)
         self.y_styles.append((color_entry, style_entry, label_entry))
@@ -383,162 +1508,217 @@ class DynamicGraphApp:
             
         idx = self.y_combos.index(combo)
         self.y_combos.pop(idx)
+        self.y_styles.pop(idx)
         combo.master.destroy()  # Destroy the containing frame
     
+    def channel_range(self, chan, data, time_data=None, window=None):
+        """(min, max) of a channel, over the whole record or only inside the time window (t0, t1)."""
+        if window is not None:
+            vmin, vmax = self.range_index.window_minmax(chan, time_data, data, *window)
+            if not (np.isnan(vmin) or np.isnan(vmax)):
+                return vmin, vmax
+        # En modo en vivo la tabla de estadísticas ya no describe los datos
+        live = isinstance(self.chandata, LiveChannelData)
+        if self.channel_stats is not None and chan in self.channel_stats and not live:
+            return self.channel_stats.value_range(chan)
+        data = np.asarray(data, dtype=float)
+        return float(np.nanmin(data)), float(np.nanmax(data))
+
+    def user_x_window(self):
+        """(t0, t1) typed by the user in the X limit entries, or None if both are automatic.
+
+        An end left automatic is the edge of the time data.
+        """
+        typed = [bool(e.get()) and e.get() != self.auto_limits.get(e)
+                 for e in (self.xlim_min_entry, self.xlim_max_entry)]
+        if not any(typed):
+            return None
+        t = self.chandata['time'] if 'time' in self.chandata else []
+        if not len(t):
+            return None
+        try:
+            t0 = float(self.xlim_min_entry.get()) if typed[0] else float(t[0])
+            t1 = float(self.xlim_max_entry.get()) if typed[1] else float(t[-1])
+        except ValueError:
+            return None
+        return tuple(sorted((t0, t1)))
+
+    def set_auto_limit(self, entry, value):
+        # Solo se reemplaza si el campo está vacío o conserva el último valor automático
+        current = entry.get()
+        if current and current != self.auto_limits.get(entry):
+            return
+        text = f"{value:.2f}"
+        entry.delete(0, tk.END)
+        entry.insert(0, text)
+        self.auto_limits[entry] = text
+
+    def slot_style(self, slot, y_label, axis):
+        """(color, linestyle, label) typed in the style entries of a Y slot."""
+        color_entry, style_entry, label_entry = self.y_styles[slot]
+        color = color_entry.get() or self.line_colors[slot % len(self.line_colors)]
+        style = style_entry.get() or ('--' if axis == 2 else '-')
+        label = label_entry.get().strip() or y_label
+        return color, style, label
+
+    def slot_series(self, slot, axis, y_sel, y_data, y_label, overlay=False):
+        """Plot series (key, axis, data, style) of a Y slot: one line, or one per overlaid run."""
+        style = self.slot_style(slot, y_label, axis)
+        chan = selection_channel(y_sel)
+        if not overlay or not isinstance(chan, int):
+            return [(slot, axis, y_data, style)]
+
+        color, linestyle, label = style
+        series = []
+        runs = self.overlay.aligned(chan, y_label)
+        for r, (run, data) in enumerate(runs):
+            if data is None:
+                continue  # la corrida no tiene este canal
+            run_color = color if r == 0 else self.line_colors[r % len(self.line_colors)]
+            series.append(((slot, r), axis, data, (run_color, linestyle, f"{label} ({run.name})")))
+        return series
+
+    @TRACER.traced('generate_plot')
     def generate_plot(self, save_image=True):
+        if self.plot_model is None:
+            # Matplotlib todavía se está cargando: se grafica en cuanto esté listo
+            self.root.after(50, lambda: self.generate_plot(save_image))
+            return
+
         x_selection = self.combo_x.get()
         if not x_selection:
             messagebox.showerror("Error", "Please select an X-axis variable")
             return
 
-        y_selections = [combo.get() for combo in self.y_combos if combo.get()]
-        if not y_selections:
+        y_slots = [(slot, combo.get()) for slot, combo in enumerate(self.y_combos) if combo.get()]
+        if not y_slots:
             messagebox.showerror("Error", "Please select at least one Y-axis variable")
             return
 
         try:
-            self.ax.clear()
-            ax2 = None  # segundo eje
-
             # Obtener tamaño personalizado de la figura
             try:
                 width = float(self.fig_width_entry.get())
                 height = float(self.fig_height_entry.get())
-                self.fig.set_size_inches(width, height)
+                if tuple(self.fig.get_size_inches()) != (width, height):
+                    self.fig.set_size_inches(width, height)
             except ValueError:
                 pass  # Si el usuario mete algo no numérico, se ignora
 
 
 
-            # Obtener datos de X
-            if x_selection == "time":
-                x_data = self.chandata['time']
-                x_label = "Tiempo (s)"
-            else:
-                x_chan = int(x_selection.split(':')[0])
-                x_data = self.chandata.get(x_chan)
-                x_label = x_selection.split(': ')[1] if ': ' in x_selection else x_selection
+            with TRACER.span('generate_plot.data', channels=len(y_slots)):
+                # Obtener datos de X
+                if x_selection == "time":
+                    x_data = self.chandata['time']
+                    x_label = "Tiempo (s)"
+                else:
+                    x_chan = selection_channel(x_selection)
+                    x_data = self.channel_data(x_chan)
+                    x_label = selection_label(x_selection)
 
-            if x_data is None:
-                messagebox.showerror("Error", f"Data not available for X variable: {x_selection}")
-                return
+                if x_data is None:
+                    messagebox.showerror("Error", f"Data not available for X variable: {x_selection}")
+                    return
+
+                # Superposición de corridas: todas se grafican sobre la base de tiempo común
+                overlay = len(self.overlay) > 1 and x_selection == "time"
 
-            # Preparar límites automáticos
-            x_min, x_max = min(x_data), max(x_data)
-            y1_min, y1_max = float('inf'), float('-inf')
-            y2_min, y2_max = float('inf'), float('-inf')
-
-            use_dual_y = self.dual_y_var.get() and len(y_selections) >= 2
-
-            # Paso 1: calcular rangos de todas las variables Y
-            var_data_list = []
-            for y_sel in y_selections:
-                y_chan = int(y_sel.split(':')[0]) if y_sel != "time" else 'time'
-                y_data = self.chandata.get(y_chan)
-                y_label = y_sel.split(': ')[1] if ': ' in y_sel else y_sel
-                y_min_val, y_max_val = min(y_data), max(y_data)
-                var_range = y_max_val - y_min_val
-                var_data_list.append((y_sel, y_data, y_label, var_range, y_min_val, y_max_val))
-
-            # Paso 2: ordenar por rango
-            var_data_list.sort(key=lambda x: x[3], reverse=True)  # de mayor a menor rango
-
-            # Paso 3: asignar variables a ejes
-            use_dual_y = self.dual_y_var.get() and len(var_data_list) >= 2
-            y1_vars = []
-            y2_vars = []
-
-            if use_dual_y:
-                # Algoritmo simple: la primera (mayor rango) al eje izquierdo, el resto se evalúan
-                base_range = var_data_list[0][3]
-                y1_vars.append(var_data_list[0])
-                for item in var_data_list[1:]:
-                    if item[3] >= 0.1 * base_range:
-                        y1_vars.append(item)
+                # Preparar límites automáticos (desde la tabla de estadísticas)
+                if overlay:
+                    x_data = self.overlay.time_base()
+                    x_min, x_max = float(x_data[0]), float(x_data[-1])
+                else:
+                    x_min, x_max = self.channel_range('time' if x_selection == "time" else x_chan, x_data)
+
+                # Ventana de tiempo escrita por el usuario: los rangos Y se calculan solo dentro de ella
+                x_window = self.user_x_window() if x_selection == "time" else None
+
+                # Paso 1: calcular rangos de todas las variables Y
+                var_data_list = []
+                for slot, y_sel in y_slots:
+                    y_chan = selection_channel(y_sel)
+                    y_data = self.channel_data(y_chan)
+                    y_label = selection_label(y_sel)
+                    if overlay and isinstance(y_chan, int):
+                        y_min_val, y_max_val = self.overlay.channel_range(y_chan, y_label, x_window)
+                    elif overlay:
+                        # Canal derivado: solo de la corrida base, llevado a la base de tiempo común
+                        y_data = align(x_data, self.chandata['time'], y_data)
+                        y_min_val, y_max_val = self.channel_range((y_chan, 'overlay'), y_data, x_data, x_window)
                     else:
-                        y2_vars.append(item)
-            else:
-                y1_vars = var_data_list
-
-            # Paso 4: graficar
-            y1_min, y1_max = float('inf'), float('-inf')
-            y2_min, y2_max = float('inf'), float('-inf')
-
-            for i, (y_sel, y_data, y_label, _, y_min_v, y_max_v) in enumerate(y1_vars):
-                color_entry, style_entry, label_entry = self.y_styles[i]
-                color = color_entry.get() or self.line_colors[i % len(self.line_colors)]
-                style = style_entry.get() or '-'
-                label = label_entry.get().strip() or y_label
-                self.ax.plot(x_data, y_data, linestyle=style, color=color, label=label, linewidth=1.8)
-                y1_min = min(y1_min, y_min_v)
-                y1_max = max(y1_max, y_max_v)
-
-
-            if y2_vars:
-                ax2 = self.ax.twinx()
-                for j, (y_sel, y_data, y_label, _, y_min_v, y_max_v) in enumerate(y2_vars):
-                    i = j + len(y1_vars)
-                    color_entry, style_entry, label_entry = self.y_styles[i]
-                    color = color_entry.get() or self.line_colors[i % len(self.line_colors)]
-                    style = style_entry.get() or '--'
-                    label = label_entry.get().strip() or y_label
-                    ax2.plot(x_data, y_data, linestyle=style, color=color, label=label, linewidth=1.8)
+                        y_min_val, y_max_val = self.channel_range(y_chan, y_data, x_data, x_window)
+                    var_range = y_max_val - y_min_val
+                    var_data_list.append((slot, y_sel, y_data, y_label, var_range, y_min_val, y_max_val))
+
+            # Paso 2 y 3: ordenar por rango y asignar variables a ejes
+            y1_vars, y2_vars = assign_axes(var_data_list, self.dual_y_var.get(), lambda v: v[4])
+
+            with TRACER.span('generate_plot.lines') as span:
+                # Paso 4: graficar. Las líneas existentes se reutilizan mientras no cambien los canales
+                y1_min, y1_max = float('inf'), float('-inf')
+                y2_min, y2_max = float('inf'), float('-inf')
+                series = []
+
+                for slot, y_sel, y_data, y_label, _, y_min_v, y_max_v in y1_vars:
+                    series.extend(self.slot_series(slot, 1, y_sel, y_data, y_label, overlay))
+                    y1_min = min(y1_min, y_min_v)
+                    y1_max = max(y1_max, y_max_v)
+
+                for slot, y_sel, y_data, y_label, _, y_min_v, y_max_v in y2_vars:
+                    series.extend(self.slot_series(slot, 2, y_sel, y_data, y_label, overlay))
                     y2_min = min(y2_min, y_min_v)
                     y2_max = max(y2_max, y_max_v)
 
-            else:
-                ax2 = None
-
+                slot_axes = [(v[0], v[1], 1) for v in y1_vars] + [(v[0], v[1], 2) for v in y2_vars]
+                data_key = tuple(id(run) for run in self.overlay.runs) if overlay else id(self.chandata)
+                plot_key = (x_selection, tuple(slot_axes), data_key)
+                rebuilt = plot_key != self.plot_model.key
+                if rebuilt:
+                    self.plot_model.rebuild(plot_key, x_data, series, bool(y2_vars))
+                else:
+                    self.plot_model.update_data(x_data, series)
+                    for slot, _, _, style in series:
+                        self.plot_model.update_style(slot, style)
+                ax2 = self.plot_model.ax2
+                span.set(points=len(x_data) * len(series), rebuilt=rebuilt)
 
-            # Calcular padding
-            x_padding = (x_max - x_min) * 0.05
-            y1_padding = (y1_max - y1_min) * 0.05 if y1_max != y1_min else 1
-            y2_padding = (y2_max - y2_min) * 0.05 if y2_max != y2_min else 1
 
-            # Establecer límites X si campos están vacíos
-            if not self.xlim_min_entry.get():
-                self.xlim_min_entry.insert(0, f"{x_min - x_padding:.2f}")
-            if not self.xlim_max_entry.get():
-                self.xlim_max_entry.insert(0, f"{x_max + x_padding:.2f}")
+            # Establecer límites X si campos están vacíos (o con el valor automático anterior)
+            x_lo, x_hi = padded_limits(x_min, x_max)
+            self.set_auto_limit(self.xlim_min_entry, x_lo)
+            self.set_auto_limit(self.xlim_max_entry, x_hi)
             # Y1
-            if not self.ylim_min_entry.get():
-                self.ylim_min_entry.insert(0, f"{y1_min - y1_padding:.2f}")
-            if not self.ylim_max_entry.get():
-                self.ylim_max_entry.insert(0, f"{y1_max + y1_padding:.2f}")
+            y1_lo, y1_hi = padded_limits(y1_min, y1_max, flat_padding=1)
+            self.set_auto_limit(self.ylim_min_entry, y1_lo)
+            self.set_auto_limit(self.ylim_max_entry, y1_hi)
 
             if ax2 and y2_vars:
-                if not self.y2lim_min_entry.get():
-                    self.y2lim_min_entry.insert(0, f"{y2_min - y2_padding:.2f}")
-                if not self.y2lim_max_entry.get():
-                    self.y2lim_max_entry.insert(0, f"{y2_max + y2_padding:.2f}")
+                y2_lo, y2_hi = padded_limits(y2_min, y2_max, flat_padding=1)
+                self.set_auto_limit(self.y2lim_min_entry, y2_lo)
+                self.set_auto_limit(self.y2lim_max_entry, y2_hi)
 
 
             # Aplicar configuraciones y redibujar
-            legend_loc = self.legend_pos.get()
-            frameon = self.legend_frameon.get()
-            bbox_anchor = None
-
-            try:
-                if self.bbox_x.get() and self.bbox_y.get():
-                    bbox_anchor = (float(self.bbox_x.get()), float(self.bbox_y.get()))
-            except ValueError:
-                pass  # si están vacíos o mal puestos, se ignora
-
-            if self.ax.get_legend_handles_labels()[1]:
-                self.ax.legend(loc=legend_loc, fontsize=10, frameon=frameon, bbox_to_anchor=bbox_anchor)
-
-            if ax2 and ax2.get_legend_handles_labels()[1]:
-                self.ax.figure.tight_layout()
-                ax2.legend(loc=legend_loc, fontsize=10, frameon=frameon, bbox_to_anchor=bbox_anchor)
-
+            self.plot_model.end_blit()
+            with TRACER.span('generate_plot.legends'):
+                legend_settings = self.update_legends()
             self.apply_plot_settings(x_label, ax2)
 
             # Guardar imagen si está activado
-            if self.save_var.get():
+            if save_image and self.save_var.get():
                 self.save_figure_as_png()
 
-            self.fig.tight_layout()
-            self.canvas.draw()
+            layout_key = (tuple(self.plot_settings.items()), tuple(self.fig.get_size_inches()),
+                          legend_settings, self.y2lim_min_entry.get(), self.y2lim_max_entry.get(),
+                          self.plot_model.key)
+            if self.plot_model.needs_layout(layout_key):
+                with TRACER.span('generate_plot.layout'):
+                    self.fig.tight_layout()
+            with TRACER.span('generate_plot.draw') as span:
+                self.canvas.draw()
+                if TRACER.enabled:
+                    span.set(points=sum(len(line.get_xdata()) for line, _, _ in self.decimator.lines))
 
 
 
@@ -546,11 +1726,51 @@ class DynamicGraphApp:
         except Exception as e:
             messagebox.showerror("Error", f"Failed to generate plot:\n{str(e)}")
 
+    def legend_options(self):
+        """(loc, frameon, bbox_anchor) from the legend options."""
+        legend_loc = self.legend_pos.get()
+        frameon = self.legend_frameon.get()
+        bbox_anchor = None
 
-    def apply_plot_settings(self, x_label, ax2=None):
-        """Apply all the plot customization settings"""
-        # Get plot settings from UI
-        self.plot_settings = {
+        try:
+            if self.bbox_x.get() and self.bbox_y.get():
+                bbox_anchor = (float(self.bbox_x.get()), float(self.bbox_y.get()))
+        except ValueError:
+            pass  # si están vacíos o mal puestos, se ignora
+        return legend_loc, frameon, bbox_anchor
+
+    def update_legends(self):
+        """(Re)build the legends of both Y axes from the legend options; returns the options used."""
+        legend_loc, frameon, bbox_anchor = self.legend_options()
+        for legend in draw_legends((self.ax, self.plot_model.ax2), legend_loc, frameon, bbox_anchor):
+            self.plot_model.mark_animated(legend)
+
+        return legend_loc, frameon, bbox_anchor
+
+    def on_style_edit(self, combo):
+        # Edición en vivo de color/estilo/etiqueta: solo se actualiza esa línea (con blitting)
+        if combo not in self.y_combos or self.plot_model is None:
+            return
+        slot = self.y_combos.index(combo)
+        line = self.plot_model.lines.get(slot)
+        if line is None:
+            return
+        from matplotlib.colors import is_color_like
+
+        axis = 2 if line.axes is self.plot_model.ax2 else 1
+        style = self.slot_style(slot, selection_label(combo.get()), axis)
+        if not is_color_like(style[0]):
+            return  # color a medio escribir
+        try:
+            if self.plot_model.update_style(slot, style):
+                self.update_legends()
+                self.plot_model.blit()
+        except ValueError:
+            pass  # estilo de línea a medio escribir
+
+    def read_plot_settings(self):
+        """Plot settings typed in the UI (DEFAULT_SETTINGS keys)."""
+        return {
             'title': self.title_entry.get(),
             'xlabel': self.xlabel_entry.get(),
             'ylabel': self.ylabel_entry.get(),
@@ -563,56 +1783,17 @@ class DynamicGraphApp:
             'grid': self.grid_var.get()
 
         }
-        
-        # Apply title and labels
-        self.ax.set_title(self.plot_settings['title'], 
-                        fontfamily=self.plot_settings['font_family'],
-                        fontsize=self.plot_settings['font_size'])
-        
-        xlabel = self.plot_settings['xlabel'] if self.plot_settings['xlabel'] else x_label
-        self.ax.set_xlabel(xlabel,
-                        fontfamily=self.plot_settings['font_family'],
-                        fontsize=self.plot_settings['font_size'])
-        
-        self.ax.set_ylabel(self.plot_settings['ylabel'],
-                        fontfamily=self.plot_settings['font_family'],
-                        fontsize=self.plot_settings['font_size'])
-        
-        # Apply custom limits if they're specified and valid
-        try:
-            if self.plot_settings['xlim_min'] and self.plot_settings['xlim_max']:
-                self.ax.set_xlim(float(self.plot_settings['xlim_min']), 
-                                float(self.plot_settings['xlim_max']))
-            if self.plot_settings['ylim_min'] and self.plot_settings['ylim_max']:
-                self.ax.set_ylim(float(self.plot_settings['ylim_min']), 
-                                float(self.plot_settings['ylim_max']))
-            if ax2:
-                try:
-                    ylim2_min = self.y2lim_min_entry.get()
-                    ylim2_max = self.y2lim_max_entry.get()
-                    if ylim2_min and ylim2_max:
-                        ax2.set_ylim(float(ylim2_min), float(ylim2_max))
-                except ValueError:
-                    pass  # Si hay error en la entrada, se usa el autoescalado
 
-        except ValueError:
-            pass  # Keep auto-scaled limits if custom ones are invalid
-        
-        # Set grid
-        self.ax.grid(self.plot_settings['grid'])
-        
-        # Apply font to all text elements
-        for item in ([self.ax.title, self.ax.xaxis.label, self.ax.yaxis.label] +
-                    self.ax.get_xticklabels() + self.ax.get_yticklabels()):
-            item.set_fontfamily(self.plot_settings['font_family'])
-            item.set_fontsize(self.plot_settings['font_size'])
-
-        if ax2:
-            for item in ([ax2.yaxis.label] + ax2.get_yticklabels()):
-                item.set_fontfamily(self.plot_settings['font_family'])
-                item.set_fontsize(self.plot_settings['font_size'])
+    @TRACER.traced('apply_plot_settings')
+    def apply_plot_settings(self, x_label, ax2=None):
+        """Apply all the plot customization settings"""
+        # Get plot settings from UI
+        self.plot_settings = self.read_plot_settings()
+        apply_plot_settings(self.ax, self.plot_settings, x_label, ax2,
+                            (self.y2lim_min_entry.get(), self.y2lim_max_entry.get()))
 
 
+    @TRACER.traced('save_figure_as_png')
     def save_figure_as_png(self):
         if not hasattr(self, 'outfile_path') or not self.outfile_path:
             return
@@ -629,8 +1810,9 @@ class DynamicGraphApp:
                 
 
             # Sanitizar nombre
-            safe_title = re.sub(r'[\\/*?:"<>|]', "_", filename).replace(" ", "_")
-            save_path = os.path.join(out_dir, f"{safe_title}.png")
+            safe_title = safe_filename(filename)
+            extension = self.export_format.get().lower() or "png"
+            save_path = os.path.join(out_dir, f"{safe_title}.{extension}")
 
             # Guardar
             # Leer DPI desde la interfaz
@@ -639,12 +1821,141 @@ class DynamicGraphApp:
             except ValueError:
                 dpi_value = 300  # valor por defecto
 
-            self.fig.savefig(save_path, dpi=dpi_value, bbox_inches='tight', transparent=True)
+            # Foto inmutable de la gráfica (datos completos, no la versión reducida de pantalla);
+            # se dibuja y guarda en un proceso de trabajo
+            with TRACER.span('save_figure_as_png.snapshot', dpi=dpi_value):
+                snapshot = snapshot_plot(self.plot_model, self.decimator, self.plot_settings, self.ax.get_xlabel(),
+                                         self.legend_options(), save_path, dpi_value)
+            with TRACER.span('save_figure_as_png.submit') as span:
+                job = self.export_queue.submit(snapshot)
+                span.set(cached=job.cached)
+            self.refresh_export_list()
+            if not self.export_polling:
+                self.export_polling = True
+                self.root.after(200, self._poll_exports)
 
 
         except Exception as e:
             messagebox.showwarning("Error al guardar imagen", str(e))
 
+    def refresh_export_list(self):
+        self.export_listbox.delete(0, tk.END)
+        for job in self.export_queue.jobs[-20:]:
+            if job.error is not None:
+                state = "error"
+            elif job.cached:
+                state = "copiada del cache"
+            elif job.seconds is not None:
+                state = f"listo, {job.seconds:.1f} s"
+            else:
+                state = "pendiente"
+            self.export_listbox.insert(tk.END, f"{job.name} ({state})")
+        pending = len(self.export_queue.pending())
+        if pending:
+            self.export_status.config(text=f"{pending} exportaciones pendientes")
+
+    def _poll_exports(self):
+        finished = self.export_queue.collect()
+        if finished:
+            self.refresh_export_list()
+            last = finished[-1]
+            if not self.export_queue.pending():
+                self.export_status.config(text=f"Guardado: {last.save_path}{self.render_cache_text()}")
+            for job in finished:
+                if job.seconds is not None and not job.cached:
+                    # Dibujo y guardado en el proceso de trabajo (tiempo medido allá)
+                    TRACER.record('save_figure_as_png.render', job.seconds, {'file': job.name})
+                if job.error is not None:
+                    messagebox.showwarning("Error al guardar imagen", f"{job.name}:\n{job.error}")
+
+        if self.export_queue.pending():
+            self.root.after(200, self._poll_exports)
+        else:
+            self.export_polling = False
+
+    def render_cache_text(self):
+        cache = self.export_queue.cache
+        if cache is None or not cache.hits + cache.misses:
+            return ""
+        return f" (cache de imágenes: {cache.hits}/{cache.hits + cache.misses} aciertos)"
+
+    # ----- Rendimiento -----
+    PERF_COLUMNS = ('etapa', 'n', 'último ms', 'media ms', 'máx ms', 'pico MB', 'detalle')
+    PERF_REFRESH = 500  # ms entre actualizaciones del panel
+
+    def toggle_perf_panel(self):
+        if self.perf_panel_var.get():
+            self.open_perf_panel()
+        else:
+            self.close_perf_panel()
+
+    def open_perf_panel(self):
+        """Show the recent stage timings; tracing is on while the panel is open."""
+        if self.perf_window is not None and self.perf_window.winfo_exists():
+            self.perf_window.lift()
+            return
+        win = self.perf_window = tk.Toplevel(self.root)
+        win.title("Rendimiento")
+        win.protocol("WM_DELETE_WINDOW", self.close_perf_panel)
+        self.perf_panel_var.set(True)
+        self.perf_memory_var = tk.BooleanVar(value=TRACER.trace_memory)
+
+        buttons = ttk.Frame(win, padding="5")
+        buttons.pack(fill=tk.X)
+        ttk.Checkbutton(buttons, text="Medir memoria (más lento)", variable=self.perf_memory_var,
+                        command=lambda: TRACER.enable(self.perf_memory_var.get())).pack(side=tk.LEFT, padx=5)
+        ttk.Button(buttons, text="Limpiar", command=self.clear_perf).pack(side=tk.LEFT, padx=5)
+        ttk.Button(buttons, text="Exportar traza...", command=self.export_trace).pack(side=tk.LEFT, padx=5)
+        self.perf_status = ttk.Label(buttons, text="")
+        self.perf_status.pack(side=tk.LEFT, padx=5)
+
+        self.perf_tree = ttk.Treeview(win, columns=self.PERF_COLUMNS, show='headings', height=16)
+        for column in self.PERF_COLUMNS:
+            self.perf_tree.heading(column, text=column)
+            self.perf_tree.column(column, width={'etapa': 220, 'detalle': 260}.get(column, 70),
+                                  anchor=tk.W if column in ('etapa', 'detalle') else tk.E)
+        self.perf_tree.pack(fill=tk.BOTH, expand=True)
+
+        TRACER.enable(self.perf_memory_var.get())
+        self.show_perf()
+
+    def close_perf_panel(self):
+        TRACER.disable()
+        if self.perf_after is not None:
+            self.root.after_cancel(self.perf_after)
+            self.perf_after = None
+        self.perf_panel_var.set(False)
+        if self.perf_window is not None and self.perf_window.winfo_exists():
+            self.perf_window.destroy()
+        self.perf_window = None
+
+    def show_perf(self):
+        if self.perf_window is None or not self.perf_window.winfo_exists():
+            return
+        self.perf_tree.delete(*self.perf_tree.get_children())
+        # Orden por nombre: cada etapa queda debajo de la función que la contiene
+        for name, (count, last, mean, longest, peak, args) in sorted(TRACER.summary().items()):
+            detail = ", ".join(f"{key}={value}" for key, value in args.items())
+            self.perf_tree.insert('', tk.END, values=(
+                name, count, f"{last * 1000:.1f}", f"{mean * 1000:.1f}", f"{longest * 1000:.1f}",
+                "" if peak != peak else f"{peak:.1f}", detail))
+        self.perf_status.config(text=f"{len(TRACER.spans)} mediciones{self.render_cache_text()}")
+        self.perf_after = self.root.after(self.PERF_REFRESH, self.show_perf)
+
+    def clear_perf(self):
+        TRACER.clear()
+        self.perf_tree.delete(*self.perf_tree.get_children())
+
+    def export_trace(self):
+        path = filedialog.asksaveasfilename(defaultextension=".json", filetypes=[("Chrome trace", "*.json")])
+        if path:
+            try:
+                TRACER.write_chrome_trace(path)
+                self.perf_status.config(text=f"Guardado: {os.path.basename(path)}")
+            except OSError as e:
+                messagebox.showwarning("Error al guardar", str(e))
+
+    @TRACER.traced('reset_axes')
     def reset_axes(self):
         # Limpiar los campos de límites (ejes X, Y1, Y2)
         for entry in [self.xlim_min_entry, self.xlim_max_entry,
@@ -652,12 +1963,22 @@ class DynamicGraphApp:
                     self.y2lim_min_entry, self.y2lim_max_entry]:
             entry.delete(0, tk.END)
 
-        # Regenerar completamente el gráfico SIN guardar imagen
-        self.ax.clear()
+        # Recalcular límites SIN guardar imagen (las líneas existentes se conservan)
         self.generate_plot(save_image=False)
 
 
 if __name__ == "__main__":
     root = tk.Tk()
     app = DynamicGraphApp(root)
+    if '--tiempos' in sys.argv:
+        # Verificación del arranque: se cierra cuando la figura está lista
+        def report_startup():
+            if app.plot_model is None:
+                root.after(20, report_startup)
+                return
+            print(app.startup_report())
+            root.destroy()
+        root.after(20, report_startup)
     root.mainloop()
+    if '--tiempos' in sys.argv:
+        sys.exit(0 if app.startup_times.get('primera pintura', 0.0) <= STARTUP_BUDGET else 1)
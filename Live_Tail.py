@@ -0,0 +1,106 @@
+# Live_Tail.py
+# Seguimiento de un archivo .out mientras la simulacion lo sigue escribiendo.
+
+# Se lee solo lo que se agrego desde la ultima consulta: los registros completos nuevos se copian
+# a un buffer por columnas que crece al doble cuando se llena (costo amortizado constante por
+# muestra). Un registro final a medio escribir no se consume hasta que este completo, y si los
+# marcadores de un registro no coinciden todavia (el escritor no termino de volcarlo) se espera a
+# la siguiente consulta sin avanzar.
+
+import os
+
+import numpy as np
+
+from Channel_Reader import SAMPLE_DTYPE, ChannelFileError, OutFileReader
+
+INITIAL_CAPACITY = 1024
+# Bytes leidos como maximo por consulta (en archivos anchos un registro pesa decenas de KB);
+# siempre se lee al menos un registro
+CHUNK_BYTES = 64 * 1024 * 1024
+
+
+class GrowableColumns:
+    """Column-major float buffer that doubles its capacity when it fills up."""
+
+    def __init__(self, ncols, capacity=INITIAL_CAPACITY, dtype=SAMPLE_DTYPE):
+        self.count = 0
+        self._buf = np.empty((ncols, capacity), dtype=dtype)
+
+    @property
+    def capacity(self):
+        return self._buf.shape[1]
+
+    def append(self, rows):
+        """Append a (n, ncols) block of rows."""
+        n = len(rows)
+        needed = self.count + n
+        if needed > self.capacity:
+            grown = np.empty((self._buf.shape[0], max(needed, 2 * self.capacity)), dtype=self._buf.dtype)
+            grown[:, :self.count] = self._buf[:, :self.count]
+            self._buf = grown
+        self._buf[:, self.count:needed] = rows.T
+        self.count = needed
+
+    def column(self, col):
+        return self._buf[col, :self.count]
+
+
+class OutFileTail:
+    """Incremental reader of a .out file that is still being written."""
+
+    def __init__(self, path):
+        self.reader = OutFileReader(path)
+        self.path = path
+        self.offset = self.reader.data_offset  # primer byte sin consumir
+        self.columns = GrowableColumns(self.reader.nchan + 1)
+        self.pending = False  # quedaron registros completos sin leer en la ultima consulta
+
+    @property
+    def nsteps(self):
+        return self.columns.count
+
+    def poll(self, max_bytes=CHUNK_BYTES):
+        """Read the complete records appended since the last call (up to max_bytes); returns how many."""
+        size = os.path.getsize(self.path)
+        if size < self.offset:
+            raise ChannelFileError("The channel file was truncated or rewritten")
+
+        itemsize = self.reader.dtype.itemsize
+        available = (size - self.offset) // itemsize
+        count = available if max_bytes is None else min(available, max(1, max_bytes // itemsize))
+        if not count:
+            self.pending = False
+            return 0
+
+        records = np.fromfile(self.path, dtype=self.reader.dtype, count=count, offset=self.offset)
+        marker = self.reader.dtype['values'].itemsize
+        bad = np.flatnonzero((records['head'] != marker) | (records['tail'] != marker))
+        if bad.size:
+            records = records[:bad[0]]
+
+        self.columns.append(records['values'])
+        self.offset += len(records) * itemsize
+        self.pending = not bad.size and available > count
+        return len(records)
+
+
+class LiveChannelData:
+    """Dict-like view of the channels read so far by an OutFileTail."""
+
+    def __init__(self, tail):
+        self.tail = tail
+
+    def __getitem__(self, chan):
+        return self.tail.columns.column(self.tail.reader.column_index(chan))
+
+    def get(self, chan, default=None):
+        try:
+            return self[chan]
+        except KeyError:
+            return default
+
+    def __contains__(self, chan):
+        return chan == 'time' or (isinstance(chan, int) and 1 <= chan <= self.tail.reader.nchan)
+
+    def keys(self):
+        return self.tail.reader.chanid.keys()
@@ -0,0 +1,299 @@
+# Modal_Analysis.py
+# Barrido modal: frecuencia y amortiguamiento de las oscilaciones post-falla de muchos canales.
+
+# Para cada canal se toma la ventana [t_start, t_end] despues del despeje y se lleva a una malla
+# uniforme de sample_rate Hz (promedio por intervalos, que tambien filtra lo que esta por encima de
+# la nueva frecuencia de Nyquist). Se le quita la tendencia lineal y sobre el resultado:
+#   - FFT (ventana de Hann) para la frecuencia dominante de referencia
+#   - matrix pencil para los modos: polos s = sigma + j*omega y sus residuos, de donde salen
+#     frecuencia (Hz), amortiguamiento (zeta = -sigma/|s|) y amplitud. El orden de cada canal es el
+#     numero de valores singulares de su matriz de Hankel mayores que rank_tol * el mayor (a lo sumo
+#     "order"): una senal limpia con un modo usa dos polos y no se le inventan modos de relleno
+# Todo se hace por bloques de canales con operaciones apiladas de NumPy (una SVD por bloque; un
+# eigvals y un pinv por grupo de canales del mismo orden), sin recorrer los canales uno por uno.
+# Los modos dentro de [f_min, f_max] con amplitud >= min_amplitude * la mayor del canal y
+# >= min_rms_amplitude * el RMS del canal sin tendencia son los significativos (lo demas es ruido);
+# los canales se ordenan por el menor amortiguamiento de sus modos significativos. Los canales sin
+# energia despues de quitar la tendencia (planos o rampas) no tienen modos: quedan en NaN.
+# Los resultados se guardan en un cache por archivo (ruta, tamaño y fecha), canales y opciones.
+
+from collections import OrderedDict
+
+import numpy as np
+
+from Channel_Cache import source_key
+from Channel_Metrics import channel_blocks
+from Channel_Reader import check_cancel
+
+MODAL_FIELDS = ('freq', 'damping', 'amplitude', 'fft_freq', 'fit')
+
+DEFAULT_MODAL_SETTINGS = {
+    't_start': 1.2,  # s, inicio de la ventana (despues del despeje)
+    't_end': 10.0,  # s
+    'f_min': 0.1,  # Hz, banda de las oscilaciones electromecanicas
+    'f_max': 2.5,  # Hz
+    'sample_rate': 10.0,  # Hz de la malla uniforme
+    'order': 10,  # polos maximos del modelo (un modo oscilatorio usa dos)
+    'min_amplitude': 0.1,  # fraccion de la mayor amplitud del canal
+    'min_rms_amplitude': 0.5,  # fraccion del RMS del canal sin tendencia
+    'rank_tol': 1e-3,  # valores singulares menores que esta fraccion del mayor son ruido
+}
+
+# RMS sin tendencia por debajo de esta fraccion del valor del canal: sin energia (error de redondeo)
+QUIET_RMS = 1e-9
+
+CACHE_ENTRIES = 16
+
+
+class ModalError(ValueError):
+    """Raised when the analysis window has too few samples."""
+
+
+class ModalTable:
+    """Modes of each channel (poles and residues of the fit) and its dominant/least damped mode."""
+
+    def __init__(self, chans, descriptions, columns, poles, residues, trend, rms, grid, settings):
+        self.chans = list(chans)
+        self.descriptions = list(descriptions)
+        self.columns = columns
+        self.poles = poles  # (canales, order) complejos, en 1/s; 0 en los polos no usados
+        self.residues = residues  # (canales, order) complejos
+        self.trend = trend  # (canales, 2): pendiente y ordenada de la tendencia lineal
+        self.rms = rms  # (canales,): RMS sin tendencia, NaN si el canal no tiene energia
+        self.grid = grid  # malla uniforme de la ventana
+        self.settings = settings
+
+    def __len__(self):
+        return len(self.chans)
+
+    def order(self, field='damping', descending=False):
+        """Row order sorted by field (NaN always last)."""
+        if field == 'chan':
+            keys = np.arange(len(self.chans), dtype=np.float64)
+        else:
+            keys = self.columns[field]
+        keys = -keys if descending else keys
+        return np.argsort(np.where(np.isnan(keys), np.inf, keys), kind='stable')
+
+    def row(self, i):
+        return [self.chans[i], self.descriptions[i]] + [float(self.columns[f][i]) for f in MODAL_FIELDS]
+
+    def modes(self, i):
+        """Significant modes of row i as (freq Hz, damping, amplitude), least damped first."""
+        freq, damping, amplitude, significant = _mode_parameters(self.poles[i:i + 1], self.residues[i:i + 1],
+                                                                 self.rms[i:i + 1], self.settings)
+        keep = np.flatnonzero(significant[0])
+        keep = keep[np.argsort(damping[0, keep])]
+        return [(float(freq[0, k]), float(damping[0, k]), float(amplitude[0, k])) for k in keep]
+
+    def fit(self, i, t):
+        """Fitted signal of row i at times t (NaN outside the analysis window)."""
+        t = np.asarray(t, dtype=np.float64)
+        inside = (t >= self.grid[0]) & (t <= self.grid[-1])
+        tau = t[inside] - self.grid[0]
+        out = np.full(len(t), np.nan)
+        with np.errstate(all='ignore'):
+            modes = np.exp(np.outer(tau, self.poles[i])) @ self.residues[i]
+        out[inside] = modes.real + self.trend[i, 0] * tau + self.trend[i, 1]
+        return out
+
+
+def uniform_window(block, t, settings):
+    """(grid, block resampled on it): mean of the samples in each 1/sample_rate interval."""
+    step = 1.0 / settings['sample_rate']
+    t_end = min(settings['t_end'], float(t[-1])) if len(t) else settings['t_start']
+    grid = np.arange(settings['t_start'], t_end + step / 2, step)
+    if len(grid) < 8:
+        raise ModalError("The analysis window has too few samples")
+
+    block = np.asarray(block, dtype=np.float64)
+    sums = np.concatenate((np.zeros((len(block), 1)), np.nancumsum(block, axis=1)), axis=1)
+    start = np.searchsorted(t, grid - step / 2, side='left')
+    end = np.searchsorted(t, grid + step / 2, side='left')
+    count = end - start
+    with np.errstate(invalid='ignore', divide='ignore'):
+        values = (sums[:, end] - sums[:, start]) / count
+
+    # Intervalos sin muestras (paso de integracion mayor que la malla): interpolacion lineal
+    empty = np.flatnonzero(count == 0)
+    if len(empty):
+        right = np.clip(np.searchsorted(t, grid[empty], side='right'), 1, len(t) - 1)
+        left = right - 1
+        span = t[right] - t[left]
+        w = np.where(span > 0, (grid[empty] - t[left]) / np.where(span > 0, span, 1.0), 0.0)
+        values[:, empty] = block[:, left] * (1 - w) + block[:, right] * w
+    return grid, values
+
+
+def _detrend(values, tau):
+    # Tendencia lineal por canal (minimos cuadrados en bloque)
+    slope, intercept = np.polyfit(tau, values.T, 1)
+    return values - np.outer(slope, tau) - intercept[:, np.newaxis], np.column_stack((slope, intercept))
+
+
+def _fft_peak(values, fs, settings):
+    """Frequency of the largest in-band FFT peak of each row."""
+    n = values.shape[1]
+    nfft = 4 * n  # relleno con ceros: mejor resolucion de la frecuencia del pico
+    spectrum = np.abs(np.fft.rfft(values * np.hanning(n), n=nfft, axis=1))
+    freqs = np.fft.rfftfreq(nfft, 1.0 / fs)
+    band = (freqs >= settings['f_min']) & (freqs <= settings['f_max'])
+    if not band.any():
+        return np.full(len(values), np.nan)
+    peak = np.argmax(spectrum[:, band], axis=1)
+    return freqs[band][peak]
+
+
+def matrix_pencil(values, fs, order, tol=DEFAULT_MODAL_SETTINGS['rank_tol']):
+    """Poles (1/s) and residues of each row, with the matrix pencil method (stacked over rows).
+
+    Each row uses as many poles as singular values above tol * the largest (at most order); the
+    unused poles and residues are 0.
+    """
+    n = values.shape[1]
+    pencil = n // 3
+    order = max(1, min(order, pencil))
+    hankel = np.lib.stride_tricks.sliding_window_view(values, pencil + 1, axis=1)  # (filas, n - L, L + 1)
+    _, sv, vh = np.linalg.svd(hankel, full_matrices=False)
+    ranks = np.minimum((sv > tol * sv[:, :1]).sum(axis=1), order)
+    v = np.conj(np.swapaxes(vh[:, :order, :], 1, 2))  # subespacio de senal, (filas, L + 1, order)
+
+    # Un eigvals apilado por cada orden distinto (a lo sumo "order" grupos)
+    z = np.full((len(values), order), np.nan, dtype=complex)
+    for rank in np.unique(ranks[ranks > 0]):
+        rows = np.flatnonzero(ranks == rank)
+        sub = v[rows, :, :rank]
+        z[rows, :rank] = np.linalg.eigvals(np.linalg.pinv(sub[:, :-1, :]) @ sub[:, 1:, :])
+
+    # Residuos por minimos cuadrados sobre la matriz de Vandermonde de los polos usados
+    k = np.arange(n)
+    used = np.isfinite(z)
+    with np.errstate(all='ignore'):
+        vander = np.where(used[:, np.newaxis, :], z[:, np.newaxis, :] ** k[np.newaxis, :, np.newaxis], 0.0)
+        residues = (np.linalg.pinv(vander) @ values[..., np.newaxis].astype(complex))[..., 0]
+        poles = np.log(z) * fs
+    # Un polo en cero (z = 0) o no usado no aporta nada a la senal
+    invalid = ~np.isfinite(poles) | ~np.isfinite(residues)
+    poles[invalid] = 0.0
+    residues[invalid] = 0.0
+    return poles, residues
+
+
+def _mode_parameters(poles, residues, rms, settings):
+    """(freq, damping, amplitude, significant) of every pole; only one of each conjugate pair counts.
+
+    rms is the detrended RMS of each row (NaN for rows without energy, which have no modes).
+    """
+    with np.errstate(all='ignore'):
+        freq = poles.imag / (2 * np.pi)
+        damping = -poles.real / np.abs(poles)
+        amplitude = 2 * np.abs(residues)
+    in_band = (freq >= settings['f_min']) & (freq <= settings['f_max']) & np.isfinite(damping)
+    strongest = np.max(np.where(in_band, amplitude, 0.0), axis=1, keepdims=True)
+    with np.errstate(invalid='ignore'):
+        significant = (in_band & (amplitude >= settings['min_amplitude'] * strongest) & (strongest > 0) &
+                       (amplitude >= settings['min_rms_amplitude'] * rms[:, np.newaxis]))
+    return freq, damping, amplitude, significant
+
+
+def block_modes(block, t, settings):
+    """Modal scan of a 2-D (channels x time) block; returns (columns, poles, residues, trend, rms, grid)."""
+    grid, values = uniform_window(block, t, settings)
+    fs = settings['sample_rate']
+    tau = grid - grid[0]
+    bad = ~np.isfinite(values).all(axis=1)
+    values[bad] = 0.0
+    detrended, trend = _detrend(values, tau)
+
+    # Sin energia despues de quitar la tendencia: no hay nada que ajustar
+    rms = np.sqrt((detrended ** 2).mean(axis=1))
+    quiet = bad | (rms <= QUIET_RMS * np.maximum(np.abs(values).max(axis=1), 1.0))
+    detrended[quiet] = 0.0
+    rms[quiet] = np.nan
+
+    poles, residues = matrix_pencil(detrended, fs, int(settings['order']), settings['rank_tol'])
+    freq, damping, amplitude, significant = _mode_parameters(poles, residues, rms, settings)
+
+    # Modo del canal: el significativo con menor amortiguamiento
+    rows = np.arange(len(values))
+    pick = np.argmin(np.where(significant, damping, np.inf), axis=1)
+    has_mode = significant.any(axis=1)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        fitted = (np.exp(np.outer(tau, poles).reshape(len(tau), len(values), -1).swapaxes(0, 1))
+                  @ residues[..., np.newaxis])[..., 0].real
+        energy = (detrended ** 2).sum(axis=1)
+        fit = np.where(quiet, np.nan, 1.0 - ((detrended - fitted) ** 2).sum(axis=1) / energy)
+
+    columns = {
+        'freq': np.where(has_mode, freq[rows, pick], np.nan),
+        'damping': np.where(has_mode, damping[rows, pick], np.nan),
+        'amplitude': np.where(has_mode, amplitude[rows, pick], np.nan),
+        'fft_freq': np.where(quiet, np.nan, _fft_peak(detrended, fs, settings)),
+        'fit': fit,
+    }
+    return columns, poles, residues, trend, rms, grid
+
+
+class ModalCache:
+    """LRU of modal scan results keyed by file identity, channels and settings."""
+
+    def __init__(self, entries=CACHE_ENTRIES):
+        self.entries = entries
+        self._items = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(path, chans, settings):
+        ident = source_key(path)
+        return ident['path'], ident['size'], ident['mtime_ns'], tuple(chans), tuple(sorted(settings.items()))
+
+    def get(self, key):
+        table = self._items.get(key)
+        if table is None:
+            self.misses += 1
+            return None
+        self._items.move_to_end(key)
+        self.hits += 1
+        return table
+
+    def put(self, key, table):
+        self._items[key] = table
+        self._items.move_to_end(key)
+        while len(self._items) > self.entries:
+            self._items.popitem(last=False)
+
+
+def modal_scan(chanid, chandata, chans, reader=None, settings=None, path=None, cache=None, cancel=None):
+    """ModalTable of chans over the loaded data; cached per file when path and cache are given."""
+    s = dict(DEFAULT_MODAL_SETTINGS, **(settings or {}))
+    chans = [c for c in chans if c != 'time']
+    key = ModalCache.key(path, chans, s) if cache is not None and path else None
+    if key is not None:
+        table = cache.get(key)
+        if table is not None:
+            return table
+
+    t = np.asarray(chandata['time'], dtype=np.float64)
+    order = max(1, int(s['order']))
+    n = len(chans)
+    columns = {field: np.full(n, np.nan) for field in MODAL_FIELDS}
+    poles = np.zeros((n, order), dtype=complex)
+    residues = np.zeros((n, order), dtype=complex)
+    trend = np.zeros((n, 2))
+    rms = np.full(n, np.nan)
+    grid = None
+    for r0, block in channel_blocks(reader, chandata, chans, len(t)):
+        check_cancel(cancel)
+        r1 = r0 + len(block)
+        part, block_poles, block_residues, trend[r0:r1], rms[r0:r1], grid = block_modes(block, t, s)
+        poles[r0:r1, :block_poles.shape[1]] = block_poles
+        residues[r0:r1, :block_residues.shape[1]] = block_residues
+        for field in MODAL_FIELDS:
+            columns[field][r0:r1] = part[field]
+
+    table = ModalTable(chans, [chanid[c] for c in chans], columns, poles, residues, trend, rms, grid, s)
+    if key is not None:
+        cache.put(key, table)
+    return table
@@ -0,0 +1,181 @@
+# Overlay.py
+# Superposicion de varias corridas (.out) sobre una base de tiempo comun.
+
+# Cada corrida puede tener otro paso de integracion o eventos de maniobra en instantes distintos.
+# En PSSE un evento se registra como dos muestras con el mismo tiempo (valor antes y despues), por
+# lo que la base comun conserva esas marcas repetidas y la interpolacion respeta la discontinuidad:
+# la primera muestra de una marca repetida toma el valor previo al evento y la segunda el posterior.
+# Las corridas con la misma lista de canales comparten su diccionario de descripciones, de modo que
+# agregar una corrida mas solo cuesta sus propios datos. Los canales alineados se guardan en una
+# cache LRU limitada por un presupuesto de memoria, como la de Channel_Store.LazyChannelData.
+
+import os
+from collections import OrderedDict
+
+import numpy as np
+
+from Channel_Store import DEFAULT_MEMORY_BUDGET
+
+
+def common_time_base(times):
+    """Sorted union of the time stamps of every run, keeping repeated (switching) stamps."""
+    times = [np.asarray(t, dtype=np.float64) for t in times if len(t)]
+    if not times:
+        return np.empty(0)
+    uniq = np.unique(np.concatenate(times))
+    mult = np.ones(len(uniq), dtype=np.int64)
+    for t in times:
+        values, counts = np.unique(t, return_counts=True)
+        idx = np.searchsorted(uniq, values)
+        mult[idx] = np.maximum(mult[idx], counts)
+    return np.repeat(uniq, mult)
+
+
+def occurrence(t):
+    """Position of each sample inside its group of equal time stamps (0, 1, ...)."""
+    return np.arange(len(t)) - np.searchsorted(t, t, side='left')
+
+
+def align(t_base, t, y):
+    """Interpolate y(t) onto t_base, keeping discontinuities at repeated stamps (NaN outside t)."""
+    t = np.asarray(t, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(t)
+    out = np.full(len(t_base), np.nan)
+    if n == 0 or len(t_base) == 0:
+        return out
+
+    left = np.searchsorted(t, t_base, side='left')
+    right = np.searchsorted(t, t_base, side='right')
+    exact = right > left
+
+    # Marca presente en la corrida: se toma la muestra con el mismo orden de aparicion
+    occ = np.minimum(occurrence(t_base), right - left - 1)
+    out[exact] = y[(left + occ)[exact]]
+
+    # Entre marcas: interpolacion lineal desde el ultimo valor de la marca anterior
+    inside = ~exact & (left > 0) & (left < n)
+    hi = left[inside]
+    lo = hi - 1
+    w = (t_base[inside] - t[lo]) / (t[hi] - t[lo])
+    out[inside] = y[lo] + w * (y[hi] - y[lo])
+    return out
+
+
+class OverlayRun:
+    """One loaded run: reader, channel descriptions and data."""
+
+    def __init__(self, path, reader, chanid, chandata):
+        self.path = path
+        self.name = os.path.splitext(os.path.basename(path))[0]
+        self.reader = reader
+        self.chanid = chanid
+        self.chandata = chandata
+        self._by_desc = None
+
+    def find_channel(self, chan, desc):
+        """Channel of this run matching chan (same number and description, else by description)."""
+        if self.chanid.get(chan) == desc:
+            return chan
+        if self._by_desc is None:
+            self._by_desc = {d: c for c, d in self.chanid.items()}
+        return self._by_desc.get(desc)
+
+
+class OverlaySet:
+    """Runs plotted together, aligned on a common time base."""
+
+    def __init__(self, memory_budget=DEFAULT_MEMORY_BUDGET):
+        self.runs = []
+        self.memory_budget = memory_budget
+        self._chanid_pool = {}
+        self._base = None
+        self._aligned = OrderedDict()  # (canal, indice de corrida) -> datos alineados, en orden de uso
+        self._aligned_bytes = 0
+
+    def __len__(self):
+        return len(self.runs)
+
+    def shared_chanid(self, chanid):
+        # Corridas con los mismos canales reutilizan el mismo diccionario
+        return self._chanid_pool.setdefault(tuple(chanid.items()), chanid)
+
+    def clear(self):
+        self.runs = []
+        self._chanid_pool = {}
+        self._base = None
+        self._clear_aligned()
+
+    def _clear_aligned(self):
+        self._aligned.clear()
+        self._aligned_bytes = 0
+
+    def _evict(self, keep=None):
+        while self._aligned_bytes > self.memory_budget and len(self._aligned) > 1:
+            oldest = next(iter(self._aligned))
+            if oldest == keep:
+                break
+            self._aligned_bytes -= self._aligned.pop(oldest).nbytes
+
+    def set_memory_budget(self, memory_budget):
+        self.memory_budget = memory_budget
+        self._evict()
+
+    def add_run(self, path, reader, chanid, chandata):
+        run = OverlayRun(path, reader, self.shared_chanid(chanid), chandata)
+        self.runs.append(run)
+        if self._base is not None:
+            base = common_time_base([self._base, run.chandata['time']])
+            if len(base) != len(self._base) or not np.array_equal(base, self._base):
+                # La nueva corrida agrega marcas de tiempo: hay que realinear todo
+                self._clear_aligned()
+            self._base = base
+        return run
+
+    def remove_run(self, index):
+        del self.runs[index]
+        self._base = None
+        self._clear_aligned()
+
+    def time_base(self):
+        if self._base is None:
+            self._base = common_time_base([run.chandata['time'] for run in self.runs])
+        return self._base
+
+    def aligned(self, chan, desc):
+        """List of (run, aligned y or None) for a channel of the first run."""
+        t_base = self.time_base()
+        result = []
+        for i, run in enumerate(self.runs):
+            run_chan = run.find_channel(chan, desc)
+            if run_chan is None:
+                result.append((run, None))
+                continue
+            key = (run_chan, i)
+            data = self._aligned.get(key)
+            if data is not None:
+                self._aligned.move_to_end(key)
+            else:
+                data = self._aligned[key] = align(t_base, run.chandata['time'], run.chandata[run_chan])
+                self._aligned_bytes += data.nbytes
+                self._evict(keep=key)
+            result.append((run, data))
+        return result
+
+    def channel_range(self, chan, desc, window=None):
+        """(min, max) of a channel over every run, optionally inside a time window."""
+        vmin, vmax = float('inf'), float('-inf')
+        t_base = self.time_base()
+        for run, data in self.aligned(chan, desc):
+            if data is None:
+                continue
+            if window is not None:
+                i0 = np.searchsorted(t_base, window[0], side='left')
+                i1 = np.searchsorted(t_base, window[1], side='right')
+                data = data[i0:i1]
+            if len(data) and not np.isnan(data).all():
+                vmin = min(vmin, float(np.nanmin(data)))
+                vmax = max(vmax, float(np.nanmax(data)))
+        if vmin > vmax:
+            return float('nan'), float('nan')
+        return vmin, vmax
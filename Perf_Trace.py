@@ -0,0 +1,201 @@
+# Perf_Trace.py
+# Medicion de tiempos por etapas (spans) de carga, graficado y guardado, con exportacion de trazas.
+
+# Cada etapa se envuelve en "with TRACER.span('generate_plot.draw', points=n):" y las funciones
+# completas se decoran con "@TRACER.traced('generate_plot')". Con la medicion apagada
+# span() devuelve siempre el mismo objeto vacio, de modo que el costo es una llamada y una
+# comparacion. Encendida, cada span guarda tiempo de pared, hilo, argumentos (p. ej. numero de
+# puntos) y, si se pide, el pico de memoria de Python/NumPy (tracemalloc) durante la etapa, en un
+# buffer circular con los ultimos MAX_SPANS registros.
+# La traza se exporta en el formato JSON de Chrome (chrome://tracing, Perfetto o speedscope).
+
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+from collections import OrderedDict, deque, namedtuple
+
+MAX_SPANS = 2000
+
+# start y duration en segundos desde el inicio del trazador; peak_mb es NaN sin medicion de memoria
+SpanRecord = namedtuple('SpanRecord', ['name', 'start', 'duration', 'thread', 'peak_mb', 'args'])
+
+
+class _NullSpan:
+    """Span used while tracing is off: does nothing."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **args):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ('tracer', 'name', 'args', 'start', 'mem_start', 'peak')
+
+    def __init__(self, tracer, name, args):
+        self.tracer = tracer
+        self.name = name
+        self.args = args
+        self.peak = 0
+
+    def set(self, **args):
+        """Add arguments known only inside the span (e.g. the number of points drawn)."""
+        self.args.update(args)
+
+    def __enter__(self):
+        memory = self.tracer.trace_memory and tracemalloc.is_tracing()
+        if memory:
+            # El pico de tracemalloc es global: se guarda el del span exterior antes de reiniciarlo
+            stack = self.tracer._stack()
+            current, peak = tracemalloc.get_traced_memory()
+            if stack:
+                stack[-1].peak = max(stack[-1].peak, peak)
+            tracemalloc.reset_peak()
+            stack.append(self)
+            self.mem_start = current
+        else:
+            self.mem_start = None
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter()
+        peak_mb = float('nan')
+        if self.mem_start is not None:
+            stack = self.tracer._stack()
+            if stack and stack[-1] is self:
+                stack.pop()
+            if tracemalloc.is_tracing():
+                self.peak = max(self.peak, tracemalloc.get_traced_memory()[1])
+                if stack:
+                    stack[-1].peak = max(stack[-1].peak, self.peak)
+                peak_mb = max(0, self.peak - self.mem_start) / 1e6
+        if exc[0] is not None:
+            self.args['error'] = exc[0].__name__
+        self.tracer.record(self.name, end - self.start, self.args, peak_mb, start=self.start)
+        return False
+
+
+class Tracer:
+    """Recorder of timing spans; off by default."""
+
+    def __init__(self, max_spans=MAX_SPANS):
+        self.enabled = False
+        self.trace_memory = False
+        self.spans = deque(maxlen=max_spans)
+        self.t0 = time.perf_counter()
+        self._local = threading.local()
+        self._threads = {}  # ident -> (numero corto, nombre)
+        # Los lectores registran desde sus hilos mientras la ventana recorre los registros
+        self._lock = threading.Lock()
+
+    def enable(self, trace_memory=False):
+        """Start recording; trace_memory also starts tracemalloc (slows allocations down)."""
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        elif not trace_memory and self.trace_memory and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self.trace_memory = trace_memory
+        self.enabled = True
+
+    def disable(self):
+        self.enable(False)
+        self.enabled = False
+
+    def clear(self):
+        with self._lock:
+            self.spans.clear()
+
+    def span(self, name, **args):
+        """Context manager timing one stage; args are stored with it."""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, args)
+
+    def traced(self, name):
+        """Decorator timing every call of a function as one span."""
+        def decorate(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                with _Span(self, name, {}):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorate
+
+    def record(self, name, seconds, args=None, peak_mb=float('nan'), start=None):
+        """Add a span measured elsewhere (e.g. in a worker process) that ended now."""
+        if not self.enabled:
+            return
+        if start is None:
+            start = time.perf_counter() - seconds
+        thread = threading.current_thread()
+        record = SpanRecord(name, start - self.t0, seconds, thread.ident, peak_mb, dict(args or {}))
+        with self._lock:
+            if thread.ident not in self._threads:
+                self._threads[thread.ident] = (len(self._threads) + 1, thread.name)
+            self.spans.append(record)
+
+    def _stack(self):
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _snapshot(self):
+        """(spans, threads) copied under the lock, safe to iterate while other threads record."""
+        with self._lock:
+            return list(self.spans), dict(self._threads)
+
+    def recent(self, n=50):
+        """The last n spans, newest first."""
+        return self._snapshot()[0][-n:][::-1]
+
+    def summary(self):
+        """{name: (count, last s, mean s, max s, max peak MB, last args)} over the recorded spans."""
+        groups = OrderedDict()
+        for span in self._snapshot()[0]:
+            groups.setdefault(span.name, []).append(span)
+        result = OrderedDict()
+        for name, spans in groups.items():
+            durations = [s.duration for s in spans]
+            peaks = [s.peak_mb for s in spans if s.peak_mb == s.peak_mb]
+            result[name] = (len(spans), durations[-1], sum(durations) / len(durations), max(durations),
+                            max(peaks) if peaks else float('nan'), spans[-1].args)
+        return result
+
+    def chrome_trace(self):
+        """The recorded spans as a Chrome trace (dict ready for json.dump)."""
+        pid = os.getpid()
+        spans, threads = self._snapshot()
+        events = [{'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid, 'args': {'name': name}}
+                  for tid, name in threads.values()]
+        for span in spans:
+            args = dict(span.args)
+            if span.peak_mb == span.peak_mb:
+                args['peak_mb'] = round(span.peak_mb, 3)
+            events.append({
+                'name': span.name, 'cat': span.name.split('.')[0], 'ph': 'X', 'pid': pid,
+                'tid': threads.get(span.thread, (0,))[0],
+                'ts': round(span.start * 1e6, 1), 'dur': round(span.duration * 1e6, 1), 'args': args,
+            })
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def write_chrome_trace(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.chrome_trace(), f, default=str)
+
+
+# Trazador compartido por la aplicacion y los lectores
+TRACER = Tracer()
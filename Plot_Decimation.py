@@ -0,0 +1,115 @@
+# Plot_Decimation.py
+# Reduccion de puntos para graficar simulaciones largas sin perder picos ni huecos.
+
+# Se usa un esquema tipo M4: el tramo visible de cada serie se divide en tantos grupos como
+# pixeles tiene el ancho del eje y de cada grupo se conservan el primer, ultimo, minimo y maximo
+# punto. Asi la linea dibujada es identica (a nivel de pixel) a la de los datos completos,
+# incluidos nadires, sobretensiones y picos de falla, con una fraccion de los puntos.
+
+from contextlib import contextmanager
+
+import numpy as np
+
+# No vale la pena reducir series con menos de este numero de puntos por pixel
+MIN_POINTS_PER_PIXEL = 4
+
+
+def is_monotonic(x):
+    return len(x) < 2 or bool(np.all(np.diff(x) >= 0))
+
+
+def m4_indices(y, n_buckets):
+    """Indices of the first, last, min and max sample of each of n_buckets index groups."""
+    n = len(y)
+    if n <= MIN_POINTS_PER_PIXEL * n_buckets:
+        return np.arange(n)
+
+    size = -(-n // n_buckets)
+    full = (n // size) * size
+    blocks = np.asarray(y[:full]).reshape(-1, size)
+    starts = np.arange(0, full, size)
+    parts = [starts, starts + size - 1,
+             starts + np.argmin(blocks, axis=1), starts + np.argmax(blocks, axis=1)]
+    if full < n:
+        tail = np.asarray(y[full:])
+        parts.append(np.array([full, n - 1, full + np.argmin(tail), full + np.argmax(tail)]))
+    return np.unique(np.concatenate(parts))
+
+
+def decimate(x, y, n_buckets, x_range=None):
+    """Return (x, y) reduced to about 4 * n_buckets points over x_range (x must be sorted)."""
+    x = np.asarray(x)
+    y = np.asarray(y)
+    i0, i1 = 0, len(x)
+    if x_range is not None:
+        # Un punto extra a cada lado para que la linea llegue hasta los bordes del eje
+        i0 = max(0, int(np.searchsorted(x, x_range[0], side='left')) - 1)
+        i1 = min(len(x), int(np.searchsorted(x, x_range[1], side='right')) + 1)
+    idx = m4_indices(y[i0:i1], max(1, int(n_buckets))) + i0
+    return x[idx], y[idx]
+
+
+class LineDecimator:
+    """Keeps full-resolution data for plotted lines and re-decimates them to the visible range."""
+
+    def __init__(self, ax):
+        self.ax = ax
+        self.lines = []  # (Line2D, x completo, y completo)
+        self._cid = None
+        self._full = False
+
+    def attach(self, ax):
+        # ax.clear() reinicia los callbacks del eje, hay que volver a conectarse
+        self.ax = ax
+        self.lines = []
+        self._cid = ax.callbacks.connect('xlim_changed', lambda _ax: self.refresh())
+
+    def n_buckets(self):
+        return max(100, int(self.ax.bbox.width))
+
+    def plot(self, ax, x_data, y_data, **kwargs):
+        """ax.plot() replacement that draws a decimated copy of sorted x data."""
+        x_data = np.asarray(x_data)
+        y_data = np.asarray(y_data)
+        if not is_monotonic(x_data):
+            return ax.plot(x_data, y_data, **kwargs)[0]
+        xd, yd = decimate(x_data, y_data, self.n_buckets())
+        line = ax.plot(xd, yd, **kwargs)[0]
+        self.lines.append((line, x_data, y_data))
+        return line
+
+    def set_data(self, line, x_data, y_data):
+        """Replace the data behind a line (e.g. after new samples were appended)."""
+        x_data = np.asarray(x_data)
+        y_data = np.asarray(y_data)
+        for i, (other, x_old, y_old) in enumerate(self.lines):
+            if other is line:
+                if x_old is x_data and y_old is y_data:
+                    return
+                self.lines[i] = (line, x_data, y_data)
+                if self._full:
+                    line.set_data(x_data, y_data)
+                else:
+                    line.set_data(*decimate(x_data, y_data, self.n_buckets(), sorted(self.ax.get_xlim())))
+                return
+        line.set_data(x_data, y_data)
+
+    def refresh(self):
+        if self._full or not self.lines:
+            return
+        x_range = sorted(self.ax.get_xlim())
+        n_buckets = self.n_buckets()
+        for line, x_data, y_data in self.lines:
+            line.set_data(*decimate(x_data, y_data, n_buckets, x_range))
+
+    @contextmanager
+    def full_resolution(self):
+        """Temporarily draw the exact data (used when exporting the figure)."""
+        self._full = True
+        try:
+            for line, x_data, y_data in self.lines:
+                line.set_data(x_data, y_data)
+            yield
+        finally:
+            self._full = False
+            self.refresh()
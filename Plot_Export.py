@@ -0,0 +1,154 @@
+# Plot_Export.py
+# Exportacion de figuras en segundo plano.
+
+# Al guardar, la grafica visible se copia en una "foto" inmutable (PlotSnapshot): datos completos
+# de cada linea, estilos, limites, leyenda y opciones de texto. La foto se envia a un proceso de
+# trabajo que la vuelve a dibujar en una figura Agg fuera de pantalla (con Plot_Render) y la guarda,
+# de modo que un savefig de alta resolucion ya no congela la ventana.
+# Con un RenderCache (ver Render_Cache) una foto identica a una ya exportada (mismos datos, estilos,
+# limites, textos, tamano, DPI y formato) se copia del cache en lugar de volver a dibujarse.
+
+import multiprocessing
+import os
+import time
+from collections import namedtuple
+from concurrent.futures import Future, ProcessPoolExecutor
+
+import numpy as np
+
+from Plot_Render import LINE_WIDTH, apply_plot_settings, draw_legends, save_figure
+from Render_Cache import content_key
+
+EXPORT_FORMATS = ['PNG', 'SVG', 'PDF']
+
+# series: tuplas (axis, x, y, color, linestyle, label); limits: {'x': (min, max), 'y': ..., 'y2': ...}
+PlotSnapshot = namedtuple('PlotSnapshot', ['save_path', 'dpi', 'fig_size', 'x_label', 'series', 'settings',
+                                           'limits', 'legend'])
+
+
+def frozen_copy(data):
+    data = np.array(data, copy=True)
+    data.flags.writeable = False
+    return data
+
+
+def snapshot_plot(plot_model, decimator, settings, x_label, legend, save_path, dpi):
+    """Capture the current plot (at full data resolution) as a PlotSnapshot."""
+    full_data = {id(line): (x, y) for line, x, y in decimator.lines}
+    series = []
+    for slot, line in plot_model.lines.items():
+        x, y = full_data.get(id(line), line.get_data())
+        color, linestyle, label = plot_model.styles[slot]
+        axis = 2 if line.axes is plot_model.ax2 else 1
+        series.append((axis, frozen_copy(x), frozen_copy(y), color, linestyle, label))
+
+    limits = {'x': tuple(plot_model.ax.get_xlim()), 'y': tuple(plot_model.ax.get_ylim())}
+    if plot_model.ax2 is not None:
+        limits['y2'] = tuple(plot_model.ax2.get_ylim())
+    return PlotSnapshot(save_path, dpi, tuple(plot_model.fig.get_size_inches()), x_label, tuple(series),
+                        dict(settings), limits, legend)
+
+
+def snapshot_key(snapshot):
+    """Content hash of everything that shapes the exported image (all but the destination folder)."""
+    extension = os.path.splitext(snapshot.save_path)[1].lower()
+    return content_key(extension, snapshot._replace(save_path=None))
+
+
+def render_snapshot(snapshot):
+    """Draw a snapshot on an off-screen Agg figure and save it; returns (path, seconds)."""
+    # Matplotlib solo se importa en los procesos de trabajo, no al abrir la ventana
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    t0 = time.perf_counter()
+    figure = Figure(figsize=snapshot.fig_size)
+    FigureCanvasAgg(figure)
+    ax = figure.add_subplot()
+    ax2 = ax.twinx() if 'y2' in snapshot.limits else None
+
+    for axis, x, y, color, linestyle, label in snapshot.series:
+        target = ax2 if axis == 2 else ax
+        target.plot(x, y, linestyle=linestyle, color=color, label=label, linewidth=LINE_WIDTH)
+
+    loc, frameon, bbox_anchor = snapshot.legend
+    draw_legends((ax, ax2), loc, frameon, bbox_anchor)
+
+    # Los limites de la foto son los que se veian en pantalla
+    settings = dict(snapshot.settings)
+    settings['xlim_min'], settings['xlim_max'] = (repr(v) for v in snapshot.limits['x'])
+    settings['ylim_min'], settings['ylim_max'] = (repr(v) for v in snapshot.limits['y'])
+    y2lim = tuple(repr(v) for v in snapshot.limits['y2']) if ax2 is not None else ("", "")
+    apply_plot_settings(ax, settings, snapshot.x_label, ax2, y2lim)
+
+    save_figure(figure, snapshot.save_path, snapshot.dpi)
+    return snapshot.save_path, time.perf_counter() - t0
+
+
+class ExportJob:
+    """One queued export: its snapshot path, future and final state."""
+
+    def __init__(self, save_path, future, cache_key=None, cached=False):
+        self.save_path = save_path
+        self.name = os.path.basename(save_path)
+        self.future = future
+        self.cache_key = cache_key
+        self.cached = cached  # copiada del cache de imagenes, sin dibujar
+        self.seconds = None
+        self.error = None
+
+    @property
+    def done(self):
+        return self.future.done()
+
+
+class ExportQueue:
+    """Background export worker pool (processes are started on the first export)."""
+
+    def __init__(self, max_workers=None, cache=None):
+        self.max_workers = max_workers or max(1, min(4, (os.cpu_count() or 2) - 1))
+        self.cache = cache  # RenderCache o None
+        self.jobs = []
+        self._pool = None
+
+    def submit(self, snapshot):
+        key = None
+        if self.cache is not None:
+            t0 = time.perf_counter()
+            key = snapshot_key(snapshot)
+            if self.cache.fetch(key, snapshot.save_path):
+                future = Future()
+                future.set_result((snapshot.save_path, time.perf_counter() - t0))
+                job = ExportJob(snapshot.save_path, future, key, cached=True)
+                self.jobs.append(job)
+                return job
+        if self._pool is None:
+            # "spawn" en todas las plataformas: el proceso de Tk no se duplica con fork
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers,
+                                             mp_context=multiprocessing.get_context('spawn'))
+        job = ExportJob(snapshot.save_path, self._pool.submit(render_snapshot, snapshot), key)
+        self.jobs.append(job)
+        return job
+
+    def pending(self):
+        return [job for job in self.jobs if not job.done]
+
+    def collect(self):
+        """Jobs finished since the last call (with seconds or error filled in)."""
+        finished = []
+        for job in self.jobs:
+            if job.done and job.seconds is None and job.error is None:
+                try:
+                    _, job.seconds = job.future.result()
+                except Exception as e:
+                    job.error = str(e) or type(e).__name__
+                else:
+                    if job.cache_key is not None and not job.cached:
+                        self.cache.store(job.cache_key, job.save_path)
+                finished.append(job)
+        return finished
+
+    def shutdown(self, wait=True):
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait)
+            self._pool = None
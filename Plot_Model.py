@@ -0,0 +1,114 @@
+# Plot_Model.py
+# Modelo "retenido" de la grafica principal: cada variable Y conserva su propia linea (Line2D).
+
+# La grafica solo se reconstruye (ax.clear(), twinx, ax.plot) cuando cambia el conjunto de canales.
+# Un cambio de color, estilo, etiqueta o limites modifica solo los artistas afectados, y las
+# ediciones en vivo de estilo se redibujan con blitting: el fondo de la figura se guarda una vez y
+# luego solo se pintan las lineas y leyendas encima.
+
+
+class PlotModel:
+    """Persistent artists of the main plot, keyed by Y slot."""
+
+    def __init__(self, fig, ax, canvas, decimator):
+        self.fig = fig
+        self.ax = ax
+        self.canvas = canvas
+        self.decimator = decimator
+        self.key = None
+        self.ax2 = None
+        self.lines = {}  # slot -> Line2D
+        self.styles = {}  # slot -> (color, linestyle, label)
+        self.layout_key = None
+        self._background = None
+        self._blitting = False
+        canvas.mpl_connect('draw_event', self._on_draw)
+
+    def rebuild(self, key, x_data, series, use_ax2):
+        """Clear the axes and create one line per (slot, axis, y_data, style) in series."""
+        self.end_blit()
+        self.ax.clear()
+        if self.ax2 is not None:
+            self.ax2.remove()
+            self.ax2 = None
+        if use_ax2:
+            self.ax2 = self.ax.twinx()
+        self.decimator.attach(self.ax)
+
+        self.lines = {}
+        self.styles = {}
+        for slot, axis, y_data, (color, linestyle, label) in series:
+            target = self.ax2 if axis == 2 else self.ax
+            self.lines[slot] = self.decimator.plot(target, x_data, y_data, linestyle=linestyle,
+                                                   color=color, label=label, linewidth=1.8)
+            self.styles[slot] = (color, linestyle, label)
+        self.key = key
+        self.layout_key = None
+
+    def update_style(self, slot, style):
+        """Restyle one line in place; returns True if anything changed."""
+        line = self.lines.get(slot)
+        if line is None or self.styles.get(slot) == style:
+            return False
+        color, linestyle, label = style
+        line.set_color(color)
+        line.set_linestyle(linestyle)
+        line.set_label(label)
+        self.styles[slot] = style
+        return True
+
+    def update_data(self, x_data, series):
+        """Point the existing lines at new data arrays (same channels, more samples)."""
+        for slot, _, y_data, _ in series:
+            line = self.lines.get(slot)
+            if line is not None:
+                self.decimator.set_data(line, x_data, y_data)
+
+    def legends(self):
+        return [a.get_legend() for a in (self.ax, self.ax2) if a is not None and a.get_legend() is not None]
+
+    def animated_artists(self):
+        return list(self.lines.values()) + self.legends()
+
+    def needs_layout(self, layout_key):
+        # tight_layout solo hace falta si cambió algo que afecta el tamaño de textos o ejes
+        if layout_key == self.layout_key:
+            return False
+        self.layout_key = layout_key
+        return True
+
+    # ----- Blitting para ediciones en vivo -----
+    def blit(self):
+        """Redraw only the lines and legends over the cached background."""
+        if not getattr(self.canvas, 'supports_blit', False):
+            self.canvas.draw_idle()
+            return
+        if not self._blitting:
+            self._blitting = True
+            for artist in self.animated_artists():
+                artist.set_animated(True)
+            self.canvas.draw()  # dispara _on_draw, que guarda el fondo sin las lineas
+        self.canvas.restore_region(self._background)
+        self._draw_animated()
+        self.canvas.blit(self.fig.bbox)
+
+    def end_blit(self):
+        """Return the artists to normal drawing (before a full draw or an export)."""
+        if self._blitting:
+            self._blitting = False
+            self._background = None
+            for artist in self.animated_artists():
+                artist.set_animated(False)
+
+    def mark_animated(self, artist):
+        if self._blitting:
+            artist.set_animated(True)
+
+    def _draw_animated(self):
+        for artist in self.animated_artists():
+            self.fig.draw_artist(artist)
+
+    def _on_draw(self, event):
+        if self._blitting:
+            self._background = self.canvas.copy_from_bbox(self.fig.bbox)
+            self._draw_animated()
@@ -0,0 +1,148 @@
+# Plot_Render.py
+# Logica de graficado compartida entre la ventana de Tk (Dynamic_Graphs.py) y los modos sin
+# interfaz (Batch_Render.py y los que se agreguen despues).
+
+# No importa pyplot ni Tk: trabaja sobre objetos Figure/Axes de Matplotlib, de modo que se puede
+# usar en procesos de trabajo con el backend Agg.
+
+import re
+
+import numpy as np
+
+from Range_Index import window_indices
+
+LINE_COLORS = ['b', 'g', 'r', 'c', 'm', 'y', 'k']  # Colors for multiple lines
+LINE_WIDTH = 1.8
+LEGEND_FONT_SIZE = 10
+
+DEFAULT_SETTINGS = {
+    'title': "  ",
+    'xlabel': "",
+    'ylabel': " ",
+    'xlim_min': "",
+    'xlim_max': "",
+    'ylim_min': "",
+    'ylim_max': "",
+    'font_family': "Arial",
+    'font_size': 10,
+    'grid': False
+}
+
+
+def selection_label(selection):
+    return selection.split(': ')[1] if ': ' in selection else selection
+
+
+def selection_channel(selection):
+    """Channel key of a combobox entry: 'time', a channel number or a derived key ('d1')."""
+    if selection == "time":
+        return 'time'
+    head = selection.split(':')[0].strip()
+    return int(head) if head.isdigit() else head
+
+
+def series_range(x_data, y_data, window=None):
+    """(min, max) of y ignoring NaN, optionally only where sorted x is inside window=(x0, x1)."""
+    y = np.asarray(y_data, dtype=float)
+    if window is not None:
+        i0, i1 = window_indices(x_data, *window)
+        if i1 > i0:
+            y = y[i0:i1]
+    if not len(y) or np.isnan(y).all():
+        return float('nan'), float('nan')
+    return float(np.nanmin(y)), float(np.nanmax(y))
+
+
+def assign_axes(items, use_dual_y, range_of):
+    """Sort items by range (largest first) and split them between the left and right Y axes."""
+    items = sorted(items, key=range_of, reverse=True)  # de mayor a menor rango
+    if not (use_dual_y and len(items) >= 2):
+        return items, []
+
+    # Algoritmo simple: la primera (mayor rango) al eje izquierdo, el resto se evalúan
+    base_range = range_of(items[0])
+    y1_items, y2_items = [items[0]], []
+    for item in items[1:]:
+        if range_of(item) >= 0.1 * base_range:
+            y1_items.append(item)
+        else:
+            y2_items.append(item)
+    return y1_items, y2_items
+
+
+def padded_limits(vmin, vmax, flat_padding=None):
+    """Limits with 5 % padding; flat_padding is used when vmin == vmax (if given)."""
+    if flat_padding is not None and vmax == vmin:
+        padding = flat_padding
+    else:
+        padding = (vmax - vmin) * 0.05
+    return vmin - padding, vmax + padding
+
+
+def draw_legends(axes, loc='best', frameon=True, bbox_anchor=None):
+    """Draw a legend on every axis that has labelled artists; returns the legends created."""
+    legends = []
+    for axis in axes:
+        if axis is not None and axis.get_legend_handles_labels()[1]:
+            legends.append(axis.legend(loc=loc, fontsize=LEGEND_FONT_SIZE, frameon=frameon,
+                                       bbox_to_anchor=bbox_anchor))
+    return legends
+
+
+def apply_plot_settings(ax, settings, x_label, ax2=None, y2lim=("", "")):
+    """Apply title, labels, limits, grid and fonts (settings uses the DEFAULT_SETTINGS keys)."""
+    # Apply title and labels
+    ax.set_title(settings['title'],
+                 fontfamily=settings['font_family'],
+                 fontsize=settings['font_size'])
+
+    xlabel = settings['xlabel'] if settings['xlabel'] else x_label
+    ax.set_xlabel(xlabel,
+                  fontfamily=settings['font_family'],
+                  fontsize=settings['font_size'])
+
+    ax.set_ylabel(settings['ylabel'],
+                  fontfamily=settings['font_family'],
+                  fontsize=settings['font_size'])
+
+    # Apply custom limits if they're specified and valid
+    try:
+        if settings['xlim_min'] and settings['xlim_max']:
+            ax.set_xlim(float(settings['xlim_min']),
+                        float(settings['xlim_max']))
+        if settings['ylim_min'] and settings['ylim_max']:
+            ax.set_ylim(float(settings['ylim_min']),
+                        float(settings['ylim_max']))
+        if ax2:
+            try:
+                ylim2_min, ylim2_max = y2lim
+                if ylim2_min and ylim2_max:
+                    ax2.set_ylim(float(ylim2_min), float(ylim2_max))
+            except ValueError:
+                pass  # Si hay error en la entrada, se usa el autoescalado
+
+    except ValueError:
+        pass  # Keep auto-scaled limits if custom ones are invalid
+
+    # Set grid
+    ax.grid(settings['grid'])
+
+    # Apply font to all text elements
+    for item in ([ax.title, ax.xaxis.label, ax.yaxis.label] +
+                 ax.get_xticklabels() + ax.get_yticklabels()):
+        item.set_fontfamily(settings['font_family'])
+        item.set_fontsize(settings['font_size'])
+
+    if ax2:
+        for item in ([ax2.yaxis.label] + ax2.get_yticklabels()):
+            item.set_fontfamily(settings['font_family'])
+            item.set_fontsize(settings['font_size'])
+
+
+def safe_filename(filename):
+    # Sanitizar nombre
+    return re.sub(r'[\\/*?:"<>|]', "_", filename).replace(" ", "_")
+
+
+def save_figure(fig, save_path, dpi=300):
+    fig.savefig(save_path, dpi=dpi, bbox_inches='tight', transparent=True)
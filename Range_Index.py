@@ -0,0 +1,86 @@
+# Range_Index.py
+# Consulta rapida del minimo y maximo de un canal dentro de cualquier ventana de tiempo [t0, t1].
+
+# Cada canal se divide en bloques de BLOCK puntos; sobre los minimos y maximos de los bloques se
+# construye una "sparse table" (tabla de potencias de dos). Una consulta busca los indices de la
+# ventana con busqueda binaria sobre el eje de tiempo, combina dos entradas de la tabla para los
+# bloques completos y solo recorre los puntos sueltos de los extremos (menos de 2 * BLOCK).
+
+import numpy as np
+
+BLOCK = 64
+
+
+def window_indices(t, t0, t1):
+    """Index range [i0, i1) of the samples of sorted t that fall inside [t0, t1]."""
+    i0 = int(np.searchsorted(t, t0, side='left'))
+    i1 = int(np.searchsorted(t, t1, side='right'))
+    return i0, max(i0, i1)
+
+
+class MinMaxIndex:
+    """Sparse table of block minima/maxima for one channel."""
+
+    def __init__(self, y, block=BLOCK):
+        y = np.asarray(y, dtype=np.float64)
+        self.block = block
+        self.n = len(y)
+        nb = self.n // block
+        if nb:
+            blocks = y[:nb * block].reshape(nb, block)
+            mins = [np.fmin.reduce(blocks, axis=1)]
+            maxs = [np.fmax.reduce(blocks, axis=1)]
+        else:
+            mins, maxs = [np.empty(0)], [np.empty(0)]
+        # Nivel k: minimo/maximo de 2**k bloques consecutivos
+        k = 1
+        while (1 << k) <= nb:
+            half = 1 << (k - 1)
+            mins.append(np.fmin(mins[-1][:-half], mins[-1][half:]))
+            maxs.append(np.fmax(maxs[-1][:-half], maxs[-1][half:]))
+            k += 1
+        self.mins = mins
+        self.maxs = maxs
+
+    def _blocks_minmax(self, b0, b1):
+        k = (b1 - b0).bit_length() - 1
+        span = 1 << k
+        return (np.fmin(self.mins[k][b0], self.mins[k][b1 - span]),
+                np.fmax(self.maxs[k][b0], self.maxs[k][b1 - span]))
+
+    def query(self, y, i0, i1):
+        """Exact (min, max) of y[i0:i1]; NaN values are ignored."""
+        i0, i1 = int(i0), int(i1)
+        if i1 <= i0:
+            return float('nan'), float('nan')
+        b0 = -(-i0 // self.block)
+        b1 = i1 // self.block
+        if b1 <= b0:
+            seg = np.asarray(y[i0:i1], dtype=np.float64)
+            return float(np.fmin.reduce(seg)), float(np.fmax.reduce(seg))
+
+        vmin, vmax = self._blocks_minmax(b0, b1)
+        for seg in (y[i0:b0 * self.block], y[b1 * self.block:i1]):
+            if len(seg):
+                seg = np.asarray(seg, dtype=np.float64)
+                vmin = np.fmin(vmin, np.fmin.reduce(seg))
+                vmax = np.fmax(vmax, np.fmax.reduce(seg))
+        return float(vmin), float(vmax)
+
+
+class RangeQueryIndex:
+    """Per-channel MinMaxIndex objects, built the first time a channel is queried."""
+
+    def __init__(self):
+        self._indexes = {}
+
+    def clear(self):
+        self._indexes.clear()
+
+    def window_minmax(self, chan, t, y, t0, t1):
+        """Exact (min, max) of channel chan (data y over sorted time t) inside [t0, t1]."""
+        index = self._indexes.get(chan)
+        if index is None or index.n != len(y):
+            index = self._indexes[chan] = MinMaxIndex(y)
+        i0, i1 = window_indices(t, t0, t1)
+        return index.query(y, i0, i1)
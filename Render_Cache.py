@@ -0,0 +1,158 @@
+# Render_Cache.py
+# Cache en disco de imagenes exportadas, direccionado por contenido.
+
+# Cada exportacion se identifica con un hash (BLAKE2b) de todo lo que define la imagen: datos o
+# identidad del archivo de origen, canales, estilos, etiquetas, limites, fuentes, tamano, DPI,
+# leyenda y formato. Si ya se dibujo una imagen con el mismo hash se copia en lugar de volver a
+# llamar a savefig. Se copia (no se enlaza) para que editar la imagen exportada no altere el cache.
+# El cache esta limitado en bytes: al pasarse se borran las imagenes usadas hace mas tiempo
+# (la fecha de modificacion se renueva en cada acierto).
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+CACHE_VERSION = 1
+
+
+def default_cache_dir():
+    """Per-user folder for rendered images (LOCALAPPDATA on Windows, XDG cache elsewhere)."""
+    base = (os.environ.get('LOCALAPPDATA') or os.environ.get('XDG_CACHE_HOME') or
+            os.path.join(os.path.expanduser('~'), '.cache'))
+    return os.path.join(base, 'psse_dyn_visualizer', 'renders')
+
+
+def _feed(h, value):
+    # Representacion sin ambiguedad: cada valor lleva su tipo y longitud
+    if isinstance(value, np.ndarray):
+        data = np.ascontiguousarray(value)
+        h.update(f"a{data.dtype.str}{data.shape};".encode())
+        h.update(data)
+    elif isinstance(value, dict):
+        h.update(f"d{len(value)};".encode())
+        for key in sorted(value, key=str):
+            _feed(h, str(key))
+            _feed(h, value[key])
+    elif isinstance(value, (list, tuple)):
+        h.update(f"l{len(value)};".encode())
+        for item in value:
+            _feed(h, item)
+    else:
+        text = repr(value).encode('utf-8')
+        h.update(f"{type(value).__name__}{len(text)};".encode())
+        h.update(text)
+
+
+def content_key(*parts):
+    """Hex digest of parts (arrays, dicts, sequences and scalars, hashed by content)."""
+    h = hashlib.blake2b(digest_size=20)
+    _feed(h, CACHE_VERSION)
+    for part in parts:
+        _feed(h, part)
+    return h.hexdigest()
+
+
+def spec_key(source, spec):
+    """Key of a JSON-like figure spec rendered from a source file identity."""
+    return content_key(source, json.loads(json.dumps(spec, sort_keys=True, default=str)))
+
+
+class RenderCache:
+    """Size-bounded folder of rendered images keyed by content hash, with hit/miss counters."""
+
+    def __init__(self, cache_dir=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir or default_cache_dir()
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def path_for(self, key, extension):
+        return os.path.join(self.cache_dir, f"{key}.{extension.lower().lstrip('.')}")
+
+    def fetch(self, key, save_path):
+        """Copy the cached image of key to save_path; False (a miss) if there is none.
+
+        Errors writing save_path (e.g. permission denied) are raised, not counted as misses.
+        """
+        cached = self.path_for(key, os.path.splitext(save_path)[1])
+        try:
+            os.utime(cached)  # tambien renueva su lugar en la LRU
+        except OSError:
+            self.misses += 1
+            return False
+        if os.path.abspath(cached) != os.path.abspath(save_path):
+            shutil.copyfile(cached, save_path)
+        self.hits += 1
+        return True
+
+    def store(self, key, save_path):
+        """Keep a copy of the freshly rendered save_path under key, then evict old images."""
+        cached = self.path_for(key, os.path.splitext(save_path)[1])
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            # Copia a un temporal y reemplazo atomico: otro proceso nunca ve una imagen a medias
+            fd, tmp = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+            os.close(fd)
+            try:
+                shutil.copyfile(save_path, tmp)
+                os.replace(tmp, cached)
+            except OSError:
+                os.remove(tmp)
+                raise
+        except OSError:
+            return False
+        self.evict()
+        return True
+
+    def entries(self):
+        """[(mtime, size, path)] of the cached images, oldest first."""
+        found = []
+        try:
+            with os.scandir(self.cache_dir) as it:
+                for entry in it:
+                    if entry.name.endswith('.tmp') or not entry.is_file():
+                        continue
+                    try:
+                        st = entry.stat()
+                    except OSError:
+                        continue
+                    found.append((st.st_mtime_ns, st.st_size, entry.path))
+        except OSError:
+            return []
+        return sorted(found)
+
+    def evict(self):
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        # La imagen mas reciente se conserva aunque sola pase del limite
+        for _, size, path in entries[:-1]:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+
+    def clear(self):
+        for _, _, path in self.entries():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else None
+
+    def stats(self):
+        entries = self.entries()
+        rate = self.hit_rate
+        return {'entries': len(entries), 'bytes': sum(size for _, size, _ in entries), 'hits': self.hits,
+                'misses': self.misses, 'hit_rate': round(rate, 3) if rate is not None else None}
@@ -0,0 +1,338 @@
+# Screening.py
+# Cribado de muchos archivos .out (estudio de contingencias) contra criterios de desempeño.
+
+# Cada archivo se evalua en un proceso de trabajo que lee los canales por bloques (memoria acotada
+# por proceso, sin cargar el archivo completo) y devuelve solo las violaciones. Los resultados se
+# reciben a medida que terminan los archivos y se ordenan en un reporte unico: la peor violacion de
+# cada canal, de mayor a menor severidad, y un resumen por archivo.
+#
+# Uso:
+#   python Screening.py carpeta criterios.json [-j procesos] [-o reporte.csv] [--top N]
+#
+# Ejemplo de criterios:
+#   {
+#     "t_fault": 1.0, "t_clear": 1.1,
+#     "criteria": [
+#       {"name": "Recuperacion de voltaje", "type": "voltage_envelope", "channels": "type:VOLT",
+#        "envelope": [[0.0, 0.0], [0.5, 0.7], [1.5, 0.8], [5.0, 0.9]]},
+#       {"name": "Frecuencia", "type": "frequency", "channels": "type:FREQ", "min_hz": 59.0, "max_hz": 61.0},
+#       {"name": "Separacion angular", "type": "angle_separation", "channels": "type:ANGL", "max_deg": 180}
+#     ]
+#   }
+# "channels" es una consulta de Channel_Index (p. ej. "type:VOLT bus:1000-1999"). La envolvente de
+# voltaje da el minimo permitido (p.u.) en funcion de los segundos desde el despeje (interpolacion
+# lineal, el ultimo valor se mantiene). Los canales FREQ (desviacion en p.u.) se comparan en Hz con
+# "base_frequency" (60 por defecto). La separacion angular es la diferencia entre el angulo maximo y
+# el minimo del grupo en cada instante; se reporta el par de maquinas del peor instante.
+# La severidad es el exceso sobre el limite en % del limite, para poder ordenar criterios distintos.
+
+import argparse
+import csv
+import glob
+import json
+import multiprocessing
+import os
+import sys
+import time
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+
+from Channel_Index import ChannelIndex
+from Channel_Metrics import channel_blocks
+from Channel_Reader import check_cancel, open_channel_file
+
+CRITERION_TYPES = ('voltage_envelope', 'frequency', 'angle_separation')
+MAX_ROWS_PER_CRITERION = 200  # violaciones por criterio y archivo que se devuelven (las peores del archivo)
+
+# Una fila del reporte: la peor violacion de un canal (o de un par de canales) en un archivo
+Violation = namedtuple('Violation', ['path', 'criterion', 'chan', 'description', 'value', 'limit',
+                                     'excess', 'severity', 'time', 'duration'])
+REPORT_FIELDS = ('file',) + Violation._fields[1:]
+
+
+class CriteriaError(ValueError):
+    """Raised when the screening criteria file is invalid."""
+
+
+def load_criteria(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        criteria = json.load(f)
+    if isinstance(criteria, list):
+        criteria = {'criteria': criteria}
+    if not criteria.get('criteria'):
+        raise CriteriaError("The criteria file has no criteria")
+    for i, entry in enumerate(criteria['criteria']):
+        kind = entry.get('type')
+        if kind not in CRITERION_TYPES:
+            raise CriteriaError(f"Criterion {i + 1}: unknown type {kind!r}")
+        required = {'voltage_envelope': ('envelope',), 'frequency': (), 'angle_separation': ('max_deg',)}[kind]
+        for key in required:
+            if key not in entry:
+                raise CriteriaError(f"Criterion {i + 1}: missing '{key}'")
+        if kind == 'frequency' and 'min_hz' not in entry and 'max_hz' not in entry:
+            raise CriteriaError(f"Criterion {i + 1}: needs 'min_hz' and/or 'max_hz'")
+        entry.setdefault('name', kind)
+    return criteria
+
+
+def find_out_files(directory):
+    patterns = ('*.out', '*.outx')
+    return sorted(p for pattern in patterns for p in glob.glob(os.path.join(directory, pattern)))
+
+
+def _durations(t):
+    # Duracion asociada a cada muestra (hasta la siguiente); 0 en las marcas de tiempo repetidas
+    return np.diff(t, append=t[-1]) if len(t) else t
+
+
+def _worst_rows(excess, keep):
+    """Rows with a positive excess, worst first, at most keep."""
+    rows = np.flatnonzero(excess > 0)
+    return rows[np.argsort(-excess[rows], kind='stable')][:keep]
+
+
+def _gather_worst(candidates, keep):
+    """Merge per-block candidate columns (dicts of arrays) and keep the worst rows of the whole file."""
+    if not candidates:
+        return {}
+    merged = {key: np.concatenate([c[key] for c in candidates]) for key in candidates[0]}
+    order = _worst_rows(merged['excess'], keep)
+    return {key: values[order] for key, values in merged.items()}
+
+
+def _envelope_violations(path, entry, settings, chanid, chans, blocks, t):
+    after = t >= settings['t_clear']
+    t_after, dt = t[after], _durations(t)[after]
+    env_t, env_v = np.asarray(entry['envelope'], dtype=np.float64).T
+    limit = np.interp(t_after - settings['t_clear'], env_t, env_v)
+    # Las peores de cada bloque son candidatas; el limite por criterio se aplica al archivo completo
+    candidates = []
+    for r0, block in blocks:
+        deficit = limit - np.asarray(block, dtype=np.float64)[:, after]
+        if not deficit.shape[1]:
+            break
+        with np.errstate(invalid='ignore'):
+            worst = np.argmax(np.where(np.isnan(deficit), -np.inf, deficit), axis=1)
+            rows = np.arange(len(block))
+            duration = ((deficit > 0) * dt).sum(axis=1)
+        excess = deficit[rows, worst]
+        keep = _worst_rows(excess, MAX_ROWS_PER_CRITERION)
+        candidates.append({'row': r0 + keep, 'k': worst[keep], 'excess': excess[keep], 'duration': duration[keep]})
+
+    worst = _gather_worst(candidates, MAX_ROWS_PER_CRITERION)
+    found = []
+    for row, k, excess, duration in zip(*(worst.get(key, ()) for key in ('row', 'k', 'excess', 'duration'))):
+        chan = chans[row]
+        found.append(Violation(path, entry['name'], chan, chanid[chan], limit[k] - excess, limit[k], excess,
+                               100.0 * excess / abs(limit[k]) if limit[k] else np.inf, t_after[k], duration))
+    return found
+
+
+def _frequency_violations(path, entry, settings, chanid, chans, blocks, t):
+    after = t >= settings['t_fault']
+    t_after, dt = t[after], _durations(t)[after]
+    base = float(entry.get('base_frequency', 60.0))
+    f_min = float(entry.get('min_hz', -np.inf))
+    f_max = float(entry.get('max_hz', np.inf))
+    candidates = []
+    for r0, block in blocks:
+        hz = base * (1.0 + np.asarray(block, dtype=np.float64)[:, after])
+        if not hz.shape[1]:
+            break
+        with np.errstate(invalid='ignore'):
+            over, under = hz - f_max, f_min - hz
+            excess_all = np.fmax(over, under)
+            worst = np.argmax(np.where(np.isnan(excess_all), -np.inf, excess_all), axis=1)
+            duration = ((excess_all > 0) * dt).sum(axis=1)
+        rows = np.arange(len(block))
+        excess = excess_all[rows, worst]
+        keep = _worst_rows(excess, MAX_ROWS_PER_CRITERION)
+        k = worst[keep]
+        candidates.append({'row': r0 + keep, 'k': k, 'value': hz[keep, k], 'excess': excess[keep],
+                           'high': over[keep, k] >= under[keep, k], 'duration': duration[keep]})
+
+    worst = _gather_worst(candidates, MAX_ROWS_PER_CRITERION)
+    found = []
+    for row, k, value, excess, high, duration in zip(*(worst.get(key, ()) for key in
+                                                       ('row', 'k', 'value', 'excess', 'high', 'duration'))):
+        chan = chans[row]
+        limit = f_max if high else f_min
+        found.append(Violation(path, entry['name'], chan, chanid[chan], value, limit, excess,
+                               100.0 * excess / max(abs(limit - base), 1e-9), t_after[k], duration))
+    return found
+
+
+def _angle_violations(path, entry, settings, chanid, chans, blocks, t):
+    # Maximo y minimo del grupo en cada instante, acumulados bloque a bloque
+    n = len(t)
+    hi, lo = np.full(n, -np.inf), np.full(n, np.inf)
+    hi_chan, lo_chan = np.zeros(n, dtype=np.int64), np.zeros(n, dtype=np.int64)
+    cols = np.arange(n)
+    for r0, block in blocks:
+        block = np.asarray(block, dtype=np.float64)
+        i_hi = np.argmax(np.where(np.isnan(block), -np.inf, block), axis=0)
+        i_lo = np.argmin(np.where(np.isnan(block), np.inf, block), axis=0)
+        b_hi, b_lo = block[i_hi, cols], block[i_lo, cols]
+        up, down = b_hi > hi, b_lo < lo
+        hi[up], hi_chan[up] = b_hi[up], r0 + i_hi[up]
+        lo[down], lo_chan[down] = b_lo[down], r0 + i_lo[down]
+
+    after = t >= settings['t_fault']
+    if not after.any():
+        return []
+    with np.errstate(invalid='ignore'):
+        spread = np.where(after, hi - lo, -np.inf)
+    k = int(np.argmax(spread))
+    limit = float(entry['max_deg'])
+    excess = spread[k] - limit
+    if not excess > 0:
+        return []
+    lead, lag = chans[hi_chan[k]], chans[lo_chan[k]]
+    duration = ((spread > limit) * _durations(t)).sum()
+    return [Violation(path, entry['name'], lead, f"{chanid[lead]} vs {chanid[lag]}", spread[k], limit, excess,
+                      100.0 * excess / limit, t[k], duration)]
+
+
+_EVALUATORS = {
+    'voltage_envelope': _envelope_violations,
+    'frequency': _frequency_violations,
+    'angle_separation': _angle_violations,
+}
+
+
+def screen_file(path, criteria):
+    """Violations of one channel file (read in row blocks); returns (path, violations, seconds, error)."""
+    t0 = time.perf_counter()
+    settings = {'t_fault': float(criteria.get('t_fault', 1.0)), 't_clear': float(criteria.get('t_clear', 1.1))}
+    try:
+        reader = open_channel_file(path)
+        _, chanid = reader.get_index()
+        if hasattr(reader, 'read_channel'):
+            chandata = {'time': reader.read_channel('time')}
+        else:
+            _, _, chandata = reader.get_data()
+        t = np.asarray(chandata['time'], dtype=np.float64)
+        index = ChannelIndex(chanid)
+
+        violations = []
+        for entry in criteria['criteria']:
+            chans = index.search(entry.get('channels', ''), limit=None)
+            if not chans:
+                continue
+            blocks = channel_blocks(reader, chandata, chans, len(t))
+            violations.extend(_EVALUATORS[entry['type']](path, entry, settings, chanid, chans, blocks, t))
+        return path, violations, time.perf_counter() - t0, None
+    except Exception as e:
+        return path, [], time.perf_counter() - t0, str(e) or type(e).__name__
+
+
+class ScreeningReport:
+    """Violations of every screened file, ranked by severity."""
+
+    def __init__(self):
+        self.violations = []
+        self.errors = []  # (path, mensaje)
+        self.files = 0
+        self.seconds = 0.0
+
+    def add(self, path, violations, error=None):
+        self.files += 1
+        self.violations.extend(violations)
+        if error:
+            self.errors.append((path, error))
+
+    def ranked(self):
+        return sorted(self.violations, key=lambda v: -v.severity)
+
+    def by_file(self):
+        """[(path, worst severity, violating channels, worst criterion)], worst file first."""
+        summary = {}
+        for v in self.violations:
+            worst, count, criterion = summary.get(v.path, (-np.inf, 0, ''))
+            if v.severity > worst:
+                worst, criterion = v.severity, v.criterion
+            summary[v.path] = (worst, count + 1, criterion)
+        return sorted(((path,) + values for path, values in summary.items()), key=lambda r: -r[1])
+
+    def write_csv(self, path):
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(REPORT_FIELDS)
+            for v in self.ranked():
+                writer.writerow(v)
+
+
+def screen_files(files, criteria, jobs=None, progress=None, cancel=None):
+    """Screen files in a process pool; results are collected as each file finishes."""
+    report = ScreeningReport()
+    t0 = time.perf_counter()
+    jobs = max(1, min(jobs or os.cpu_count() or 1, len(files) or 1))
+    if jobs == 1:
+        for path in files:
+            check_cancel(cancel)
+            path, violations, _, error = screen_file(path, criteria)
+            report.add(path, violations, error)
+            if progress:
+                progress(report.files / len(files), f"Cribado {report.files}/{len(files)}")
+        report.seconds = time.perf_counter() - t0
+        return report
+
+    # "spawn": el proceso que llama puede tener Tk abierto. La memoria de cada proceso queda acotada
+    # por el tamaño de bloque de channel_blocks (max_tasks_per_child se bloquea en Python 3.11)
+    pool = ProcessPoolExecutor(max_workers=jobs, mp_context=multiprocessing.get_context('spawn'))
+    try:
+        pending = {pool.submit(screen_file, path, criteria) for path in files}
+        while pending:
+            check_cancel(cancel)
+            done, pending = wait(pending, timeout=0.2, return_when=FIRST_COMPLETED)
+            for future in done:
+                path, violations, _, error = future.result()
+                report.add(path, violations, error)
+            if done and progress:
+                progress(report.files / len(files), f"Cribado {report.files}/{len(files)}")
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+    report.seconds = time.perf_counter() - t0
+    return report
+
+
+def print_report(report, top=20):
+    ranked = report.ranked()
+    print(f"{'severidad':>10}  {'criterio':<24} {'archivo':<24} canal")
+    for v in ranked[:top]:
+        print(f"{v.severity:9.1f}%  {v.criterion:<24.24} {os.path.basename(v.path):<24.24} "
+              f"{v.chan}: {v.description}  (t={v.time:.3f} s, {v.duration:.3f} s fuera de limite)")
+    print("-" * 60)
+    for path, error in report.errors:
+        print(f"ERROR {os.path.basename(path)}: {error}")
+    files_with = len(report.by_file())
+    print(f"Archivos: {report.files}  con violaciones: {files_with}  violaciones: {len(ranked)}  "
+          f"errores: {len(report.errors)}  tiempo: {report.seconds:.2f} s "
+          f"({report.files / max(report.seconds, 1e-9):.1f} archivos/s)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Screen a folder of PSSE .out files against performance criteria.")
+    parser.add_argument('directory', help="folder with .out files")
+    parser.add_argument('criteria', help="JSON criteria file")
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1, help="worker processes")
+    parser.add_argument('-o', '--output', default=None, help="CSV report with every violation")
+    parser.add_argument('--top', type=int, default=20, help="violations printed")
+    args = parser.parse_args(argv)
+
+    criteria = load_criteria(args.criteria)
+    files = find_out_files(args.directory)
+    if not files:
+        print("No hay archivos .out que procesar")
+        return 1
+    report = screen_files(files, criteria, args.jobs)
+    print_report(report, args.top)
+    if args.output:
+        report.write_csv(args.output)
+    return 0 if not report.errors else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,432 @@
+# Study_Server.py
+# Servidor HTTP local (sin interfaz grafica) para consultar los resultados de un estudio desde varios equipos.
+
+# Sirve los archivos .out de una carpeta. Cada archivo se abre una sola vez (con el cache columnar de
+# Channel_Cache cuando se puede escribir junto al .out) y queda en una LRU compartida por todos los
+# clientes; si el archivo cambia en disco (tamano o fecha) se vuelve a abrir. Las imagenes se dibujan
+# con la misma logica que "Generate Plot" (Batch_Render.render_figure / Plot_Render) y se guardan en
+# otra LRU limitada en bytes. Las peticiones se atienden en un grupo fijo de hilos de trabajo; el
+# dibujo con Matplotlib se serializa con un candado (no es seguro entre hilos).
+#
+# Uso:
+#   python Study_Server.py carpeta [--puerto 8765] [--host 127.0.0.1] [-j hilos] [--archivos 8] [--imagenes-mb 64]
+#
+# Rutas (GET; las respuestas son JSON salvo las imagenes y los datos binarios):
+#   /files                                    archivos de la carpeta
+#   /channels?file=caso1.out[&q=type:VOLT]    canales (opcionalmente filtrados con una consulta de Channel_Index)
+#   /data?file=..&chan=1,2[&t0=0&t1=5&points=2000&format=json|bin]
+#       canales reducidos (M4, Plot_Decimation) a ~points muestras dentro de la ventana [t0, t1].
+#       format=bin: por canal, uint32 n seguido de n float32 de tiempo y n float32 de valores
+#       (little-endian), en el orden de "chan"; los canales van tambien en el encabezado X-Channels.
+#   /plot.png?file=..&chan=1,2[&t0=..&t1=..&title=..&w=10&h=5&dpi=100&grid=1&dual=1]
+#   /stats                                    aciertos de los caches y peticiones atendidas
+
+import argparse
+import io
+import json
+import os
+import struct
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+
+from Batch_Render import SpecError, figure_spec, render_figure
+from Channel_Cache import open_cached_channel_file, source_key
+from Channel_Index import ChannelIndex
+from Channel_Reader import ChannelFileError, open_channel_file
+from Channel_Store import ChannelMatrix, LazyChannelData
+from Plot_Decimation import decimate, is_monotonic
+from Screening import find_out_files
+
+DEFAULT_PORT = 8765
+MAX_FILES = 8
+MAX_IMAGE_BYTES = 64 * 1024 * 1024
+DEFAULT_POINTS = 2000
+MAX_POINTS = 200000
+MAX_CHANNELS = 64  # por peticion
+MAX_DPI = 300
+MAX_INCHES = 30
+
+# Matplotlib no es seguro entre hilos: una imagen a la vez
+_RENDER_LOCK = threading.Lock()
+
+
+class RequestError(ValueError):
+    """Raised for a bad request; status is the HTTP status code to answer with."""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+class LRUCache:
+    """Thread-safe LRU bounded by number of entries and/or total size, with hit/miss counters."""
+
+    def __init__(self, max_entries=None, max_bytes=None, sizeof=len):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self._items = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            value = self._items.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def peek(self, key):
+        """Value of key (or None) without touching the counters or the LRU order."""
+        with self._lock:
+            return self._items.get(key)
+
+    def put(self, key, value):
+        size = self.sizeof(value) if self.max_bytes is not None else 0
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self._bytes -= self.sizeof(old) if self.max_bytes is not None else 0
+            self._items[key] = value
+            self._bytes += size
+            while len(self._items) > 1 and (
+                    (self.max_entries is not None and len(self._items) > self.max_entries) or
+                    (self.max_bytes is not None and self._bytes > self.max_bytes)):
+                _, evicted = self._items.popitem(last=False)
+                self._bytes -= self.sizeof(evicted) if self.max_bytes is not None else 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {'entries': len(self._items), 'bytes': self._bytes, 'hits': self.hits, 'misses': self.misses,
+                    'hit_rate': round(self.hits / lookups, 3) if lookups else None}
+
+
+class LoadedFile:
+    """One open channel file: reader, channel ids, data and search index."""
+
+    def __init__(self, name, path, key, reader):
+        self.name = name
+        self.path = path
+        self.key = key
+        self.reader = reader
+        self.short_title, self.chanid = reader.get_index()
+        self.chandata = LazyChannelData(reader, self.chanid)
+        self.index = ChannelIndex(self.chanid)
+        self.time = np.asarray(self.chandata['time'])
+        # La LRU de LazyChannelData no es segura entre hilos (los lectores sin copia no la usan)
+        self._lock = threading.Lock()
+
+    def channel(self, chan):
+        with self._lock:
+            return self.chandata[chan]
+
+
+class StudyServer:
+    """Shared state of the HTTP service: the study folder, the open files and the rendered images."""
+
+    def __init__(self, directory, max_files=MAX_FILES, max_image_bytes=MAX_IMAGE_BYTES, use_cache=True,
+                 dtype=np.float64):
+        self.directory = os.path.abspath(directory)
+        self.use_cache = use_cache
+        self.dtype = dtype
+        self.files = LRUCache(max_entries=max_files)
+        self.images = LRUCache(max_bytes=max_image_bytes)
+        # ruta -> candado de apertura de ese archivo; no se borran (uno por archivo de la carpeta): otro
+        # hilo puede estar esperando el candado, y uno nuevo para la misma ruta permitiria abrirla dos veces
+        self._load_locks = {}
+        self._locks_lock = threading.Lock()
+        self.requests = 0
+        self.started = time.time()
+
+    def list_files(self):
+        return [{'file': os.path.relpath(path, self.directory).replace(os.sep, '/'),
+                 'size': os.path.getsize(path)} for path in find_out_files(self.directory)]
+
+    def resolve(self, name):
+        """Absolute path of a file name relative to the study folder (never outside it)."""
+        if not name:
+            raise RequestError("Missing 'file' parameter")
+        path = os.path.abspath(os.path.join(self.directory, name))
+        if os.path.commonpath([path, self.directory]) != self.directory or not os.path.isfile(path):
+            raise RequestError(f"File not found: {name}", 404)
+        return path
+
+    def open_file(self, name):
+        """LoadedFile of name from the shared LRU; (re)opened if missing or changed on disk."""
+        path = self.resolve(name)
+        ident = source_key(path)
+        key = (ident['path'], ident['size'], ident['mtime_ns'])
+        loaded = self.files.get(key)
+        if loaded is not None:
+            return loaded
+        # Un candado por archivo: dos clientes que piden el mismo archivo no lo leen dos veces (ni
+        # escriben a la vez su cache columnar), y abrir un archivo grande no detiene a los demas
+        with self._locks_lock:
+            lock = self._load_locks.setdefault(ident['path'], threading.Lock())
+        with lock:
+            # Quien esperaba el candado ya conto su fallo: la segunda consulta no cuenta
+            loaded = self.files.peek(key)
+            if loaded is not None:
+                return loaded
+            if self.use_cache:
+                reader = open_cached_channel_file(path)
+            else:
+                reader = open_channel_file(path)
+            if not hasattr(reader, 'read_channel'):
+                reader = ChannelMatrix.from_reader(reader, self.dtype)
+            loaded = LoadedFile(name, path, key, reader)
+            self.files.put(key, loaded)
+            return loaded
+
+    def count_request(self):
+        with self._locks_lock:
+            self.requests += 1
+
+    @staticmethod
+    def parse_channels(loaded, text):
+        chans = []
+        for part in (text or '').split(','):
+            part = part.strip()
+            if not part:
+                continue
+            try:
+                chan = int(part)
+            except ValueError:
+                raise RequestError(f"Bad channel number: {part}")
+            if chan not in loaded.chanid:
+                raise RequestError(f"Channel {chan} doesn't exist", 404)
+            chans.append(chan)
+        if not chans:
+            raise RequestError("Missing 'chan' parameter")
+        if len(chans) > MAX_CHANNELS:
+            raise RequestError(f"At most {MAX_CHANNELS} channels per request")
+        return chans
+
+    def channels(self, params):
+        loaded = self.open_file(params.get('file'))
+        query = params.get('q', '').strip()
+        chans = loaded.index.search(query, limit=None) if query else list(loaded.index.chans)
+        t = loaded.time
+        return {'file': loaded.name, 'title': loaded.short_title, 'steps': len(t),
+                't_start': float(t[0]) if len(t) else None, 't_end': float(t[-1]) if len(t) else None,
+                'channels': [{'chan': chan, 'desc': loaded.chanid[chan]} for chan in chans]}
+
+    def data(self, params):
+        """(loaded, [(chan, t, y)]) of the requested channels, decimated inside the time window."""
+        loaded = self.open_file(params.get('file'))
+        chans = self.parse_channels(loaded, params.get('chan'))
+        points = min(MAX_POINTS, max(4, _number(params, 'points', DEFAULT_POINTS, int)))
+        t = loaded.time
+        window = _window(params, t)
+        monotonic = is_monotonic(t)
+
+        series = []
+        for chan in chans:
+            y = np.asarray(loaded.channel(chan))
+            if monotonic:
+                x_part, y_part = decimate(t, y, max(1, points // 4), window)
+            else:
+                step = max(1, len(t) // points)
+                x_part, y_part = t[::step], y[::step]
+            series.append((chan, x_part, y_part))
+        return loaded, series
+
+    def render(self, params):
+        """PNG bytes of a plot of the requested channels (cached per file version and parameters)."""
+        loaded = self.open_file(params.get('file'))
+        chans = self.parse_channels(loaded, params.get('chan'))
+        fig = {
+            'y': [{'channel': chan} for chan in chans],
+            'fig_width': min(MAX_INCHES, max(1.0, _number(params, 'w', 10.0))),
+            'fig_height': min(MAX_INCHES, max(1.0, _number(params, 'h', 5.0))),
+            'dpi': min(MAX_DPI, max(20, _number(params, 'dpi', 100, int))),
+            'dual_y': params.get('dual', '0') == '1',
+            'grid': params.get('grid', '0') == '1',
+        }
+        if 'title' in params:
+            fig['title'] = params['title']
+        window = _window(params, loaded.time)
+        if window is not None:
+            fig['xlim'] = list(window)
+        key = (loaded.key, json.dumps(fig, sort_keys=True))
+        png = self.images.get(key)
+        if png is not None:
+            return png
+
+        buffer = io.BytesIO()
+        data = {'time': loaded.time}
+        data.update((chan, loaded.channel(chan)) for chan in chans)
+        with _RENDER_LOCK:
+            render_figure(data, loaded.chanid, figure_spec({}, fig), buffer)
+        png = buffer.getvalue()
+        self.images.put(key, png)
+        return png
+
+    def stats(self):
+        with self._locks_lock:
+            requests = self.requests
+        return {'requests': requests, 'uptime_s': round(time.time() - self.started, 1),
+                'files': self.files.stats(), 'images': self.images.stats()}
+
+
+def _number(params, name, default, kind=float):
+    if name not in params or params[name] == '':
+        return default
+    try:
+        value = kind(params[name])
+    except ValueError:
+        raise RequestError(f"Bad value for '{name}': {params[name]}")
+    if kind is float and not np.isfinite(value):
+        raise RequestError(f"Bad value for '{name}': {params[name]}")
+    return value
+
+
+def _window(params, t):
+    """(t0, t1) from the t0/t1 parameters (a missing end is the end of the record), or None."""
+    if 't0' not in params and 't1' not in params:
+        return None
+    return tuple(sorted((_number(params, 't0', float(t[0]) if len(t) else 0.0),
+                         _number(params, 't1', float(t[-1]) if len(t) else 0.0))))
+
+
+def _json_values(values):
+    values = np.asarray(values, dtype=np.float64)
+    if np.isfinite(values).all():
+        return values.tolist()
+    return [v if np.isfinite(v) else None for v in values.tolist()]
+
+
+def encode_series(series):
+    """Binary body of /data?format=bin (see the module header)."""
+    parts = []
+    for _, t, y in series:
+        parts.append(struct.pack('<I', len(t)))
+        parts.append(np.asarray(t, dtype='<f4').tobytes())
+        parts.append(np.asarray(y, dtype='<f4').tobytes())
+    return b''.join(parts)
+
+
+class StudyRequestHandler(BaseHTTPRequestHandler):
+    server_version = "PSSEStudyServer/1.0"
+
+    def do_GET(self):
+        study = self.server.study
+        study.count_request()
+        url = urlparse(self.path)
+        params = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        try:
+            if url.path in ('/', '/files'):
+                self.send_json({'directory': study.directory, 'files': study.list_files()})
+            elif url.path == '/channels':
+                self.send_json(study.channels(params))
+            elif url.path == '/data':
+                loaded, series = study.data(params)
+                if params.get('format', 'json') == 'bin':
+                    self.send_body(encode_series(series), 'application/octet-stream',
+                                   {'X-Channels': ','.join(str(chan) for chan, _, _ in series)})
+                else:
+                    self.send_json({'file': loaded.name, 'channels': [
+                        {'chan': chan, 'desc': loaded.chanid[chan], 't': _json_values(t), 'y': _json_values(y)}
+                        for chan, t, y in series]})
+            elif url.path == '/plot.png':
+                self.send_body(study.render(params), 'image/png')
+            elif url.path == '/stats':
+                self.send_json(study.stats())
+            else:
+                raise RequestError(f"Unknown path: {url.path}", 404)
+        except RequestError as e:
+            self.send_json({'error': str(e)}, e.status)
+        except (SpecError, ChannelFileError) as e:
+            self.send_json({'error': str(e)}, 400)
+        except Exception as e:
+            self.send_json({'error': f"{type(e).__name__}: {e}"}, 500)
+
+    def send_json(self, obj, status=200):
+        self.send_body(json.dumps(obj).encode('utf-8'), 'application/json', status=status)
+
+    def send_body(self, body, content_type, headers=None, status=200):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+
+class PooledHTTPServer(ThreadingHTTPServer):
+    """HTTP server that handles requests on a fixed pool of worker threads."""
+
+    def __init__(self, address, study, workers=8, quiet=False):
+        super().__init__(address, StudyRequestHandler)
+        self.study = study
+        self.quiet = quiet
+        self.pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix='study-http')
+
+    def process_request(self, request, client_address):
+        # En lugar de un hilo nuevo por conexion (ThreadingMixIn), un hilo del grupo
+        self.pool.submit(self.process_request_thread, request, client_address)
+
+    def server_close(self):
+        super().server_close()
+        self.pool.shutdown(wait=True)
+
+
+def make_server(directory, host='127.0.0.1', port=DEFAULT_PORT, workers=8, quiet=False, **study_options):
+    """PooledHTTPServer serving directory (port 0 picks a free port: see server.server_address)."""
+    if not os.path.isdir(directory):
+        raise ValueError(f"Not a folder: {directory}")
+    return PooledHTTPServer((host, port), StudyServer(directory, **study_options), workers, quiet)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the .out files of a study folder over HTTP.")
+    parser.add_argument('directory', help="folder with .out files")
+    parser.add_argument('--host', default='127.0.0.1', help="address to listen on (default: only this machine)")
+    parser.add_argument('--puerto', type=int, default=DEFAULT_PORT, help="TCP port")
+    parser.add_argument('-j', '--jobs', type=int, default=8, help="worker threads")
+    parser.add_argument('--archivos', type=int, default=MAX_FILES, help="open files kept in memory")
+    parser.add_argument('--imagenes-mb', type=float, default=MAX_IMAGE_BYTES / 1e6, help="image cache size (MB)")
+    parser.add_argument('--no-cache', action='store_true', help="don't use the sidecar channel cache")
+    parser.add_argument('--float32', action='store_true',
+                        help="keep dyntools channel data as float32 (half the memory)")
+    parser.add_argument('-q', '--quiet', action='store_true', help="don't log every request")
+    args = parser.parse_args(argv)
+
+    try:
+        server = make_server(args.directory, args.host, args.puerto, args.jobs, args.quiet,
+                             max_files=args.archivos, max_image_bytes=int(args.imagenes_mb * 1e6),
+                             use_cache=not args.no_cache, dtype=np.float32 if args.float32 else np.float64)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}")
+        return 1
+    host, port = server.server_address[:2]
+    print(f"Sirviendo {os.path.abspath(args.directory)} en http://{host}:{port}/ (Ctrl+C para terminar)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,271 @@
+# Benchmarks.py
+# Escenarios de rendimiento de la aplicacion (Dynamic_Graphs.DynamicGraphApp) sobre archivos sinteticos.
+
+# Se genera un archivo .out por tamaño (Synthetic_Out) y se mide, con la ventana real de Tk:
+#   startup        crear la ventana hasta que la figura esta lista
+#   load_numpy     cargar con el lector nativo, sin cache
+#   load_cache     cargar construyendo el cache columnar junto al .out
+#   load_cached    cargar con el cache ya construido
+#   load_dyntools  cargar con el lector "dyntools" (el sustituto de esta carpeta)
+#   load_dyntools_f32  lo mismo guardando los canales en float32
+#   first_plot     primera grafica despues de cargar (un canal Y)
+#   replot         la misma grafica otra vez
+#   reset_axes     "Resetear Ejes"
+#   many_y         grafica con MANY_Y variables Y
+#   export_ui      tiempo que la ventana queda ocupada al guardar a EXPORT_DPI
+#   export_hidpi   hasta que el archivo guardado a EXPORT_DPI esta en disco (sin cache de imagenes)
+#   export_cached  la misma exportacion copiada del cache de imagenes (Render_Cache)
+# Los resultados se escriben en JSON (commit, versiones y tiempos de cada repeticion) y se pueden
+# comparar con un resultado anterior: el programa termina con codigo 1 si algun escenario es mas
+# lento que el anterior por encima de la tolerancia.
+#
+# Uso (en Linux sin pantalla: xvfb-run python benchmarks/Benchmarks.py ...):
+#   python benchmarks/Benchmarks.py [--tamanos 100x2000,2000x6000] [-r 3] [-o resultados.json]
+#                                   [--comparar anterior.json] [--tolerancia 1.25] [--forma fault]
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+sys.path.insert(0, HERE)  # el sustituto de dyntools tiene prioridad sobre una instalacion de PSSE
+sys.path.insert(1, ROOT)
+
+import numpy as np  # noqa: E402
+
+from Synthetic_Out import write_out_file  # noqa: E402
+
+DEFAULT_SIZES = '100x2000,2000x6000'
+MANY_Y = 20
+EXPORT_DPI = 600
+TIMEOUT = 600.0  # s por escenario
+MIN_DIFFERENCE = 0.005  # s; diferencias menores no cuentan como regresion
+
+
+def wait_for(root, done, timeout=TIMEOUT):
+    """Run the Tk event loop until done() is true."""
+    t_end = time.perf_counter() + timeout
+    while not done():
+        root.update()
+        if time.perf_counter() > t_end:
+            raise RuntimeError("Benchmark step timed out")
+        time.sleep(0.001)
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=ROOT, capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def set_entry(entry, text):
+    entry.delete(0, 'end')
+    entry.insert(0, text)
+
+
+class Runner:
+    """Drives one DynamicGraphApp window through the benchmark scenarios."""
+
+    def __init__(self, repeat):
+        import tkinter as tk
+        import Dynamic_Graphs
+
+        self.repeat = repeat
+        self.results = []
+        t0 = time.perf_counter()
+        self.root = tk.Tk()
+        self.app = Dynamic_Graphs.DynamicGraphApp(self.root)
+        wait_for(self.root, lambda: self.app.plot_model is not None)
+        self.add('startup', None, [time.perf_counter() - t0])
+
+    def add(self, scenario, size, times):
+        record = {'scenario': scenario, 'channels': size[0] if size else None,
+                  'steps': size[1] if size else None, 'times': times,
+                  'min': min(times), 'median': statistics.median(times)}
+        self.results.append(record)
+        print(f"{scenario:>17} {str(size or ''):>14}: mediana {record['median'] * 1000:9.1f} ms  "
+              f"min {record['min'] * 1000:9.1f} ms")
+
+    def timed(self, scenario, size, setup, action):
+        times = []
+        for _ in range(self.repeat):
+            setup()
+            t0 = time.perf_counter()
+            action()
+            times.append(time.perf_counter() - t0)
+        self.add(scenario, size, times)
+
+    def load(self, path, backend='auto', use_cache=True, dtype=np.float64):
+        app = self.app
+        app.reader_backend = backend
+        app.use_channel_cache = use_cache
+        app.channel_dtype = dtype
+        app.start_load(path)
+        wait_for(self.root, lambda: app.load_cancel is None)
+        status = app.load_status.cget('text')
+        if status:
+            raise RuntimeError(f"Failed to load {path}: {status}")
+
+    def select(self, n_y):
+        app = self.app
+        while len(app.y_combos) > 1:
+            app.remove_y_variable(app.y_combos[-1])
+        app.combo_x.set('time')
+        app.y_combos[0].set('')
+        labels = list(app.chanid.values())[:n_y]
+        app.add_y_selections(labels)
+
+    def run_size(self, path, size):
+        app = self.app
+
+        def remove_cache():
+            for name in os.listdir(os.path.dirname(path)):
+                if name.endswith('.chcache'):
+                    os.remove(os.path.join(os.path.dirname(path), name))
+
+        def nothing():
+            pass
+
+        self.timed('load_numpy', size, nothing, lambda: self.load(path, 'numpy', use_cache=False))
+        self.timed('load_cache', size, remove_cache, lambda: self.load(path, 'numpy', use_cache=True))
+        self.timed('load_cached', size, nothing, lambda: self.load(path, 'numpy', use_cache=True))
+        self.timed('load_dyntools', size, nothing, lambda: self.load(path, 'dyntools', use_cache=False))
+        self.timed('load_dyntools_f32', size, nothing,
+                   lambda: self.load(path, 'dyntools', use_cache=False, dtype=np.float32))
+
+        def fresh_plot():
+            self.load(path, 'numpy', use_cache=True)
+            self.select(1)
+
+        self.timed('first_plot', size, fresh_plot, lambda: app.generate_plot(save_image=False))
+        self.timed('replot', size, nothing, lambda: app.generate_plot(save_image=False))
+        self.timed('reset_axes', size, nothing, app.reset_axes)
+
+        self.select(MANY_Y)
+        app.plot_model.key = None  # cada repeticion reconstruye las lineas
+        self.timed('many_y', size, lambda: setattr(app.plot_model, 'key', None),
+                   lambda: app.generate_plot(save_image=False))
+
+        # Exportacion: la ventana solo queda ocupada tomando la "foto" de la grafica
+        from Render_Cache import RenderCache
+
+        self.select(1)
+        app.generate_plot(save_image=False)
+        set_entry(app.dpi_entry, str(EXPORT_DPI))
+        set_entry(app.filename_entry, 'benchmark_export')
+
+        def export():
+            t0 = time.perf_counter()
+            app.save_figure_as_png()
+            ui = time.perf_counter() - t0
+            job = app.export_queue.jobs[-1]
+            wait_for(self.root, lambda: job.done)
+            total = time.perf_counter() - t0
+            job.future.result()
+            app.export_queue.collect()  # guarda la imagen en el cache, como _poll_exports
+            return ui, total
+
+        app.export_queue.cache = None  # cada repeticion se dibuja de nuevo
+        ui_times, total_times = zip(*(export() for _ in range(self.repeat)))
+        self.add('export_ui', size, list(ui_times))
+        self.add('export_hidpi', size, list(total_times))
+
+        app.export_queue.cache = RenderCache(os.path.join(os.path.dirname(path), 'renders'))
+        export()  # llena el cache
+        self.add('export_cached', size, [export()[1] for _ in range(self.repeat)])
+
+    def close(self):
+        self.app.export_queue.shutdown()
+        self.root.destroy()
+
+
+def compare(results, baseline, tolerance):
+    """Print the ratio to a previous run; returns the scenarios that got slower."""
+    previous = {(r['scenario'], r['channels'], r['steps']): r for r in baseline['results']}
+    slower = []
+    print(f"\nComparación con {baseline.get('commit') or 'resultado anterior'} (tolerancia {tolerance:.2f}x)")
+    for r in results:
+        key = (r['scenario'], r['channels'], r['steps'])
+        old = previous.get(key)
+        if old is None:
+            continue
+        ratio = r['median'] / old['median'] if old['median'] > 0 else float('inf')
+        regression = ratio > tolerance and r['median'] - old['median'] > MIN_DIFFERENCE
+        print(f"{r['scenario']:>17} {r['channels'] or '':>6} x {r['steps'] or '':<7} "
+              f"{old['median'] * 1000:9.1f} -> {r['median'] * 1000:9.1f} ms  {ratio:5.2f}x"
+              f"{'  REGRESION' if regression else ''}")
+        if regression:
+            slower.append(key)
+    return slower
+
+
+def parse_sizes(text):
+    sizes = []
+    for item in text.split(','):
+        channels, steps = item.lower().split('x')
+        sizes.append((int(channels), int(steps)))
+    return sizes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the PSSE dynamic visualizer on synthetic files.")
+    parser.add_argument('--tamanos', default=DEFAULT_SIZES, help="channels x steps list, e.g. 100x2000,2000x6000")
+    parser.add_argument('-r', '--repeticiones', type=int, default=3, help="repetitions per scenario")
+    parser.add_argument('--forma', default='fault', help="disturbance shape of the synthetic files")
+    parser.add_argument('-o', '--salida', default=None, help="JSON results file")
+    parser.add_argument('--comparar', default=None, help="previous JSON results to compare against")
+    parser.add_argument('--tolerancia', type=float, default=1.25, help="allowed slowdown ratio")
+    args = parser.parse_args(argv)
+
+    import matplotlib
+
+    work_dir = tempfile.mkdtemp(prefix='psse_bench_')
+    runner = Runner(max(1, args.repeticiones))
+    files = {}
+    try:
+        for size in parse_sizes(args.tamanos):
+            path = os.path.join(work_dir, f"synthetic_{size[0]}x{size[1]}.out")
+            files[f"{size[0]}x{size[1]}"] = write_out_file(path, size[0], size[1], args.forma) / 1e6
+            runner.run_size(path, size)
+    finally:
+        runner.close()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    report = {
+        'version': 1,
+        'commit': git_commit(),
+        'date': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'numpy': np.__version__,
+        'matplotlib': matplotlib.__version__,
+        'repeat': runner.repeat,
+        'disturbance': args.forma,
+        'file_mb': files,
+        'results': runner.results,
+    }
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"Resultados: {args.salida}")
+
+    if args.comparar:
+        with open(args.comparar, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        if compare(runner.results, baseline, args.tolerancia):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,173 @@
+# Synthetic_Out.py
+# Generador de archivos de canales .out sinteticos, con el mismo formato binario que escribe PSSE.
+
+# Los canales rotan entre VOLT, ANGL, FREQ, POWR y SPD con descripciones como las de PSSE, y cada
+# uno recibe la forma de perturbacion elegida con parametros aleatorios (semilla fija):
+#   - "fault": falla en t_fault despejada en t_clear; hueco de voltaje y oscilacion amortiguada
+#   - "oscillation": oscilacion amortiguada a partir de t_fault, sin hueco
+#   - "step": escalon con respuesta de primer orden
+#   - "ramp": rampa a partir de t_fault
+#   - "noise": valor constante con ruido
+# En los instantes de conmutacion hay dos muestras con el mismo tiempo (antes y despues), igual que
+# en los archivos reales. El archivo se escribe por bloques de pasos, sin armarlo completo en memoria.
+#
+# Uso:
+#   python Synthetic_Out.py salida.out [--canales N] [--pasos N] [--forma fault] [--dt 0.005]
+
+import argparse
+import os
+import struct
+import sys
+
+import numpy as np
+
+sys.path.insert(1, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Channel_Reader import CHANNEL_ID_LEN, TITLE_LINE_LEN, record_dtype  # noqa: E402
+
+DISTURBANCES = ('fault', 'oscillation', 'step', 'ramp', 'noise')
+QUANTITIES = ('VOLT', 'ANGL', 'FREQ', 'POWR', 'SPD')
+BLOCK_ELEMENTS = 4 * 1024 * 1024  # valores por bloque escrito
+
+# cantidad -> (valor base minimo, maximo, escala de la perturbacion)
+_QUANTITY_SCALES = {
+    'VOLT': (0.95, 1.05, 1.0),
+    'ANGL': (-30.0, 60.0, 25.0),
+    'FREQ': (0.0, 0.0, 0.002),
+    'POWR': (50.0, 500.0, 100.0),
+    'SPD': (0.0, 0.0, 0.004),
+}
+
+
+def _record(payload):
+    marker = struct.pack('<i', len(payload))
+    return marker + payload + marker
+
+
+def channel_descriptions(nchan):
+    """PSSE-like channel descriptions, rotating through QUANTITIES."""
+    descs = []
+    for i in range(nchan):
+        quantity = QUANTITIES[i % len(QUANTITIES)]
+        bus = 1000 + i // len(QUANTITIES)
+        if quantity in ('VOLT', 'FREQ'):
+            descs.append(f"{quantity} {bus} [BUS{bus} 230.00]")
+        else:
+            descs.append(f"{quantity} {bus} [GEN{bus} 13.800]1")
+    return descs
+
+
+def time_vector(nsteps, dt=0.005, t_fault=1.0, t_clear=1.1):
+    """(t, fault_on) with repeated time stamps at the fault and at the clearing."""
+    t_end = max(t_clear + dt, (nsteps + 2) * dt)
+    grid = np.union1d(np.round(np.arange(0.0, t_end, dt), 9), [t_fault, t_clear])
+    pre = grid[grid <= t_fault]
+    during = grid[(grid >= t_fault) & (grid <= t_clear)]
+    post = grid[grid >= t_clear]
+    t = np.concatenate((pre, during, post))[:nsteps]
+    fault_on = np.concatenate((np.zeros(len(pre), bool), np.ones(len(during), bool),
+                               np.zeros(len(post), bool)))[:nsteps]
+    return t, fault_on
+
+
+class _ChannelParameters:
+    """Random per-channel parameters of the disturbance (one array per parameter)."""
+
+    def __init__(self, descs, seed):
+        rng = np.random.default_rng(seed)
+        n = len(descs)
+        quantities = [d.split()[0] for d in descs]
+        lo, hi, scale = (np.array([_QUANTITY_SCALES[q][k] for q in quantities]) for k in range(3))
+        self.base = lo + (hi - lo) * rng.random(n)
+        self.scale = scale
+        self.is_volt = np.array([q == 'VOLT' for q in quantities])
+        self.depth = rng.uniform(0.3, 0.8, n)  # hueco de voltaje (fraccion)
+        self.freq = rng.uniform(0.2, 2.0, n)  # Hz
+        self.damping = rng.uniform(0.02, 0.25, n)
+        self.amplitude = rng.uniform(0.02, 0.15, n)
+        self.tau = rng.uniform(0.2, 1.5, n)  # s, constante de tiempo de recuperacion
+        self.slope = rng.uniform(-0.02, 0.02, n)  # por segundo
+        self.rng = rng
+
+
+def _response(kind, p, t, fault_on, t_fault, t_clear, noise):
+    """(steps, channels) block of values at times t."""
+    t = t[:, np.newaxis]
+    after_fault = np.where(t >= t_fault, t - t_fault, 0.0)
+    after_clear = np.where((t >= t_clear) & ~fault_on[:, np.newaxis], t - t_clear, 0.0)
+    started = (t >= t_clear) & ~fault_on[:, np.newaxis]
+    omega = 2 * np.pi * p.freq
+    swing = p.amplitude * np.exp(-p.damping * omega * after_clear) * np.sin(omega * after_clear)
+
+    if kind == 'fault':
+        dip = np.where(fault_on[:, np.newaxis], p.depth, 0.0)
+        recovery = np.where(started, 0.2 * p.depth * np.exp(-after_clear / p.tau), 0.0)
+        volt = 1.0 - dip - recovery + swing
+        other = np.where(fault_on[:, np.newaxis], after_fault / (t_clear - t_fault), 0.0) + \
+            np.where(started, swing / p.amplitude * 0.5, 0.0)
+        shape = np.where(p.is_volt, p.base * volt - p.base, other)
+    elif kind == 'oscillation':
+        kick = np.where(t >= t_fault, after_fault, 0.0)
+        shape = p.amplitude * np.exp(-p.damping * omega * kick) * np.sin(omega * kick)
+    elif kind == 'step':
+        shape = np.where(t >= t_fault, 0.1 * (1.0 - np.exp(-after_fault / p.tau)), 0.0)
+    elif kind == 'ramp':
+        shape = p.slope * after_fault
+    else:
+        shape = np.zeros((len(t), len(p.base)))
+
+    values = p.base + p.scale * shape
+    if noise:
+        values += noise * p.scale * p.rng.standard_normal(values.shape)
+    return values
+
+
+def write_out_file(path, nchan=100, nsteps=2000, disturbance='fault', dt=0.005, t_fault=1.0, t_clear=1.1,
+                   noise=0.0, seed=0):
+    """Write a synthetic .out file; returns its size in bytes."""
+    if disturbance not in DISTURBANCES:
+        raise ValueError(f"Unknown disturbance: {disturbance}")
+    descs = channel_descriptions(nchan)
+    t, fault_on = time_vector(nsteps, dt, t_fault, t_clear)
+    params = _ChannelParameters(descs, seed)
+    dtype = record_dtype(nchan)
+    marker = dtype['values'].itemsize
+    chunk = max(1, BLOCK_ELEMENTS // (nchan + 1))
+
+    title = f"SYNTHETIC {disturbance.upper()} {nchan} CHANNELS".ljust(TITLE_LINE_LEN)[:TITLE_LINE_LEN]
+    with open(path, 'wb') as f:
+        f.write(_record(struct.pack('<2i', nchan, 1)))
+        f.write(_record((title + "PSSE DYNAMIC VISUALIZER BENCHMARK".ljust(TITLE_LINE_LEN)).encode('ascii')))
+        if nchan:
+            f.write(_record(b''.join(d.encode('ascii').ljust(CHANNEL_ID_LEN)[:CHANNEL_ID_LEN] for d in descs)))
+        for i0 in range(0, len(t), chunk):
+            i1 = min(i0 + chunk, len(t))
+            records = np.empty(i1 - i0, dtype=dtype)
+            records['head'] = marker
+            records['tail'] = marker
+            records['values'][:, 0] = t[i0:i1]
+            records['values'][:, 1:] = _response(disturbance, params, t[i0:i1], fault_on[i0:i1],
+                                                  t_fault, t_clear, noise)
+            records.tofile(f)
+    return os.path.getsize(path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write a synthetic PSSE .out channel file.")
+    parser.add_argument('path', help="output .out file")
+    parser.add_argument('--canales', type=int, default=100, help="number of channels")
+    parser.add_argument('--pasos', type=int, default=2000, help="number of time steps")
+    parser.add_argument('--forma', choices=DISTURBANCES, default='fault', help="disturbance shape")
+    parser.add_argument('--dt', type=float, default=0.005, help="time step (s)")
+    parser.add_argument('--ruido', type=float, default=0.0, help="noise, as a fraction of the channel scale")
+    parser.add_argument('--semilla', type=int, default=0, help="random seed")
+    args = parser.parse_args(argv)
+
+    size = write_out_file(args.path, args.canales, args.pasos, args.forma, args.dt, noise=args.ruido,
+                          seed=args.semilla)
+    print(f"{args.path}: {args.canales} canales x {args.pasos} pasos, {size / 1e6:.1f} MB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
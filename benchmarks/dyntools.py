@@ -0,0 +1,51 @@
+# dyntools.py
+# Sustituto de dyntools de PSSE para benchmarks y pruebas en equipos sin PSSE (p. ej. Linux).
+
+# Implementa la parte de dyntools.CHNF que usa la aplicacion (get_data, get_id, get_range) sobre el
+# lector nativo de Channel_Reader, con las mismas estructuras de retorno: diccionarios con 'time' y
+# los numeros de canal como claves. Con la carpeta benchmarks al inicio de sys.path, el lector
+# "dyntools" de Channel_Reader usa este modulo (y psse35/psspy de la misma carpeta) sin cambios.
+
+import os
+import sys
+
+sys.path.insert(1, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Channel_Reader import ChannelFileError, OutFileReader  # noqa: E402
+
+STAND_IN = True  # el dyntools real no tiene este atributo
+
+
+class CHNF:
+    """Stand-in for dyntools.CHNF: reads every sample of the file when it is opened, like PSSE."""
+
+    def __init__(self, *outfiles, **kwargs):
+        if not outfiles:
+            raise ValueError("CHNF needs a channel file")
+        path = outfiles[0][0] if isinstance(outfiles[0], (list, tuple)) else outfiles[0]
+        if path.lower().endswith('.outx'):
+            raise ChannelFileError("The dyntools stand-in only reads .out files")
+        self.outfile = path
+        self._short_title, self._chanid, self._chandata = OutFileReader(path).get_data()
+
+    def _channels(self, channels):
+        if not channels:
+            return list(self._chanid)
+        return ['time'] + [c for c in channels if c != 'time']
+
+    def get_data(self, channels=None):
+        """(short_title, chanid, chandata) of every channel or only of channels."""
+        chans = self._channels(channels)
+        return (self._short_title, {c: self._chanid[c] for c in chans},
+                {c: self._chandata[c].tolist() for c in chans})
+
+    def get_id(self, channels=None):
+        """(short_title, chanid) of every channel or only of channels."""
+        chans = self._channels(channels)
+        return self._short_title, {c: self._chanid[c] for c in chans}
+
+    def get_range(self, channels=None):
+        """{chan: {'min': value, 'max': value}} of every channel or only of channels."""
+        return {c: {'min': float(self._chandata[c].min()) if len(self._chandata[c]) else 0.0,
+                    'max': float(self._chandata[c].max()) if len(self._chandata[c]) else 0.0}
+                for c in self._channels(channels)}
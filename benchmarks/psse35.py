@@ -0,0 +1,2 @@
+# psse35.py
+# Sustituto vacio del modulo psse35 de PSSE (ver dyntools.py de esta carpeta).
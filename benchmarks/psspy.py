@@ -0,0 +1,7 @@
+# psspy.py
+# Sustituto de psspy de PSSE con lo que usa la aplicacion (ver dyntools.py de esta carpeta).
+
+
+def psseinit(buses=None):
+    """Stand-in for psspy.psseinit(): there is nothing to initialize."""
+    return 0
@@ -0,0 +1,75 @@
+# test_channel_cache.py
+# Pruebas de Channel_Cache: caches danadas que se reconstruyen y construcciones simultaneas.
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import unittest
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(1, ROOT)
+sys.path.insert(2, os.path.join(ROOT, 'benchmarks'))
+
+from Channel_Cache import CACHE_MAGIC, _HEADER_LEN, ChannelCache, open_cached_channel_file  # noqa: E402
+from Channel_Reader import OutFileReader  # noqa: E402
+from Synthetic_Out import write_out_file  # noqa: E402
+
+
+class ChannelCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, 'caso.out')
+        write_out_file(self.path, nchan=6, nsteps=300)
+        self.cache_path = self.path + '.chcache'
+
+    def tearDown(self):
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def write_header(self, meta):
+        raw = json.dumps(meta).encode('utf-8')
+        with open(self.cache_path, 'r+b') as f:
+            f.seek(len(CACHE_MAGIC))
+            f.write(_HEADER_LEN.pack(len(raw)))
+            f.write(raw)
+
+    def assert_same_data(self, reader):
+        expected = OutFileReader(self.path)
+        for chan in ('time', 1, 6):
+            np.testing.assert_array_equal(reader.read_channel(chan), expected.read_channel(chan))
+
+    def test_corrupt_headers_are_rebuilt(self):
+        open_cached_channel_file(self.path)
+        for meta in ([1, 2, 3], "cache", {'version': 1}, {'version': 1, 'source': None, 'nchan': 'x'}):
+            self.write_header(meta)
+            reader = open_cached_channel_file(self.path)
+            self.assertIsInstance(reader, ChannelCache, meta)
+            self.assert_same_data(reader)
+
+    def test_concurrent_builds_in_one_process(self):
+        readers, errors = [], []
+
+        def build():
+            try:
+                readers.append(open_cached_channel_file(self.path))
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=build) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertTrue(all(isinstance(r, ChannelCache) for r in readers))
+        self.assertEqual(sorted(os.listdir(self.dir)), ['caso.out', 'caso.out.chcache'])
+        self.assert_same_data(readers[-1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+# test_channel_metrics.py
+# Pruebas de Channel_Metrics con senales sinteticas de sobrepaso y establecimiento conocidos.
+
+# Las senales son lineales por tramos: falla en t = 1.0 s, despeje en t = 1.1 s, un tramo que pasa
+# del valor final y otro que vuelve a el, de modo que el sobrepaso y el tiempo de establecimiento
+# se calculan a mano.
+
+import os
+import sys
+import unittest
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(1, ROOT)
+
+from Channel_Metrics import DEFAULT_METRIC_SETTINGS, block_metrics, compute_metrics  # noqa: E402
+
+DT = 0.001
+T = np.round(np.arange(0.0, 10.0 + DT / 2, DT), 6)
+
+
+def piecewise(pre, fault, points):
+    """pre before the fault, fault until the clearing, then linear through points [(t, y)] and flat."""
+    ts, ys = zip(*points)
+    y = np.interp(T, ts, ys)
+    y[T < 1.1] = fault
+    y[T < 1.0] = pre
+    return y
+
+
+class BlockMetricsTest(unittest.TestCase):
+
+    def metrics(self, rows, quantities):
+        block = np.vstack(rows)
+        is_volt = np.array([q == 'VOLT' for q in quantities])
+        is_freq = np.array([q == 'FREQ' for q in quantities])
+        return block_metrics(block, T, is_volt, is_freq, DEFAULT_METRIC_SETTINGS)
+
+    def test_voltage_recovering_from_below(self):
+        # Excursion 1.05 - 0.5 = 0.55; pasa 0.05 por encima de 1.0
+        y = piecewise(1.0, 0.5, [(1.1, 0.9), (1.6, 1.05), (2.1, 1.0)])
+        m = self.metrics([y], ['VOLT'])
+        self.assertAlmostEqual(m['overshoot'][0], 0.05 / 0.55 * 100.0, places=6)
+        # Banda 0.02 * 0.55 = 0.011: la rampa de bajada la cruza en t = 1.6 + 0.5 * 0.039 / 0.05
+        self.assertAlmostEqual(m['settling'][0], 1.6 + 0.5 * 0.039 / 0.05 - 1.1, delta=2 * DT)
+        self.assertAlmostEqual(m['nadir'][0], 0.5)
+        self.assertAlmostEqual(m['final'][0], 1.0)
+
+    def test_negative_channel_overshoots_below_final(self):
+        # Flujo de -100 que baja hacia el final desde -60, pasa a -110 y vuelve: 10 de 90 de excursion
+        y = piecewise(-100.0, -20.0, [(1.1, -60.0), (1.6, -110.0), (2.1, -100.0)])
+        m = self.metrics([y], ['POWR'])
+        self.assertAlmostEqual(m['overshoot'][0], 10.0 / 90.0 * 100.0, places=6)
+        # Banda 0.02 * 90 = 1.8
+        self.assertAlmostEqual(m['settling'][0], 1.6 + 0.5 * 8.2 / 10.0 - 1.1, delta=2 * DT)
+
+    def test_final_near_zero_is_finite(self):
+        # Diferencia angular que oscila y se amortigua alrededor de cero
+        y = np.where(T < 1.0, 0.0, 30.0 * np.exp(-(T - 1.0) / 0.5) * np.cos(2 * np.pi * (T - 1.0)))
+        m = self.metrics([y], ['ANGL'])
+        self.assertTrue(np.isfinite(m['overshoot'][0]))
+        self.assertGreaterEqual(m['overshoot'][0], 0.0)
+        self.assertLessEqual(m['overshoot'][0], 100.0)
+        self.assertTrue(np.isfinite(m['settling'][0]))
+        self.assertLess(m['settling'][0], 5.0)
+
+    def test_flat_channel_is_nan(self):
+        m = self.metrics([np.full(len(T), 1.0), np.zeros(len(T))], ['VOLT', 'ANGL'])
+        self.assertTrue(np.isnan(m['overshoot']).all())
+        self.assertTrue(np.isnan(m['settling']).all())
+        self.assertTrue(np.isfinite(m['final']).all())
+
+    def test_flat_frequency_settles_in_its_band(self):
+        m = self.metrics([np.zeros(len(T))], ['FREQ'])
+        self.assertTrue(np.isnan(m['overshoot'][0]))
+        self.assertEqual(m['settling'][0], 0.0)
+
+    def test_order_puts_flat_channels_last(self):
+        chanid = {'time': 'Time(s)', 1: 'VOLT 1000 [BUS1000 230.00]', 2: 'ANGL 1001 [GEN1001 13.800]1',
+                  3: 'POWR 1002 TO 1003 CKT 1'}
+        chandata = {
+            'time': T,
+            1: np.full(len(T), 1.0),
+            2: np.where(T < 1.0, 0.0, 30.0 * np.exp(-(T - 1.0) / 0.5) * np.cos(2 * np.pi * (T - 1.0))),
+            3: piecewise(-100.0, -20.0, [(1.1, -60.0), (1.6, -110.0), (2.1, -100.0)]),
+        }
+        table = compute_metrics(chanid, chandata)
+        self.assertEqual([table.chans[i] for i in table.order('overshoot', descending=True)][-1], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
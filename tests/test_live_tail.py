@@ -0,0 +1,150 @@
+# test_live_tail.py
+# Pruebas de Live_Tail.OutFileTail contra un proceso escritor que agrega registros al .out.
+
+# El escritor (este mismo archivo ejecutado con "writer") agrega registros sinteticos en rafagas y
+# parte algunos en dos escrituras con una pausa en medio, como un volcado a medias de PSSE.
+#
+# Uso:
+#   python -m pytest tests            o            python -m unittest discover tests
+
+import os
+import struct
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(1, ROOT)
+
+from Channel_Reader import CHANNEL_ID_LEN, TITLE_LINE_LEN, ChannelFileError, record_dtype  # noqa: E402
+from Live_Tail import OutFileTail  # noqa: E402
+
+NCHAN = 5
+NSTEPS = 3000
+DT = 0.005
+TIMEOUT = 60.0  # s
+
+
+def _record(payload):
+    marker = struct.pack('<i', len(payload))
+    return marker + payload + marker
+
+
+def write_header(path, nchan=NCHAN):
+    with open(path, 'wb') as f:
+        f.write(_record(struct.pack('<2i', nchan, 1)))
+        f.write(_record(b'LIVE TAIL TEST'.ljust(2 * TITLE_LINE_LEN)))
+        f.write(_record(b''.join(f"VOLT {1000 + i} [BUS{1000 + i} 230.00]".encode('ascii').ljust(CHANNEL_ID_LEN)
+                                 for i in range(nchan))))
+
+
+def expected_records(nsteps=NSTEPS, nchan=NCHAN):
+    dtype = record_dtype(nchan)
+    records = np.empty(nsteps, dtype=dtype)
+    records['head'] = records['tail'] = dtype['values'].itemsize
+    t = np.arange(nsteps) * DT
+    records['values'][:, 0] = t
+    records['values'][:, 1:] = 1.0 + 0.01 * np.sin(np.outer(t, np.arange(1, nchan + 1)))
+    return records
+
+
+def writer(path, nsteps):
+    """Append the expected records to path in bursts, splitting some records across two writes."""
+    data = expected_records(nsteps).tobytes()
+    itemsize = record_dtype(NCHAN).itemsize
+    rng = np.random.default_rng(1)
+    pos = 0
+    with open(path, 'ab') as f:
+        while pos < len(data):
+            n = int(rng.integers(1, 200)) * itemsize
+            if rng.random() < 0.5:
+                n += int(rng.integers(1, itemsize))  # termina a mitad de un registro
+            f.write(data[pos:pos + n])
+            f.flush()
+            pos += n
+            time.sleep(0.002)
+
+
+class OutFileTailTest(unittest.TestCase):
+
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix='.out')
+        os.close(fd)
+        write_header(self.path)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_follows_writer_process(self):
+        tail = OutFileTail(self.path)
+        self.assertEqual(tail.poll(), 0)
+
+        proc = subprocess.Popen([sys.executable, os.path.abspath(__file__), 'writer', self.path, str(NSTEPS)])
+        polls = []
+        t_end = time.perf_counter() + TIMEOUT
+        try:
+            while True:
+                finished = proc.poll() is not None
+                polls.append(tail.poll())
+                if finished and tail.nsteps >= NSTEPS:
+                    break
+                self.assertLess(time.perf_counter(), t_end, "the tail didn't catch up with the writer")
+                time.sleep(0.005)
+        finally:
+            if proc.poll() is None:
+                proc.kill()
+            proc.wait()
+        self.assertEqual(proc.returncode, 0)
+
+        # Todo llego, en orden, sin muestras de registros a medio escribir
+        expected = expected_records()
+        self.assertEqual(tail.nsteps, NSTEPS)
+        self.assertGreater(sum(1 for n in polls if n), 1)
+        for col in range(NCHAN + 1):
+            np.testing.assert_array_equal(tail.columns.column(col), expected['values'][:, col])
+        self.assertEqual(tail.offset, os.path.getsize(self.path))
+
+    def test_partial_record_is_not_consumed(self):
+        data = expected_records(3).tobytes()
+        itemsize = len(data) // 3
+        with open(self.path, 'ab') as f:
+            f.write(data[:itemsize + 5])
+        tail = OutFileTail(self.path)
+        self.assertEqual(tail.poll(), 1)
+        self.assertEqual(tail.poll(), 0)
+        with open(self.path, 'ab') as f:
+            f.write(data[itemsize + 5:])
+        self.assertEqual(tail.poll(), 2)
+        self.assertEqual(tail.nsteps, 3)
+
+    def test_poll_is_bounded_by_bytes(self):
+        with open(self.path, 'ab') as f:
+            f.write(expected_records(100).tobytes())
+        tail = OutFileTail(self.path)
+        itemsize = tail.reader.dtype.itemsize
+        self.assertEqual(tail.poll(max_bytes=10 * itemsize), 10)
+        self.assertTrue(tail.pending)
+        # Un limite menor que un registro igual avanza de a uno
+        self.assertEqual(tail.poll(max_bytes=1), 1)
+        self.assertEqual(tail.poll(), 89)
+        self.assertFalse(tail.pending)
+
+    def test_truncated_file_is_an_error(self):
+        with open(self.path, 'ab') as f:
+            f.write(expected_records(10).tobytes())
+        tail = OutFileTail(self.path)
+        tail.poll()
+        write_header(self.path)
+        with self.assertRaises(ChannelFileError):
+            tail.poll()
+
+
+if __name__ == '__main__':
+    if len(sys.argv) == 4 and sys.argv[1] == 'writer':
+        writer(sys.argv[2], int(sys.argv[3]))
+    else:
+        unittest.main()
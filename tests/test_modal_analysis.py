@@ -0,0 +1,82 @@
+# test_modal_analysis.py
+# Pruebas del barrido modal con oscilaciones sinteticas de frecuencia y amortiguamiento conocidos.
+
+# Cada canal es una suma de modos amortiguados que arrancan en el despeje (t = 1.1 s), muestreada
+# cada 5 ms como un .out de PSSE; la ventana de analisis es la de DEFAULT_MODAL_SETTINGS.
+
+import os
+import sys
+import unittest
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(1, ROOT)
+
+from Modal_Analysis import DEFAULT_MODAL_SETTINGS, modal_scan  # noqa: E402
+
+T = np.round(np.arange(0.0, 12.0, 0.005), 6)
+
+
+def mode(freq, zeta, amplitude, phase=0.0):
+    """Damped oscillation of natural frequency freq (Hz) and damping ratio zeta, starting at clearing."""
+    omega = 2 * np.pi * freq
+    tau = np.maximum(T - 1.1, 0.0)
+    return amplitude * np.exp(-zeta * omega * tau) * np.cos(omega * np.sqrt(1 - zeta ** 2) * tau + phase)
+
+
+def scan(*rows):
+    chanid = {'time': 'Time(s)'}
+    chandata = {'time': T}
+    for i, row in enumerate(rows, start=1):
+        chanid[i] = f"ANGL {1000 + i} [GEN{1000 + i} 13.800]1"
+        chandata[i] = row
+    return modal_scan(chanid, chandata, list(chandata))
+
+
+class ModalScanTest(unittest.TestCase):
+
+    def assert_modes(self, found, expected, freq_tol=0.01, zeta_tol=0.005):
+        self.assertEqual(len(found), len(expected), found)
+        for (freq, zeta, _), (f_exp, z_exp) in zip(found, expected):
+            self.assertAlmostEqual(freq, f_exp * np.sqrt(1 - z_exp ** 2), delta=freq_tol)
+            self.assertAlmostEqual(zeta, z_exp, delta=zeta_tol)
+
+    def test_clean_two_modes(self):
+        table = scan(1.0 + mode(0.5, 0.03, 0.1) + mode(1.2, 0.10, 0.05))
+        self.assert_modes(table.modes(0), [(0.5, 0.03), (1.2, 0.10)])
+        self.assertAlmostEqual(table.columns['damping'][0], 0.03, delta=0.002)
+        self.assertGreater(table.columns['fit'][0], 0.99)
+
+    def test_clean_single_mode_has_no_spurious_modes(self):
+        table = scan(1.0 + mode(1.3, 0.024, 0.2), 50.0 + mode(1.3, 0.024, 4.0, phase=1.0))
+        for i in range(2):
+            self.assert_modes(table.modes(i), [(1.3, 0.024)])
+            # Dos polos del modo y a lo sumo dos de lo que queda de la tendencia
+            self.assertLessEqual(np.count_nonzero(table.poles[i]), 6)
+
+    def test_noisy_signal(self):
+        rng = np.random.default_rng(3)
+        noise = 0.01 * rng.standard_normal(len(T))
+        table = scan(1.0 + mode(0.5, 0.03, 0.1) + mode(1.2, 0.10, 0.05) + noise,
+                     1.0 + mode(0.8, 0.05, 0.1) + 2 * noise)
+        self.assert_modes(table.modes(0), [(0.5, 0.03), (1.2, 0.10)], freq_tol=0.02, zeta_tol=0.01)
+        self.assert_modes(table.modes(1), [(0.8, 0.05)], freq_tol=0.02, zeta_tol=0.01)
+
+    def test_flat_channel_is_nan(self):
+        table = scan(np.full(len(T), 1.0), np.zeros(len(T)), 1.0 + mode(0.5, 0.03, 0.1))
+        for i in range(2):
+            self.assertEqual(table.modes(i), [])
+            for field in ('freq', 'damping', 'amplitude', 'fft_freq', 'fit'):
+                self.assertTrue(np.isnan(table.columns[field][i]), field)
+            self.assertFalse(np.any(table.poles[i]))
+        # Los canales sin modos quedan al final al ordenar por amortiguamiento
+        self.assertEqual(table.order('damping')[0], 2)
+
+    def test_order_is_capped_by_settings(self):
+        table = scan(1.0 + mode(0.5, 0.03, 0.1) + mode(1.2, 0.10, 0.05))
+        self.assertEqual(table.poles.shape[1], DEFAULT_MODAL_SETTINGS['order'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+# test_screening.py
+# Pruebas de Screening sobre un archivo .out sintetico con violaciones conocidas.
+
+# Cada canal VOLT queda en un valor constante distinto despues de la falla, todos por debajo de la
+# envolvente, y cada canal FREQ en una desviacion distinta; asi se sabe de antemano cuales son las
+# peores violaciones. El tamano de bloque se reduce para que los canales se lean en varios bloques.
+
+import os
+import shutil
+import struct
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(1, ROOT)
+
+import Channel_Metrics  # noqa: E402
+import Screening  # noqa: E402
+from Channel_Reader import CHANNEL_ID_LEN, TITLE_LINE_LEN, record_dtype  # noqa: E402
+
+N_VOLT = 20
+N_FREQ = 20
+T = np.round(np.arange(0.0, 5.0, 0.01), 6)
+ENVELOPE = 0.9  # p.u., desde el despeje
+MIN_HZ = 59.8
+CRITERIA = {
+    't_fault': 1.0, 't_clear': 1.1,
+    'criteria': [
+        {'name': 'Voltaje', 'type': 'voltage_envelope', 'channels': 'type:VOLT', 'envelope': [[0.0, ENVELOPE]]},
+        {'name': 'Frecuencia', 'type': 'frequency', 'channels': 'type:FREQ', 'min_hz': MIN_HZ},
+    ],
+}
+
+
+def _record(payload):
+    marker = struct.pack('<i', len(payload))
+    return marker + payload + marker
+
+
+def volt_level(i):
+    return 0.5 + 0.01 * i  # canal VOLT i (1..N_VOLT) despues de la falla; el 1 es el peor
+
+
+def freq_hz(j):
+    return 60.0 - 0.03 * j  # canal FREQ j (1..N_FREQ); viola desde j = 7, el ultimo es el peor
+
+
+def write_study_file(path):
+    descs = [f"VOLT {1000 + i} [BUS{1000 + i} 230.00]" for i in range(1, N_VOLT + 1)]
+    descs += [f"FREQ {2000 + j} [BUS{2000 + j} 230.00]" for j in range(1, N_FREQ + 1)]
+    values = np.empty((len(T), len(descs)))
+    faulted = (T >= 1.0)[:, np.newaxis]
+    values[:, :N_VOLT] = np.where(faulted, [volt_level(i) for i in range(1, N_VOLT + 1)], 1.0)
+    values[:, N_VOLT:] = np.where(faulted, [freq_hz(j) / 60.0 - 1.0 for j in range(1, N_FREQ + 1)], 0.0)
+
+    dtype = record_dtype(len(descs))
+    records = np.empty(len(T), dtype=dtype)
+    records['head'] = records['tail'] = dtype['values'].itemsize
+    records['values'][:, 0] = T
+    records['values'][:, 1:] = values
+    with open(path, 'wb') as f:
+        f.write(_record(struct.pack('<2i', len(descs), 1)))
+        f.write(_record(b'SCREENING TEST'.ljust(2 * TITLE_LINE_LEN)))
+        f.write(_record(b''.join(d.encode('ascii').ljust(CHANNEL_ID_LEN) for d in descs)))
+        records.tofile(f)
+
+
+class ScreeningTest(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, 'caso.out')
+        write_study_file(self.path)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def screen(self):
+        path, violations, _, error = Screening.screen_file(self.path, CRITERIA)
+        self.assertIsNone(error)
+        self.assertEqual(path, self.path)
+        return ([v for v in violations if v.criterion == 'Voltaje'],
+                [v for v in violations if v.criterion == 'Frecuencia'])
+
+    def test_known_violations(self):
+        volt, freq = self.screen()
+        self.assertEqual([v.chan for v in volt], list(range(1, N_VOLT + 1)))
+        for v in volt:
+            self.assertAlmostEqual(v.value, volt_level(v.chan), places=5)
+            self.assertAlmostEqual(v.excess, ENVELOPE - volt_level(v.chan), places=5)
+            self.assertAlmostEqual(v.time, 1.1)
+            self.assertAlmostEqual(v.duration, T[-1] - 1.1, places=6)
+        self.assertEqual([v.chan - N_VOLT for v in freq], list(range(N_FREQ, 6, -1)))
+        for v in freq:
+            self.assertAlmostEqual(v.value, freq_hz(v.chan - N_VOLT), places=3)
+            self.assertEqual(v.limit, MIN_HZ)
+
+    def test_cap_applies_to_the_whole_file(self):
+        # Bloques de 3 canales y a lo sumo 4 violaciones por criterio: las peores del archivo, no de cada bloque
+        with mock.patch.object(Channel_Metrics, '_BLOCK_ELEMENTS', 3 * len(T)), \
+                mock.patch.object(Screening, 'MAX_ROWS_PER_CRITERION', 4):
+            volt, freq = self.screen()
+        self.assertEqual([v.chan for v in volt], [1, 2, 3, 4])
+        self.assertEqual([v.chan - N_VOLT for v in freq], [20, 19, 18, 17])
+
+    def test_blocks_do_not_change_the_result(self):
+        whole = self.screen()
+        with mock.patch.object(Channel_Metrics, '_BLOCK_ELEMENTS', 3 * len(T)):
+            blocked = self.screen()
+        self.assertEqual(whole, blocked)
+
+
+if __name__ == '__main__':
+    unittest.main()
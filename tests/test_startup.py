@@ -0,0 +1,90 @@
+# test_startup.py
+# Prueba de regresion del arranque de Dynamic_Graphs: presupuesto de tiempo e importaciones diferidas.
+
+# Cada prueba corre en un proceso nuevo (los modulos ya importados por pytest no cuentan) con los
+# sustitutos de psse35/psspy/dyntools de benchmarks/ en la ruta, de modo que una importacion
+# anticipada de PSSE no falla sino que se detecta. La prueba de la ventana necesita pantalla
+# (en Linux sin pantalla: xvfb-run python -m pytest tests); sin ella se omite.
+
+import json
+import os
+import subprocess
+import sys
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCHMARKS = os.path.join(ROOT, 'benchmarks')
+sys.path.insert(1, ROOT)
+
+DEFERRED_MODULES = ('matplotlib', 'psse35', 'psspy', 'dyntools')
+PSSE_MODULES = ('psse35', 'psspy', 'dyntools')
+NO_DISPLAY = 77  # codigo de salida del proceso de prueba cuando Tk no puede abrir una ventana
+TIMEOUT = 120  # s
+
+_PRELUDE = f"""
+import json, sys, time
+sys.path[:0] = [{BENCHMARKS!r}, {ROOT!r}]
+"""
+
+_IMPORT_SCRIPT = _PRELUDE + """
+t0 = time.perf_counter()
+import Dynamic_Graphs
+seconds = time.perf_counter() - t0
+print(json.dumps({'seconds': seconds, 'budget': Dynamic_Graphs.STARTUP_BUDGET,
+                  'modules': sorted(m for m in sys.modules if m.split('.')[0] in %r)}))
+""" % (DEFERRED_MODULES,)
+
+_WINDOW_SCRIPT = _PRELUDE + """
+import tkinter as tk
+import Dynamic_Graphs
+try:
+    root = tk.Tk()
+except tk.TclError:
+    sys.exit(%d)
+app = Dynamic_Graphs.DynamicGraphApp(root)
+before_paint = sorted(m for m in sys.modules if m.split('.')[0] == 'matplotlib')
+t_end = time.perf_counter() + 60
+while app.plot_model is None and time.perf_counter() < t_end:
+    root.update()
+    time.sleep(0.005)
+root.destroy()
+print(json.dumps({'times': app.startup_times, 'budget': Dynamic_Graphs.STARTUP_BUDGET,
+                  'matplotlib_before_paint': before_paint, 'ready': app.plot_model is not None,
+                  'psse': sorted(m for m in sys.modules if m.split('.')[0] in %r)}))
+""" % (NO_DISPLAY, PSSE_MODULES)
+
+
+def run_script(script):
+    proc = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, timeout=TIMEOUT,
+                          cwd=ROOT)
+    return proc.returncode, proc.stdout.strip().splitlines()[-1] if proc.stdout.strip() else '', proc.stderr
+
+
+class StartupTest(unittest.TestCase):
+
+    def test_import_is_fast_and_lazy(self):
+        code, out, err = run_script(_IMPORT_SCRIPT)
+        self.assertEqual(code, 0, err)
+        result = json.loads(out)
+        self.assertEqual(result['modules'], [], "imported while loading Dynamic_Graphs")
+        self.assertLessEqual(result['seconds'], result['budget'])
+
+    def test_window_shows_within_budget(self):
+        code, out, err = run_script(_WINDOW_SCRIPT)
+        if code == NO_DISPLAY:
+            self.skipTest("no display for Tk")
+        self.assertEqual(code, 0, err)
+        result = json.loads(out)
+        times = result['times']
+        self.assertTrue(result['ready'], "the plot was never set up")
+        self.assertEqual(result['matplotlib_before_paint'], [], "Matplotlib imported before the first paint")
+        self.assertEqual(result['psse'], [], "PSSE imported without using the dyntools reader")
+        self.assertLessEqual(times['primera pintura'], result['budget'],
+                             f"startup over budget: {times}")
+        # Fuentes y Matplotlib llegan despues de mostrar la ventana
+        self.assertGreaterEqual(times['fuentes'], times['primera pintura'])
+        self.assertGreaterEqual(times['matplotlib'], times['primera pintura'])
+
+
+if __name__ == '__main__':
+    unittest.main()
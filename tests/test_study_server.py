@@ -0,0 +1,107 @@
+# test_study_server.py
+# Pruebas de StudyServer.open_file con varios hilos pidiendo el mismo archivo a la vez.
+
+# La apertura del archivo se reemplaza por una lenta (y que puede fallar) que cuenta cuantas veces se
+# llama y cuantas corren al mismo tiempo.
+
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(1, ROOT)
+sys.path.insert(2, os.path.join(ROOT, 'benchmarks'))
+
+import Study_Server  # noqa: E402
+from Channel_Reader import open_channel_file  # noqa: E402
+from Synthetic_Out import write_out_file  # noqa: E402
+
+OPEN_SECONDS = 0.3
+THREADS = 6
+
+
+class SlowOpen:
+    """Stand-in for open_channel_file that takes OPEN_SECONDS and fails the first `failures` calls."""
+
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.calls = 0
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, path):
+        with self._lock:
+            self.calls += 1
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+            fail = self.calls <= self.failures
+        try:
+            time.sleep(OPEN_SECONDS)
+            if fail:
+                raise OSError("simulated read error")
+            return open_channel_file(path)
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+class OpenFileTest(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        write_out_file(os.path.join(self.dir, 'caso.out'), nchan=5, nsteps=200)
+        self.study = Study_Server.StudyServer(self.dir, use_cache=False)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def open_from_threads(self, opener, delays):
+        results, errors = [], []
+
+        def worker(delay):
+            time.sleep(delay)
+            try:
+                results.append(self.study.open_file('caso.out'))
+            except OSError as e:
+                errors.append(e)
+
+        with mock.patch.object(Study_Server, 'open_channel_file', opener):
+            threads = [threading.Thread(target=worker, args=(delay,)) for delay in delays]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        return results, errors
+
+    def test_simultaneous_requests_open_once(self):
+        opener = SlowOpen()
+        results, errors = self.open_from_threads(opener, [0.0] * THREADS)
+        self.assertEqual(errors, [])
+        self.assertEqual(opener.calls, 1)
+        self.assertEqual(len({id(loaded) for loaded in results}), 1)
+        # Una consulta por peticion: los que esperaban el candado no suman un acierto extra
+        stats = self.study.files.stats()
+        self.assertEqual((stats['hits'], stats['misses']), (0, THREADS))
+        self.study.open_file('caso.out')
+        self.assertEqual(self.study.files.stats()['hits'], 1)
+
+    def test_failed_open_is_not_retried_in_parallel(self):
+        # El primero falla mientras otros esperan; los que llegan despues no deben abrir en paralelo
+        opener = SlowOpen(failures=1)
+        late = OPEN_SECONDS + OPEN_SECONDS / 3
+        results, errors = self.open_from_threads(opener, [0.0, 0.05, 0.05, late, late, late])
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(len(results), THREADS - 1)
+        self.assertEqual(opener.max_active, 1)
+        self.assertEqual(opener.calls, 2)
+        self.assertEqual(len(self.study._load_locks), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()